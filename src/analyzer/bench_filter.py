@@ -0,0 +1,148 @@
+import os
+import io
+import sys
+import csv
+import json
+import time
+import random
+import hashlib
+import resource
+import tempfile
+import contextlib
+import subprocess
+import filter_offers
+from filter_offers import Colors, colored
+
+BACKENDS = ["pandas", "polars"]
+DESCRIPTION_WORDS = (
+    "développeur react node api docker données projet équipe client mission produit agile cloud "
+    "python sql tests web mobile architecture qualité livraison"
+).split()
+CONTRACT_VALUES = ["Alternance", "CDI", "Stage", "CDD", "Freelance", "", ""]
+REMOTE_VALUES = ["Télétravail partiel", "Télétravail total", "", ""]
+PUBLISHED_VALUES = [
+    "Publiée il y a 3 jours", "Employeur actif il y a 30+ jours", "Publiée aujourd'hui", "Publiée il y a 12 jours", ""
+]
+
+
+def generate_offers_csv(csv_path, offer_count, seed=1):
+    # Offres synthétiques déterministes : ~10 % d'écoles, champs vides et doublons d'URL inclus
+    offer_random = random.Random(seed)
+    companies = [f"Entreprise {index}" for index in range(3000)] + ["Ecole Ynov", "CFA Campus", "OpenClassrooms", ""]
+    locations = [f"Ville {index}" for index in range(400)]
+
+    with open(csv_path, 'w', encoding='utf-8', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(['title', 'company', 'location', 'salary', 'contract', 'remote', 'publishedDate', 'description', 'url', 'scrapedAt'])
+        for index in range(offer_count):
+            description = " ".join(offer_random.choices(DESCRIPTION_WORDS, k=50))
+            if offer_random.random() < 0.1:
+                description += " formation en alternance avec notre école partenaire cesi"
+            writer.writerow([
+                f"Développeur {offer_random.choice(DESCRIPTION_WORDS)}",
+                offer_random.choice(companies),
+                offer_random.choice(locations),
+                "",
+                offer_random.choice(CONTRACT_VALUES),
+                offer_random.choice(REMOTE_VALUES),
+                offer_random.choice(PUBLISHED_VALUES),
+                description,
+                # Une offre sur 50 reprend l'URL de la précédente (doublon d'offerId)
+                f"https://fr.indeed.com/viewjob?jk=bench{index - 1 if index % 50 == 49 else index}",
+                "2026-01-15T10:00:00.000Z"
+            ])
+
+
+def run_backend(backend_name, csv_path, output_folder):
+    # Processus séparé par backend : pic mémoire mesuré indépendamment
+    filter_offers.ANALYZER_BACKEND = backend_name
+    filter_offers.OUTPUT_FOLDER = output_folder
+    filter_offers.LOG_FILE_PATH = os.path.join(output_folder, "filter.log")
+    with contextlib.redirect_stdout(io.StringIO()):
+        dataframe_backend = filter_offers.load_dataframe_backend(backend_name)
+    if dataframe_backend.name != backend_name:
+        sys.exit(1)
+
+    # Lecture du CSV chronométrée à part : le reste du run (classification, exports, stats) est le filtrage
+    read_offers_csv = dataframe_backend.read_offers_csv
+    read_seconds = []
+
+    def timed_read_offers_csv(input_path):
+        read_start = time.perf_counter()
+        offers = read_offers_csv(input_path)
+        read_seconds.append(time.perf_counter() - read_start)
+        return offers
+
+    dataframe_backend.read_offers_csv = timed_read_offers_csv
+
+    # Filtrage seul, sans l'affichage CLI ni ses animations
+    start_time = time.perf_counter()
+    filter_offers.run_filter(csv_path, dataframe_backend=dataframe_backend)
+    elapsed_seconds = time.perf_counter() - start_time
+
+    print(json.dumps({
+        'seconds': elapsed_seconds,
+        'read_seconds': sum(read_seconds),
+        'filter_seconds': elapsed_seconds - sum(read_seconds),
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }))
+
+
+def hash_output_files(output_folder):
+    return {
+        filename: hashlib.sha1(open(os.path.join(output_folder, filename), 'rb').read()).hexdigest()
+        for filename in sorted(os.listdir(output_folder)) if filename.endswith('.csv')
+    }
+
+
+def run_benchmark(offer_count):
+    work_dir = tempfile.mkdtemp(prefix="filter-bench-")
+    csv_path = os.path.join(work_dir, "offres.csv")
+
+    print(colored("\n⏱️  BENCHMARK FILTRAGE (offres synthétiques)\n", Colors.CYAN + Colors.BOLD))
+    print(f"   • Offres : {offer_count} | Cœurs : {os.cpu_count()} | Dossier : {work_dir}")
+    if (os.cpu_count() or 1) < 2:
+        # Lecture CSV et noyaux texte de Polars multithread : sur un seul cœur, son gain est un minimum
+        print(colored("   ⚠️  Un seul cœur : gain de Polars minimal, plus élevé sur une machine multicœur", Colors.YELLOW))
+
+    generation_start = time.perf_counter()
+    generate_offers_csv(csv_path, offer_count)
+    print(f"   • CSV : {os.path.getsize(csv_path) / 1024 ** 2:.0f} Mo généré en {time.perf_counter() - generation_start:.0f}s\n")
+
+    results = {}
+    for backend_name in BACKENDS:
+        output_folder = os.path.join(work_dir, backend_name)
+        os.makedirs(output_folder, exist_ok=True)
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run", backend_name, csv_path, output_folder],
+            stdout=subprocess.PIPE, text=True, cwd=work_dir
+        )
+        if completed.returncode != 0:
+            print(colored(f"   ❌ {backend_name} : indisponible ou en échec (code {completed.returncode})", Colors.RED))
+            continue
+        results[backend_name] = {**json.loads(completed.stdout.strip().splitlines()[-1]), 'files': hash_output_files(output_folder)}
+
+    print(colored(f"   {'Backend':<10} {'Lecture':>9} {'Filtrage':>9} {'Total':>9} {'Pic mémoire':>12} {'Fichiers':>9}", Colors.BOLD))
+    for backend_name, result in results.items():
+        print(f"   {backend_name:<10} {result['read_seconds']:>8.1f}s {result['filter_seconds']:>8.1f}s "
+              f"{result['seconds']:>8.1f}s {result['peak_rss_mb']:>9.0f} Mo {len(result['files']):>9}")
+
+    reference_files = results.get("pandas", {}).get('files')
+    for backend_name, result in results.items():
+        if backend_name == "pandas" or reference_files is None:
+            continue
+        if result['files'] == reference_files:
+            speedup = results['pandas']['seconds'] / result['seconds']
+            print(colored(f"\n   ✅ {backend_name} : fichiers identiques à pandas, {speedup:.1f}x plus rapide", Colors.GREEN))
+        else:
+            different_files = [name for name in reference_files if result['files'].get(name) != reference_files[name]]
+            print(colored(f"\n   ❌ {backend_name} : fichiers différents de pandas : {', '.join(different_files)}", Colors.RED))
+    print()
+
+
+if __name__ == "__main__":
+    # Usage : python src/analyzer/bench_filter.py [nombre d'offres, défaut 1000000]
+    if len(sys.argv) > 1 and sys.argv[1] == "--run":
+        run_backend(*sys.argv[2:5])
+    else:
+        run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
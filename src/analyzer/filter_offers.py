@@ -1,16 +1,26 @@
 import os
 import re
 import sys
+import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
 from datetime import datetime
 from collections import Counter
+from journal_reader import JOURNAL_PATH, OFFER_FIELDS, load_cursor, save_cursor, read_new_offers
+from offer_identity import compute_offer_id
+from publication_dates import parse_scraped_at, parse_published_dates, compute_age_days
 
 load_dotenv()
 
 INPUT_CSV_PATH = os.getenv("CSV_OUTPUT", "data/input/offres.csv")
 OUTPUT_FOLDER = os.getenv("FILTERED_FOLDER", "data/output/filtered")
+FILTER_SOURCE = os.getenv("FILTER_SOURCE", "csv")
+# pandas (défaut) ou polars : lecture CSV et détection des mots-clés, mêmes fichiers en sortie
+ANALYZER_BACKEND = os.getenv("ANALYZER_BACKEND", "pandas")
+# Âge maximum d'une offre en jours (0 = pas de limite) : les offres plus anciennes ne vont pas à la génération
+MAX_OFFER_AGE_DAYS = float(os.getenv("MAX_OFFER_AGE_DAYS", "0"))
 LOG_FILE_PATH = "data/filter.log"
+SEEN_OFFERS_PATH = "data/.filtered_offer_ids"
 
 
 class Colors:
@@ -80,6 +90,18 @@ CONTRACT_KEYWORDS = {
     'freelance': ['freelance', 'indépendant', 'auto-entrepreneur', 'consultant']
 }
 
+CONTRACT_TYPES = list(CONTRACT_KEYWORDS.keys()) + ['non_precise']
+
+# Une regex compilée par type de contrat (alternative des mots-clés), dans l'ordre de priorité
+CONTRACT_PATTERNS = {
+    contract_type: re.compile(rf"\b(?:{'|'.join(re.escape(keyword) for keyword in keywords_list)})\b")
+    for contract_type, keywords_list in CONTRACT_KEYWORDS.items()
+}
+
+# Colonnes à faible cardinalité stockées en catégories (une copie de chaque valeur au lieu d'une par ligne)
+CATEGORICAL_COLUMNS = ['company', 'location', 'contract', 'remote']
+DETECTION_CHUNK_SIZE = 50000
+
 CONTRACT_EMOJIS = {
     'alternance': '🎓',
     'stage': '📚',
@@ -108,29 +130,78 @@ def log_message(message):
         log_file.write(log_entry)
 
 
-def detect_school(company_name, job_description):
-    combined_text = f"{company_name} {job_description}".lower()
-    matched_keywords = []
+def detect_school_masks(company_names, job_descriptions):
+    # Un bit par mot-clé de SCHOOL_KEYWORDS : pas de liste Python par ligne.
+    # Texte minuscule construit par blocs pour ne pas dupliquer toutes les descriptions d'un coup.
+    school_masks = np.zeros(len(company_names), dtype=np.int64)
+
+    for start in range(0, len(company_names), DETECTION_CHUNK_SIZE):
+        end = start + DETECTION_CHUNK_SIZE
+        # Valeur manquante → "nan" quelle que soit la version de pandas (pandas 3 propagerait le NaN à toute la ligne)
+        combined_text = (
+            company_names.iloc[start:end].astype(object).fillna("nan").astype(str) + " " +
+            job_descriptions.iloc[start:end].astype(object).fillna("nan").astype(str)
+        ).str.lower()
+        for bit, keyword in enumerate(SCHOOL_KEYWORDS):
+            school_masks[start:end] |= combined_text.str.contains(keyword, regex=False).to_numpy(dtype=np.int64) << bit
 
-    for keyword in SCHOOL_KEYWORDS:
-        if keyword in combined_text:
-            matched_keywords.append(keyword)
+    return pd.Series(school_masks, index=company_names.index)
 
-    is_school_offer = len(matched_keywords) > 0
-    return is_school_offer, matched_keywords
+
+def decode_school_mask(school_mask):
+    return [keyword for bit, keyword in enumerate(SCHOOL_KEYWORDS) if school_mask & (1 << bit)]
+
+
+def count_school_keywords(school_masks):
+    keyword_counts = Counter()
+    for bit, keyword in enumerate(SCHOOL_KEYWORDS):
+        detection_count = int(((school_masks & (1 << bit)) != 0).sum())
+        if detection_count > 0:
+            keyword_counts[keyword] = detection_count
+    return keyword_counts
 
 
 def detect_contract_type(contract_field, job_description):
     combined_text = f"{contract_field} {job_description}".lower()
 
-    for contract_type, keywords_list in CONTRACT_KEYWORDS.items():
-        for keyword in keywords_list:
-            if re.search(rf'\b{re.escape(keyword)}\b', combined_text):
-                return contract_type
+    for contract_type, contract_pattern in CONTRACT_PATTERNS.items():
+        if contract_pattern.search(combined_text):
+            return contract_type
 
     return 'non_precise'
 
 
+class PandasBackend:
+    name = "pandas"
+
+    def read_offers_csv(self, csv_path):
+        return pd.read_csv(csv_path, dtype={column: 'category' for column in CATEGORICAL_COLUMNS})
+
+    def detect_school_masks(self, company_names, job_descriptions):
+        return detect_school_masks(company_names, job_descriptions)
+
+    def detect_contract_types(self, contract_fields, job_descriptions):
+        return [
+            detect_contract_type(str(contract_field), str(job_description))
+            for contract_field, job_description in zip(contract_fields, job_descriptions)
+        ]
+
+
+def load_dataframe_backend(backend_name):
+    if backend_name == "polars":
+        try:
+            from polars_backend import PolarsBackend
+        except ImportError:
+            print(colored("  ⚠️  Polars non installé (pip install -r requirements-polars.txt) : backend pandas utilisé", Colors.YELLOW))
+            log_message("Backend polars indisponible, repli sur pandas")
+            return PandasBackend()
+        return PolarsBackend(SCHOOL_KEYWORDS, CONTRACT_PATTERNS, CATEGORICAL_COLUMNS)
+
+    if backend_name != "pandas":
+        print(colored(f"  ⚠️  ANALYZER_BACKEND inconnu : {backend_name} (pandas ou polars) : backend pandas utilisé", Colors.YELLOW))
+    return PandasBackend()
+
+
 def animate_dots(message, animation_duration=1):
     import time
     for dot_count in range(3):
@@ -140,84 +211,217 @@ def animate_dots(message, animation_duration=1):
     print(f"\r  {colored('✓', Colors.GREEN)} {colored(message, Colors.GREEN)}")
 
 
-def filter_offers(csv_input_path):
-    print_header()
+def assign_offer_ids(dataframe):
+    if 'offerId' in dataframe.columns:
+        offer_ids = dataframe['offerId'].fillna('').astype(str)
+    else:
+        offer_ids = pd.Series('', index=dataframe.index)
 
-    if not os.path.exists(csv_input_path):
-        print(colored(f"\n❌ ERREUR : Fichier introuvable", Colors.RED + Colors.BOLD))
-        print(colored(f"   Chemin : {csv_input_path}\n", Colors.RED))
-        log_message(f"ERREUR : Fichier introuvable : {csv_input_path}")
-        return
+    missing_ids = offer_ids == ''
+    if missing_ids.any():
+        offer_ids[missing_ids] = dataframe.loc[missing_ids, 'url'].map(compute_offer_id)
+    dataframe['offerId'] = offer_ids
 
-    print(colored("  📂 Source :", Colors.BOLD), colored(csv_input_path, Colors.BLUE))
+    # Sans URL ni offerId, pas d'identité : ces offres ne sont jamais dédoublonnées entre elles
+    duplicate_offers = dataframe.duplicated(subset='offerId', keep='first') & (offer_ids != '')
+    return dataframe[~duplicate_offers]
 
-    animate_dots("Chargement des données")
-    dataframe = pd.read_csv(csv_input_path)
-    total_offers = len(dataframe)
 
-    print(colored(f"\n  📊 Nombre d'offres détectées : ", Colors.BOLD) +
-          colored(f"{total_offers}", Colors.GREEN + Colors.BOLD))
+def load_seen_offer_ids():
+    if not os.path.exists(SEEN_OFFERS_PATH):
+        return set()
+    with open(SEEN_OFFERS_PATH, 'r', encoding='utf-8') as seen_file:
+        return {line.strip() for line in seen_file if line.strip()}
 
-    print("\n" + colored("─" * 70, Colors.GRAY))
-    print(colored("  🔬 ANALYSE EN COURS", Colors.BOLD + Colors.CYAN))
-    print(colored("─" * 70, Colors.GRAY))
 
-    animate_dots("Détection des organismes de formation", 0.8)
+def record_seen_offer_ids(offer_ids):
+    os.makedirs(os.path.dirname(SEEN_OFFERS_PATH), exist_ok=True)
+    with open(SEEN_OFFERS_PATH, 'a', encoding='utf-8') as seen_file:
+        seen_file.writelines(f"{offer_id}\n" for offer_id in offer_ids if offer_id)
+
+
+def add_publication_dates(dataframe, fallback_scraped_at):
+    # Heure du scraping par offre (scrapedAt), sinon date de modification du fichier source
+    if 'scrapedAt' in dataframe.columns:
+        scraped_at_values = dataframe['scrapedAt']
+    else:
+        scraped_at_values = pd.Series(None, index=dataframe.index, dtype=object)
+
+    scraped_at = parse_scraped_at(scraped_at_values, fallback_scraped_at)
+    dataframe['publishedAt'] = parse_published_dates(dataframe['publishedDate'], scraped_at)
+    return dataframe
+
+
+def find_stale_offers(dataframe, max_age_days):
+    if max_age_days <= 0:
+        return pd.Series(False, index=dataframe.index)
+    # Date inconnue (NaT) : l'offre est conservée
+    return compute_age_days(dataframe['publishedAt'], pd.Timestamp.now(tz='UTC')) > max_age_days
 
-    school_detection_results = dataframe.apply(
-        lambda row: detect_school(
-            str(row.get('company', '')),
-            str(row.get('description', ''))
-        ),
-        axis=1
-    )
 
-    dataframe['is_school'] = school_detection_results.apply(lambda result: result[0])
-    dataframe['school_keywords'] = school_detection_results.apply(lambda result: result[1])
+def compact_columns(dataframe):
+    # Copie superficielle : pas de SettingWithCopyWarning sur une sélection (pandas 2), données non recopiées
+    dataframe = dataframe.copy(deep=False)
+    for column in CATEGORICAL_COLUMNS:
+        if column in dataframe.columns:
+            dataframe[column] = dataframe[column].astype('category')
+    return dataframe
 
-    animate_dots("Classification des types de contrats", 0.8)
 
-    dataframe['contract_type'] = dataframe.apply(
-        lambda row: detect_contract_type(
-            str(row.get('contract', '')),
-            str(row.get('description', ''))
-        ),
-        axis=1
+def to_export_frame(dataframe):
+    # Les mots-clés ne sont décodés qu'à l'export, une fois par masque distinct
+    decoded_keywords = {mask: str(decode_school_mask(mask)) for mask in dataframe['school_mask'].unique()}
+    export_frame = dataframe.drop(columns='school_mask')
+    export_frame.insert(
+        export_frame.columns.get_loc('is_school') + 1,
+        'school_keywords',
+        dataframe['school_mask'].map(decoded_keywords)
     )
+    return export_frame
+
+
+def export_offers(dataframe, output_path, append):
+    dataframe = to_export_frame(dataframe)
+
+    # En mode journal, les nouvelles offres s'ajoutent aux fichiers existants
+    if append and os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+        existing_columns = pd.read_csv(output_path, nrows=0).columns.tolist()
+        if existing_columns == dataframe.columns.tolist():
+            dataframe.to_csv(output_path, mode='a', header=False, index=False)
+            return
+
+        # Colonnes différentes (fichier d'une version précédente) : ajouter décalerait les valeurs,
+        # le fichier est réécrit avec l'union des colonnes
+        log_message(f"Colonnes différentes dans {output_path} : fichier réécrit")
+        new_columns = dataframe.columns.tolist()
+        existing_offers = pd.read_csv(output_path, dtype=str, keep_default_na=False)
+        dataframe = pd.concat([existing_offers, dataframe], ignore_index=True)
+        dataframe = dataframe[new_columns + [column for column in existing_columns if column not in new_columns]]
+
+    dataframe.to_csv(output_path, index=False)
+
+
+def run_filter(csv_input_path, use_journal=False, dataframe_backend=None, report_step=None):
+    # Filtrage sans affichage : chargement, classification et exports. Utilisé tel quel par le mode serve,
+    # filter_offers n'ajoute que la présentation CLI (report_step reçoit le nom de chaque étape).
+    report_step = report_step or (lambda step: None)
+    dataframe_backend = dataframe_backend or load_dataframe_backend(ANALYZER_BACKEND)
+    input_path = JOURNAL_PATH if use_journal else csv_input_path
+
+    if not os.path.exists(input_path):
+        log_message(f"ERREUR : Fichier introuvable : {input_path}")
+        return {'status': 'missing', 'input_path': input_path}
+
+    report_step("Chargement des données")
+    if use_journal:
+        new_offers, next_cursor = read_new_offers(input_path, load_cursor())
+        dataframe = pd.DataFrame(new_offers, columns=OFFER_FIELDS)
+    else:
+        dataframe = dataframe_backend.read_offers_csv(csv_input_path)
+
+    loaded_offers = len(dataframe)
+    dataframe = compact_columns(assign_offer_ids(dataframe))
+    if use_journal:
+        seen_offer_ids = load_seen_offer_ids()
+        dataframe = dataframe[~dataframe['offerId'].isin(seen_offer_ids)].copy()
+    total_offers = len(dataframe)
+    duplicate_offers = loaded_offers - total_offers
 
-    print(colored("\n  ✓ Analyse terminée avec succès\n", Colors.GREEN + Colors.BOLD))
+    if use_journal and total_offers == 0:
+        log_message("Journal : aucune nouvelle offre")
+        save_cursor(next_cursor)
+        return {'status': 'empty', 'input_path': input_path}
+
+    if duplicate_offers > 0:
+        log_message(f"Doublons ignorés : {duplicate_offers}")
+
+    report_step("Détection des organismes de formation")
+    dataframe['school_mask'] = dataframe_backend.detect_school_masks(dataframe['company'], dataframe['description'])
+    dataframe['is_school'] = dataframe['school_mask'] != 0
+
+    report_step("Datation des offres")
+    dataframe = add_publication_dates(dataframe, pd.Timestamp(os.path.getmtime(input_path), unit='s', tz='UTC'))
+    stale_offers_mask = find_stale_offers(dataframe, MAX_OFFER_AGE_DAYS)
+
+    report_step("Classification des types de contrats")
+    dataframe['contract_type'] = pd.Categorical(
+        dataframe_backend.detect_contract_types(dataframe['contract'], dataframe['description']),
+        categories=CONTRACT_TYPES
+    )
 
     school_offers = dataframe[dataframe['is_school']]
-    real_job_offers = dataframe[~dataframe['is_school']]
+    real_job_offers = dataframe[~dataframe['is_school'] & ~stale_offers_mask]
+    stale_offers = dataframe[~dataframe['is_school'] & stale_offers_mask]
+    saved_llm_calls = int((stale_offers['contract_type'] == 'alternance').sum())
 
     os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 
-    print(colored("─" * 70, Colors.GRAY))
-    print(colored("  💾 EXPORTATION DES FICHIERS", Colors.BOLD + Colors.CYAN))
-    print(colored("─" * 70, Colors.GRAY) + "\n")
-
     school_output_path = os.path.join(OUTPUT_FOLDER, "offres_ecoles.csv")
-    school_offers.to_csv(school_output_path, index=False)
-    print(f"  🎓 {colored('Organismes de formation', Colors.YELLOW):<35} → " +
-          f"{colored('offres_ecoles.csv', Colors.GRAY)} ({len(school_offers)} offres)")
+    export_offers(school_offers, school_output_path, use_journal)
     log_message(f"Écoles: {len(school_offers)} offres → {school_output_path}")
 
+    if len(stale_offers) > 0:
+        stale_output_path = os.path.join(OUTPUT_FOLDER, "offres_perimees.csv")
+        export_offers(stale_offers, stale_output_path, use_journal)
+        log_message(f"Périmées: {len(stale_offers)} offres → {stale_output_path}")
+    if MAX_OFFER_AGE_DAYS > 0:
+        log_message(f"Offres périmées : {len(stale_offers)}, appels LLM évités : {saved_llm_calls}")
+
     contract_stats = {}
-    for contract_type in list(CONTRACT_KEYWORDS.keys()) + ['non_precise']:
-        filtered_by_contract = real_job_offers[real_job_offers['contract_type'] == contract_type]
+    for contract_type, filtered_by_contract in real_job_offers.groupby('contract_type', observed=False):
         offer_count = len(filtered_by_contract)
         contract_stats[contract_type] = offer_count
 
         if offer_count > 0:
             contract_output_path = os.path.join(OUTPUT_FOLDER, f"offres_{contract_type}.csv")
-            filtered_by_contract.to_csv(contract_output_path, index=False)
+            export_offers(filtered_by_contract, contract_output_path, use_journal)
+            log_message(f"{contract_type}: {offer_count} offres → {contract_output_path}")
 
+    if use_journal:
+        record_seen_offer_ids(dataframe['offerId'])
+        save_cursor(next_cursor)
+
+    log_message(f"Filtrage terminé avec succès (backend {dataframe_backend.name})")
+    return {
+        'status': 'done',
+        'input_path': input_path,
+        'dataframe': dataframe,
+        'total_offers': total_offers,
+        'duplicate_offers': duplicate_offers,
+        'school_offers': school_offers,
+        'real_job_offers': real_job_offers,
+        'stale_offers': stale_offers,
+        'saved_llm_calls': saved_llm_calls,
+        'contract_stats': contract_stats
+    }
+
+
+def print_exports(result):
+    print(colored("─" * 70, Colors.GRAY))
+    print(colored("  💾 EXPORTATION DES FICHIERS", Colors.BOLD + Colors.CYAN))
+    print(colored("─" * 70, Colors.GRAY) + "\n")
+
+    print(f"  🎓 {colored('Organismes de formation', Colors.YELLOW):<35} → " +
+          f"{colored('offres_ecoles.csv', Colors.GRAY)} ({len(result['school_offers'])} offres)")
+
+    if len(result['stale_offers']) > 0:
+        print(f"  ⏳ {colored(f'Périmées (> {MAX_OFFER_AGE_DAYS:g} jours)', Colors.GRAY):<35} → " +
+              f"{colored('offres_perimees.csv', Colors.GRAY)} ({len(result['stale_offers'])} offres)")
+
+    for contract_type, offer_count in result['contract_stats'].items():
+        if offer_count > 0:
             emoji = CONTRACT_EMOJIS.get(contract_type, '📄')
             color = CONTRACT_COLORS.get(contract_type, Colors.CYAN)
-
             print(f"  {emoji} {colored(contract_type.upper(), color):<35} → " +
                   f"{colored(f'offres_{contract_type}.csv', Colors.GRAY)} ({offer_count} offres)")
-            log_message(f"{contract_type}: {offer_count} offres → {contract_output_path}")
+
+
+def print_dashboard(result):
+    total_offers = result['total_offers']
+    school_offers = result['school_offers']
+    real_job_offers = result['real_job_offers']
+    stale_offers = result['stale_offers']
+    contract_stats = result['contract_stats']
 
     print("\n" + colored("═" * 70, Colors.GREEN))
     print(colored("  📊 TABLEAU DE BORD STATISTIQUES", Colors.GREEN + Colors.BOLD))
@@ -230,13 +434,17 @@ def filter_offers(csv_input_path):
           f"({len(real_job_offers) / total_offers * 100:.1f}%)")
     print(f"  Écoles filtrées   : {colored(str(len(school_offers)), Colors.RED + Colors.BOLD)} " +
           f"({len(school_offers) / total_offers * 100:.1f}%)")
+    if MAX_OFFER_AGE_DAYS > 0:
+        print(f"  Offres périmées   : {colored(str(len(stale_offers)), Colors.YELLOW + Colors.BOLD)} " +
+              f"({len(stale_offers) / total_offers * 100:.1f}%, > {MAX_OFFER_AGE_DAYS:g} jours)")
+        print(f"  Appels LLM évités : {colored(str(result['saved_llm_calls']), Colors.GREEN + Colors.BOLD)} " +
+              f"(alternances périmées non envoyées à la génération)")
 
     if len(school_offers) > 0:
         top_schools_title = "Top organismes détectés"
         print(f"\n  {colored(top_schools_title, Colors.BOLD + Colors.UNDERLINE)}\n")
 
-        all_keywords = [kw for kw_list in school_offers['school_keywords'] for kw in kw_list]
-        top_schools = Counter(all_keywords).most_common(5)
+        top_schools = count_school_keywords(school_offers['school_mask']).most_common(5)
 
         for rank, (school_name, detection_count) in enumerate(top_schools, 1):
             percentage = (detection_count / len(school_offers)) * 100
@@ -261,7 +469,7 @@ def filter_offers(csv_input_path):
 
     print("\n" + colored("─" * 70, Colors.GRAY))
 
-    alternance_count = len(real_job_offers[real_job_offers['contract_type'] == 'alternance'])
+    alternance_count = contract_stats['alternance']
     alternance_percentage = (alternance_count / len(real_job_offers) * 100) if len(real_job_offers) > 0 else 0
 
     print(f"\n  {colored('🎯 OBJECTIF : Alternances trouvées', Colors.BOLD)}")
@@ -280,15 +488,49 @@ def filter_offers(csv_input_path):
         print(f"  Qualité du scraping : {verdict}")
 
     print("\n" + colored("═" * 70, Colors.GREEN))
+
+
+def filter_offers(csv_input_path, use_journal=False):
+    print_header()
+
+    input_path = JOURNAL_PATH if use_journal else csv_input_path
+    print(colored("  📂 Source :", Colors.BOLD), colored(input_path, Colors.BLUE))
+    dataframe_backend = load_dataframe_backend(ANALYZER_BACKEND)
+    print(colored("  ⚙️  Backend :", Colors.BOLD), colored(dataframe_backend.name, Colors.BLUE))
+
+    print("\n" + colored("─" * 70, Colors.GRAY))
+    print(colored("  🔬 ANALYSE EN COURS", Colors.BOLD + Colors.CYAN))
+    print(colored("─" * 70, Colors.GRAY))
+
+    result = run_filter(csv_input_path, use_journal, dataframe_backend, report_step=lambda step: animate_dots(step, 0.8))
+
+    if result['status'] == 'missing':
+        print(colored(f"\n❌ ERREUR : Fichier introuvable", Colors.RED + Colors.BOLD))
+        print(colored(f"   Chemin : {input_path}\n", Colors.RED))
+        return
+
+    if result['status'] == 'empty':
+        print(colored("\n  ✓ Aucune nouvelle offre dans le journal depuis le dernier filtrage\n", Colors.GREEN))
+        return
+
+    print(colored(f"\n  📊 Nombre d'offres détectées : ", Colors.BOLD) +
+          colored(f"{result['total_offers']}", Colors.GREEN + Colors.BOLD))
+    if result['duplicate_offers'] > 0:
+        print(colored(f"  ♻️  Doublons ignorés (même offerId) : {result['duplicate_offers']}", Colors.GRAY))
+
+    print(colored("\n  ✓ Analyse terminée avec succès\n", Colors.GREEN + Colors.BOLD))
+
+    print_exports(result)
+    print_dashboard(result)
+
     print(colored("\n  ✅ TRAITEMENT TERMINÉ AVEC SUCCÈS !", Colors.GREEN + Colors.BOLD))
     print(colored(f"  📁 Fichiers disponibles : {OUTPUT_FOLDER}\n", Colors.BLUE))
-
-    log_message("Filtrage terminé avec succès")
+    return result['dataframe']
 
 
 if __name__ == "__main__":
     try:
-        filter_offers(INPUT_CSV_PATH)
+        filter_offers(INPUT_CSV_PATH, use_journal="--journal" in sys.argv or FILTER_SOURCE == "journal")
     except KeyboardInterrupt:
         print(colored("\n\n⚠️  Interruption par l'utilisateur\n", Colors.YELLOW))
         sys.exit(0)
@@ -0,0 +1,106 @@
+import os
+import json
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+
+load_dotenv()
+
+JOURNAL_PATH = os.getenv("SCRAPER_JOURNAL", "data/input/offres.jsonl")
+CURSOR_PATH = os.getenv("JOURNAL_CURSOR", "data/.journal_cursor.json")
+
+OFFER_FIELDS = ['title', 'company', 'location', 'salary', 'contract', 'remote', 'publishedDate', 'description', 'url', 'offerId', 'scrapedAt']
+
+
+def empty_cursor():
+    return {"journal_id": None, "generation": 0, "offset": 0, "offer_count": 0}
+
+
+def load_cursor(cursor_path=CURSOR_PATH):
+    if not os.path.exists(cursor_path):
+        return empty_cursor()
+
+    try:
+        with open(cursor_path, 'r', encoding='utf-8') as cursor_file:
+            return {**empty_cursor(), **json.load(cursor_file)}
+    except (json.JSONDecodeError, OSError):
+        return empty_cursor()
+
+
+def save_cursor(cursor, cursor_path=CURSOR_PATH):
+    cursor_dir = os.path.dirname(cursor_path)
+    if cursor_dir:
+        os.makedirs(cursor_dir, exist_ok=True)
+
+    tmp_path = f"{cursor_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as cursor_file:
+        json.dump(cursor, cursor_file)
+    os.replace(tmp_path, cursor_path)
+
+
+def read_new_offers(journal_path, cursor):
+    # Lit les offres ajoutées au journal depuis le curseur.
+    # Même génération → reprise directe à l'offset enregistré.
+    # Journal compacté depuis (génération différente) → on relit en sautant
+    # les offres déjà consommées, la compaction conservant leur ordre.
+    # offer_count est un rang absolu : droppedOffers (en-tête) compte les offres déjà lues
+    # que la compaction a retirées du début du journal.
+    if not os.path.exists(journal_path):
+        return [], cursor
+
+    new_offers = []
+
+    with open(journal_path, 'rb') as journal_file:
+        header_line = journal_file.readline()
+        if not header_line.endswith(b'\n'):
+            return [], cursor
+
+        try:
+            header = json.loads(header_line)
+        except json.JSONDecodeError:
+            header = {}
+
+        journal_id = header.get('journalId')
+        generation = header.get('generation', 0)
+        dropped_offers = header.get('droppedOffers', 0)
+        journal_size = os.fstat(journal_file.fileno()).st_size
+
+        same_journal = journal_id is not None and journal_id == cursor['journal_id']
+        if same_journal and generation == cursor['generation'] and cursor['offset'] <= journal_size:
+            journal_file.seek(max(cursor['offset'], len(header_line)))
+            offers_to_skip = 0
+            offer_count = cursor['offer_count']
+        else:
+            offers_to_skip = max(cursor['offer_count'] - dropped_offers, 0) if same_journal else 0
+            offer_count = dropped_offers
+
+        offset = journal_file.tell()
+        for raw_line in journal_file:
+            if not raw_line.endswith(b'\n'):
+                break
+            offset += len(raw_line)
+
+            try:
+                event = json.loads(raw_line)
+            except json.JSONDecodeError:
+                continue
+            if event.get('type') != 'offer':
+                continue
+
+            offer_count += 1
+            if offers_to_skip > 0:
+                offers_to_skip -= 1
+                continue
+
+            offer = event['offer']
+            # Offres journalisées avant l'ajout de scrapedAt : l'horodatage de l'événement fait foi
+            if not offer.get('scrapedAt') and event.get('ts'):
+                offer = {**offer, 'scrapedAt': datetime.fromtimestamp(event['ts'] / 1000, tz=timezone.utc).isoformat()}
+            new_offers.append(offer)
+
+    next_cursor = {
+        "journal_id": journal_id,
+        "generation": generation,
+        "offset": offset,
+        "offer_count": offer_count
+    }
+    return new_offers, next_cursor
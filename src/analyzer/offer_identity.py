@@ -0,0 +1,122 @@
+import re
+import hashlib
+from urllib.parse import urlsplit, unquote_plus, quote
+
+# Même normalisation que canonicalOfferUrl() dans src/scraper/offer_identity.js :
+# les deux côtés doivent produire exactement le même identifiant (vérifié sur tests/fixtures/offer_ids.json).
+STABLE_JOB_KEYS = ['jk', 'vjk']
+
+TRACKING_PARAMS = {
+    'from', 'tk', 'bb', 'xkcb', 'fccid', 'vjs', 'advn', 'sjdu', 'acatk', 'camk',
+    'xpse', 'xfps', 'xfwr', 'rsltid', 'gclid', 'fbclid'
+}
+
+# Ports implicites retirés par new URL(), et caractères qu'il laisse tels quels dans le chemin et la requête
+DEFAULT_PORTS = {'http': 80, 'https': 443, 'ws': 80, 'wss': 443, 'ftp': 21}
+PATH_SAFE_CHARACTERS = "!$%&'()*+,/:;=@[\\]^|~"
+QUERY_SAFE_CHARACTERS = "!$%&()*+,/:;=?@[\\]^`{|}~"
+MALFORMED_ESCAPE = re.compile(r"%(?![0-9A-Fa-f]{2})")
+
+
+def decode_query_key(raw_key):
+    # decodeURIComponent échoue sur un % mal formé ou de l'UTF-8 invalide : la clé brute est alors gardée
+    if MALFORMED_ESCAPE.search(raw_key):
+        return raw_key
+    try:
+        return unquote_plus(raw_key, errors='strict')
+    except UnicodeDecodeError:
+        return raw_key
+
+
+def split_query(query_string):
+    segments = []
+    for segment in query_string.split('&'):
+        if not segment:
+            continue
+        raw_key = segment.split('=', 1)[0]
+        value = segment.split('=', 1)[1] if '=' in segment else ''
+        segments.append((decode_query_key(raw_key).lower(), value, segment))
+    return segments
+
+
+def remove_dot_segments(path):
+    # "/a/./b/../c" → "/a/c", comme le chemin normalisé de new URL()
+    output_segments = []
+    input_segments = path[1:].split('/')
+    for index, segment in enumerate(input_segments):
+        is_last = index == len(input_segments) - 1
+        if segment.lower() in ('.', '%2e'):
+            if is_last:
+                output_segments.append('')
+        elif segment.lower() in ('..', '.%2e', '%2e.', '%2e%2e'):
+            if output_segments:
+                output_segments.pop()
+            if is_last:
+                output_segments.append('')
+        else:
+            output_segments.append(segment)
+    return '/' + '/'.join(output_segments)
+
+
+def canonical_origin(parts):
+    hostname = parts.hostname
+    if not parts.scheme or not hostname:
+        raise ValueError("URL sans schéma ou sans hôte")
+
+    scheme = parts.scheme.lower()
+    host = hostname if hostname.isascii() else hostname.encode('idna').decode('ascii')
+    if ':' in host:
+        host = f"[{host}]"
+    if parts.port is not None and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    return f"{scheme}://{host}"
+
+
+def canonical_offer_url(url):
+    if not isinstance(url, str) or not url.strip():
+        return ''
+
+    stripped_url = url.strip()
+    try:
+        parts = urlsplit(stripped_url)
+        origin = canonical_origin(parts)
+    except (ValueError, UnicodeError):
+        # URL non analysable (relative, port invalide...) : l'entrée nettoyée sert d'identité, comme côté JS
+        return stripped_url
+
+    segments = split_query(quote(parts.query, safe=QUERY_SAFE_CHARACTERS))
+
+    for stable_key in STABLE_JOB_KEYS:
+        for key, value, _ in segments:
+            if key == stable_key and value:
+                return f"{origin}/viewjob?jk={value}"
+
+    kept_segments = sorted(
+        segment for key, _, segment in segments
+        if key not in TRACKING_PARAMS and not key.startswith('utm_')
+    )
+    query = f"?{'&'.join(kept_segments)}" if kept_segments else ''
+    path = remove_dot_segments(quote(parts.path or '/', safe=PATH_SAFE_CHARACTERS))
+    return f"{origin}{path}{query}"
+
+
+def compute_offer_id(url):
+    canonical_url = canonical_offer_url(url)
+    if not canonical_url:
+        return ''
+    return hashlib.sha1(canonical_url.encode('utf-8')).hexdigest()[:16]
+
+
+# Offres sans URL (ni offerId) : identité de repli, propre au fichier d'où elles sont lues
+FALLBACK_OFFER_ID_PREFIX = "sans-url-"
+
+
+def compute_fallback_offer_id(company, title, row_key):
+    # Entreprise + intitulé + ligne : deux offres sans URL restent distinctes (manifestes, fusion, archive),
+    # et le préfixe évite toute collision avec un identifiant calculé depuis une URL
+    fallback_key = "\x1f".join(str(value) for value in (company, title, row_key))
+    return FALLBACK_OFFER_ID_PREFIX + hashlib.sha1(fallback_key.encode('utf-8')).hexdigest()[:16]
+
+
+def is_fallback_offer_id(offer_id):
+    return str(offer_id).startswith(FALLBACK_OFFER_ID_PREFIX)
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import polars as pl
+
+# pyarrow (extra "polars") : colonnes texte passées à pandas en chaînes Arrow, sans objet Python par ligne
+try:
+    import pyarrow
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Valeurs lues comme manquantes par pd.read_csv : mêmes NaN, donc mêmes fichiers exportés
+PANDAS_NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"
+]
+
+
+def is_arrow_convertible(values):
+    # Chaînes Arrow, ou catégories dont toutes les valeurs sont du texte (lecture Polars, CSV pandas)
+    if isinstance(values.dtype, pd.ArrowDtype):
+        return pd.api.types.is_string_dtype(values.dtype)
+    return isinstance(values.dtype, pd.CategoricalDtype) and pd.api.types.is_string_dtype(values.cat.categories)
+
+
+def to_polars_text(values):
+    # Même texte que astype(str) côté pandas : une valeur manquante devient "nan"
+    if HAS_PYARROW and is_arrow_convertible(values):
+        return pl.from_pandas(values).cast(pl.Utf8).fill_null("nan")
+    return pl.Series(values.astype(object).where(values.notna(), "nan").to_numpy(), dtype=pl.Utf8)
+
+
+def to_pandas_categorical(values):
+    # Codes calculés par Polars sur les valeurs uniques triées, comme read_csv(dtype='category') côté pandas :
+    # seules les valeurs distinctes deviennent des chaînes Python, pas une par ligne
+    categories = values.drop_nulls().unique().sort()
+    codes = values.cast(pl.Enum(categories)).to_physical().cast(pl.Int64).fill_null(-1).to_numpy()
+    return pd.Categorical.from_codes(codes, categories=categories.to_list())
+
+
+def to_pandas_column(values):
+    if HAS_PYARROW and values.dtype == pl.Utf8:
+        return values.to_pandas(use_pyarrow_extension_array=True)
+    return values.to_numpy()
+
+
+def to_polars_pattern(pattern):
+    # re.escape échappe les espaces, que le moteur regex de Polars refuse
+    return pattern.pattern.replace("\\ ", " ")
+
+
+class PolarsBackend:
+    # Lecture CSV multithread et recherche de mots-clés dans les noyaux natifs de Polars.
+    # Le reste du filtrage (dates, exports, statistiques) reste en pandas : fichiers identiques.
+    name = "polars"
+
+    def __init__(self, school_keywords, contract_patterns, categorical_columns, chunk_size=200000):
+        self.school_keywords = school_keywords
+        self.contract_patterns = contract_patterns
+        self.categorical_columns = categorical_columns
+        self.chunk_size = chunk_size
+
+    def read_offers_csv(self, csv_path):
+        # Colonnes catégorielles lues en texte, comme pandas avec dtype='category'
+        offers = pl.read_csv(
+            csv_path, infer_schema_length=None, null_values=PANDAS_NA_VALUES,
+            schema_overrides={column: pl.Utf8 for column in self.categorical_columns}
+        )
+        # Conversion colonne par colonne, chaque colonne Polars libérée aussitôt : catégories en codes,
+        # texte en chaînes Arrow si pyarrow est installé, sans tableau d'objets intermédiaire
+        columns = {}
+        for column in list(offers.columns):
+            values = offers.drop_in_place(column)
+            columns[column] = to_pandas_categorical(values) if column in self.categorical_columns else to_pandas_column(values)
+        return pd.DataFrame(columns)
+
+    def iter_lowercase_text(self, first_values, second_values):
+        # Par blocs, comme detect_school_masks : le texte minuscule complet n'existe jamais en entier
+        for start in range(0, len(first_values), self.chunk_size):
+            end = start + self.chunk_size
+            combined_text = to_polars_text(first_values.iloc[start:end]) + " " + to_polars_text(second_values.iloc[start:end])
+            yield start, end, combined_text.str.to_lowercase()
+
+    def detect_school_masks(self, company_names, job_descriptions):
+        school_masks = np.zeros(len(company_names), dtype=np.int64)
+        for start, end, combined_text in self.iter_lowercase_text(company_names, job_descriptions):
+            for bit, keyword in enumerate(self.school_keywords):
+                school_masks[start:end] |= combined_text.str.contains(keyword, literal=True).to_numpy().astype(np.int64) << bit
+        return pd.Series(school_masks, index=company_names.index)
+
+    def detect_contract_types(self, contract_fields, job_descriptions):
+        contract_types = np.full(len(contract_fields), 'non_precise', dtype=object)
+        for start, end, combined_text in self.iter_lowercase_text(contract_fields, job_descriptions):
+            contract_masks = [
+                combined_text.str.contains(to_polars_pattern(contract_pattern)).to_numpy()
+                for contract_pattern in self.contract_patterns.values()
+            ]
+            # Premier type trouvé dans l'ordre de priorité, comme detect_contract_type
+            contract_types[start:end] = np.select(contract_masks, list(self.contract_patterns), default='non_precise')
+        return contract_types
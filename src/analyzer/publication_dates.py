@@ -0,0 +1,40 @@
+import pandas as pd
+
+# Texte relatif affiché par le site ("Publiée il y a 3 jours", "Employeur actif il y a 30+ jours",
+# "Publiée aujourd'hui"...) converti en date absolue à partir de l'heure du scraping.
+# "30+ jours" est pris comme 30 jours : c'est un minimum, l'offre peut être plus ancienne.
+RELATIVE_AGE_PATTERN = (
+    r"(?P<amount>\d+)\s*\+?\s*"
+    r"(?P<unit>minutes?|min|heures?|hours?|h|jours?|days?|j|semaines?|weeks?|mois|months?)\b"
+)
+SAME_DAY_PATTERN = r"aujourd'hui|aujourd’hui|à l'instant|à l’instant|today|just posted|instant"
+YESTERDAY_PATTERN = r"\bhier\b|yesterday"
+
+UNIT_SECONDS = {
+    'minute': 60, 'minutes': 60, 'min': 60,
+    'heure': 3600, 'heures': 3600, 'hour': 3600, 'hours': 3600, 'h': 3600,
+    'jour': 86400, 'jours': 86400, 'day': 86400, 'days': 86400, 'j': 86400,
+    'semaine': 604800, 'semaines': 604800, 'week': 604800, 'weeks': 604800,
+    'mois': 2592000, 'month': 2592000, 'months': 2592000
+}
+
+
+def parse_scraped_at(scraped_at_values, fallback_time):
+    scraped_at = pd.to_datetime(scraped_at_values, utc=True, errors='coerce', format='ISO8601')
+    return scraped_at.fillna(fallback_time)
+
+
+def parse_published_dates(published_texts, scraped_at):
+    # Vectorisé : une extraction regex sur toute la colonne, pas de parsing ligne par ligne
+    lowered_texts = published_texts.astype(str).str.lower()
+    relative_ages = lowered_texts.str.extract(RELATIVE_AGE_PATTERN)
+
+    age_seconds = pd.to_numeric(relative_ages['amount'], errors='coerce') * relative_ages['unit'].map(UNIT_SECONDS)
+    age_seconds = age_seconds.mask(age_seconds.isna() & lowered_texts.str.contains(SAME_DAY_PATTERN, regex=True), 0)
+    age_seconds = age_seconds.mask(age_seconds.isna() & lowered_texts.str.contains(YESTERDAY_PATTERN, regex=True), 86400)
+
+    return scraped_at - pd.to_timedelta(age_seconds, unit='s')
+
+
+def compute_age_days(published_at, reference_time):
+    return (reference_time - published_at).dt.total_seconds() / 86400
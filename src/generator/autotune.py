@@ -0,0 +1,220 @@
+import os
+import re
+import sys
+import time
+import statistics
+from generate_letters import (
+    Colors, colored, DEFAULT_INPUT_CSV, OLLAMA_MODEL,
+    load_candidate_profile, load_offer_records, iter_descriptions,
+    build_description_excerpt, create_prompt, is_valid_letter
+)
+from ollama_client import OllamaClient, OLLAMA_HOST
+
+ENV_PATH = ".env"
+DEFAULT_SAMPLE_SIZE = 5
+DEFAULT_MIN_ACCEPTANCE = 0.8
+
+
+def load_sample_prompts(csv_path, profile, sample_size):
+    # Toujours les N premières offres du fichier : chaque modèle reçoit exactement les mêmes prompts
+    offer_records = load_offer_records(csv_path)
+    sample_positions = range(min(sample_size, len(offer_records)))
+
+    prompts = []
+    for index, description in iter_descriptions(csv_path, sample_positions):
+        job_offer = {**offer_records[index]._asdict(), 'description': description}
+        prompts.append(create_prompt(job_offer, profile, build_description_excerpt(job_offer, profile)))
+    return prompts
+
+
+def benchmark_model(model, prompts, host):
+    client = OllamaClient(model, host=host)
+    generations = []
+    errors = 0
+
+    try:
+        # Chargement mesuré à part : avec keep_alive il n'est payé qu'une fois par run
+        load_start = time.perf_counter()
+        client.warm_up()
+        load_seconds = time.perf_counter() - load_start
+
+        for prompt in prompts:
+            try:
+                generations.append(client.generate(prompt))
+            except (RuntimeError, OSError, ValueError):
+                errors += 1
+    finally:
+        client.close()
+
+    accepted_letters = sum(1 for generation in generations if is_valid_letter(generation['text']))
+    busy_seconds = sum(generation['total_seconds'] for generation in generations)
+
+    return {
+        'model': model,
+        'load_seconds': load_seconds,
+        'ttft': statistics.median(generation['ttft'] for generation in generations) if generations else None,
+        'tokens_per_second': statistics.fmean(generation['tokens_per_second'] for generation in generations) if generations else 0.0,
+        'latency': statistics.fmean(generation['total_seconds'] for generation in generations) if generations else None,
+        'acceptance': accepted_letters / len(prompts),
+        'errors': errors,
+        # Lettres valides par heure de génération : une lettre rejetée coûte son temps sans rien rapporter
+        'letters_per_hour': accepted_letters * 3600 / busy_seconds if busy_seconds > 0 else 0.0
+    }
+
+
+def choose_model(results, target_per_hour=None, min_acceptance=DEFAULT_MIN_ACCEPTANCE):
+    candidates = [result for result in results if result['acceptance'] >= min_acceptance]
+    if not candidates:
+        return None, f"aucun modèle n'atteint {min_acceptance:.0%} de lettres valides"
+
+    if target_per_hour is None:
+        return max(candidates, key=lambda result: result['letters_per_hour']), "meilleur débit de lettres valides"
+
+    # Parmi les modèles assez rapides, le plus fiable ; sinon le plus rapide, objectif non atteint
+    fast_enough = [result for result in candidates if result['letters_per_hour'] >= target_per_hour]
+    if fast_enough:
+        best = max(fast_enough, key=lambda result: (result['acceptance'], result['letters_per_hour']))
+        return best, f"objectif de {target_per_hour:g} lettres/h atteint, meilleur taux d'acceptation"
+
+    best = max(candidates, key=lambda result: result['letters_per_hour'])
+    return best, f"objectif de {target_per_hour:g} lettres/h non atteint : modèle le plus rapide"
+
+
+def write_env_value(key, value, env_path=ENV_PATH):
+    env_lines = []
+    if os.path.exists(env_path):
+        with open(env_path, 'r', encoding='utf-8') as env_file:
+            env_lines = env_file.read().splitlines()
+
+    key_pattern = re.compile(rf"^\s*{re.escape(key)}\s*=")
+    updated_lines = [f"{key}={value}" if key_pattern.match(line) else line for line in env_lines]
+    if not any(key_pattern.match(line) for line in env_lines):
+        updated_lines.append(f"{key}={value}")
+
+    with open(env_path, 'w', encoding='utf-8') as env_file:
+        env_file.write("\n".join(updated_lines) + "\n")
+
+
+def format_seconds(seconds):
+    return f"{seconds:.2f}s" if seconds is not None else "—"
+
+
+def print_results(results, recommended):
+    print(colored(f"\n  {'Modèle':<28} {'Chargement':>10} {'TTFT':>8} {'Tokens/s':>9} {'Latence':>8} {'Valides':>8} {'Lettres/h':>10}", Colors.BOLD))
+    print(colored("  " + "─" * 87, Colors.GRAY))
+
+    for result in results:
+        line = (
+            f"  {result['model']:<28} {format_seconds(result['load_seconds']):>10} {format_seconds(result['ttft']):>8} "
+            f"{result['tokens_per_second']:>9.1f} {format_seconds(result['latency']):>8} "
+            f"{result['acceptance']:>8.0%} {result['letters_per_hour']:>10.0f}"
+        )
+        if recommended is not None and result['model'] == recommended['model']:
+            print(colored(line, Colors.GREEN + Colors.BOLD))
+        else:
+            print(line)
+        if result['errors']:
+            print(colored(f"      ⚠️  {result['errors']} génération(s) en erreur", Colors.YELLOW))
+
+
+def run_autotune(csv_path, sample_size, models=None, target_per_hour=None,
+                 min_acceptance=DEFAULT_MIN_ACCEPTANCE, write_env=False, host=OLLAMA_HOST):
+    print(colored("\n  🎛️  AUTOTUNE DU MODÈLE OLLAMA", Colors.BOLD + Colors.PURPLE))
+    print(colored("─" * 70, Colors.GRAY))
+
+    if not os.path.exists(csv_path):
+        print(colored(f"\n❌ ERREUR : Fichier introuvable", Colors.RED + Colors.BOLD))
+        print(colored(f"   Chemin : {csv_path}\n", Colors.RED))
+        return None
+
+    profile = load_candidate_profile()
+    prompts = load_sample_prompts(csv_path, profile, sample_size)
+    if not prompts:
+        print(colored("\n⚠️  Aucune offre dans l'échantillon\n", Colors.YELLOW))
+        return None
+
+    backend = OllamaClient(OLLAMA_MODEL, host=host)
+    if not backend.is_available():
+        print(colored(f"\n❌ ERREUR : Ollama injoignable sur {host}\n", Colors.RED + Colors.BOLD))
+        return None
+    models = models or backend.list_models()
+    backend.close()
+
+    if not models:
+        print(colored("\n⚠️  Aucun modèle installé (ollama pull <modèle>)\n", Colors.YELLOW))
+        return None
+
+    print(colored(f"  🌐 Backend : ", Colors.BOLD) + colored(host, Colors.GRAY))
+    print(colored(f"  📂 Échantillon : ", Colors.BOLD) + colored(f"{len(prompts)} offres de {csv_path}", Colors.CYAN))
+    print(colored(f"  🤖 Modèles : ", Colors.BOLD) + colored(", ".join(models), Colors.CYAN))
+
+    results = []
+    for model in models:
+        print(colored(f"  ⏱️  {model}...", Colors.GRAY), flush=True)
+        try:
+            results.append(benchmark_model(model, prompts, host))
+        except (RuntimeError, OSError, ValueError) as error:
+            # Modèle inutilisable (embedding, fichier corrompu...) : signalé puis ignoré
+            print(colored(f"      ⚠️  {model} ignoré : {error}", Colors.YELLOW))
+
+    if not results:
+        print(colored("\n⚠️  Aucun modèle n'a pu être mesuré\n", Colors.YELLOW))
+        return None
+
+    recommended, reason = choose_model(results, target_per_hour, min_acceptance)
+    print_results(results, recommended)
+
+    if recommended is None:
+        print(colored(f"\n  ⚠️  Pas de recommandation : {reason}\n", Colors.YELLOW))
+        return None
+
+    print(colored(f"\n  ✅ Modèle recommandé : ", Colors.BOLD) + colored(recommended['model'], Colors.GREEN + Colors.BOLD) +
+          colored(f" ({reason})", Colors.GRAY))
+
+    if write_env:
+        write_env_value("OLLAMA_MODEL", recommended['model'])
+        print(colored(f"  💾 OLLAMA_MODEL={recommended['model']} écrit dans {ENV_PATH}\n", Colors.GREEN))
+    else:
+        print(colored(f"  💡 Pour l'utiliser : OLLAMA_MODEL={recommended['model']} dans .env (ou --write)\n", Colors.GRAY))
+
+    return recommended
+
+
+def parse_arguments(arguments):
+    options = {'csv_path': DEFAULT_INPUT_CSV, 'sample_size': DEFAULT_SAMPLE_SIZE, 'models': None,
+               'target_per_hour': None, 'min_acceptance': DEFAULT_MIN_ACCEPTANCE, 'write_env': False}
+
+    remaining_arguments = list(arguments)
+    while remaining_arguments:
+        argument = remaining_arguments.pop(0)
+        if argument == "--sample":
+            options['sample_size'] = int(remaining_arguments.pop(0))
+        elif argument == "--models":
+            options['models'] = [model.strip() for model in remaining_arguments.pop(0).split(',') if model.strip()]
+        elif argument == "--target":
+            options['target_per_hour'] = float(remaining_arguments.pop(0))
+        elif argument == "--min-acceptance":
+            options['min_acceptance'] = float(remaining_arguments.pop(0))
+        elif argument == "--write":
+            options['write_env'] = True
+        else:
+            options['csv_path'] = argument
+    return options
+
+
+if __name__ == "__main__":
+    # Usage : python src/generator/autotune.py [csv] [--sample 5] [--models a,b] [--target 300]
+    #         [--min-acceptance 0.8] [--write]
+    try:
+        try:
+            options = parse_arguments(sys.argv[1:])
+        except (IndexError, ValueError):
+            print(colored("\n❌ Arguments invalides : [csv] [--sample N] [--models a,b] [--target N] "
+                          "[--min-acceptance 0.8] [--write]\n", Colors.RED + Colors.BOLD))
+            sys.exit(1)
+
+        recommended_model = run_autotune(**options)
+        sys.exit(0 if recommended_model else 1)
+    except KeyboardInterrupt:
+        print(colored("\n\n⚠️  Interruption par l'utilisateur\n", Colors.YELLOW))
+        sys.exit(0)
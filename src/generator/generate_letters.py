@@ -1,17 +1,36 @@
 import os
 import sys
+import glob
 import time
 import json
-import subprocess
+import shutil
+import socket
 import pandas as pd
 from dotenv import load_dotenv
+from analyzer.offer_identity import compute_offer_id, compute_fallback_offer_id, is_fallback_offer_id
+from letter_store import PackedLetterStore, build_letter_filename
+from ollama_client import OllamaClient
+from prompt_compression import compress_description, estimate_tokens
+from retry_queue import RetryQueue, RETRY_QUEUE_FILENAME, parse_max_attempts
+from sharding import (
+    SHARDS_FOLDER_NAME, DONE_STATUSES, ShardManifest,
+    parse_shard_spec, offer_shard, shard_folder, read_manifest
+)
 
 load_dotenv()
 
 INPUT_CSV = os.getenv("CSV_OUTPUT", "data/input/offres.csv")
 OUTPUT_FOLDER = os.getenv("LETTERS_FOLDER", "data/output/letters")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2:latest")
+LETTERS_BACKEND = os.getenv("LETTERS_BACKEND", "files")
+PROMPT_DESCRIPTION_TOKENS = int(os.getenv("PROMPT_DESCRIPTION_TOKENS", "200"))
+RETRY_MAX_ATTEMPTS = parse_max_attempts(os.getenv("RETRY_MAX_ATTEMPTS"))
+RETRY_BASE_DELAY_MINUTES = float(os.getenv("RETRY_BASE_DELAY_MINUTES", "15"))
 PROFILE_PATH = "data/candidate_profile.json"
+DEFAULT_INPUT_CSV = "data/output/filtered/offres_alternance.csv"
+MIN_LETTER_LENGTH = 180
+LETTER_COLUMNS = ['company', 'title', 'location', 'url', 'offerId']
+DESCRIPTION_CHUNK_SIZE = 1000
 
 
 class Colors:
@@ -54,17 +73,12 @@ def print_progress_bar(current, total, label="", bar_width=40):
 
 
 def check_ollama_available():
+    # Même API HTTP que la génération (OLLAMA_HOST), pas le binaire ollama en local
+    client = OllamaClient(OLLAMA_MODEL)
     try:
-        result = subprocess.run(
-            ["ollama", "list"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            timeout=5
-        )
-        return result.returncode == 0
-    except (subprocess.TimeoutExpired, FileNotFoundError):
-        return False
+        return client.is_available()
+    finally:
+        client.close()
 
 
 def load_candidate_profile():
@@ -101,7 +115,19 @@ def select_relevant_projects(profile, job_description, max_projects=2):
     return [proj for score, proj in scored_projects[:max_projects]]
 
 
-def create_prompt(job_offer, profile):
+def build_description_excerpt(job_offer, profile):
+    return compress_description(
+        job_offer['description'],
+        job_offer['title'],
+        profile.get('stack', ''),
+        PROMPT_DESCRIPTION_TOKENS
+    )
+
+
+def create_prompt(job_offer, profile, description_excerpt=None):
+    if description_excerpt is None:
+        description_excerpt = build_description_excerpt(job_offer, profile)
+
     relevant_projects = select_relevant_projects(profile, job_offer['description'])
 
     projects_text = ""
@@ -119,8 +145,8 @@ def create_prompt(job_offer, profile):
 OFFRE D'EMPLOI :
 Entreprise : {job_offer['company']}
 Poste : {job_offer['title']}
-Localisation : {job_offer.get('location', 'Non précisé')}
-Description : {job_offer['description'][:900]}
+Localisation : {job_offer.get('location') or 'Non précisé'}
+Description : {description_excerpt}
 
 PROFIL DU CANDIDAT :
 Nom : {profile['nom']}
@@ -175,44 +201,35 @@ Rédige la lettre maintenant."""
     return prompt
 
 
-def generate_letter_with_ollama(prompt, max_retries=3):
+def is_valid_letter(generated_text):
+    return bool(generated_text) and len(generated_text.strip()) >= MIN_LETTER_LENGTH
+
+
+def generate_letter_with_ollama(prompt, client, max_retries=3):
+    # Renvoie (lettre, None) ou (None, raison du dernier échec) pour la file de reprise.
+    # Même chemin que autotune et serve : API HTTP keep-alive, modèle gardé chargé entre deux lettres.
+    failure_reason = None
     for attempt in range(max_retries):
         try:
-            result = subprocess.run(
-                ["ollama", "run", OLLAMA_MODEL],
-                input=prompt,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                timeout=60
-            )
-
-            if result.returncode == 0 and result.stdout.strip():
-                generated_text = result.stdout.strip()
-                if len(generated_text) >= 180:
-                    return generated_text
-
-        except subprocess.TimeoutExpired:
+            generation = client.generate(prompt)
+        except socket.timeout:
+            failure_reason = "timeout"
             if attempt < max_retries - 1:
                 time.sleep(2)
-                continue
-        except Exception:
-            pass
-
-    return None
+            continue
+        except (RuntimeError, OSError) as error:
+            failure_reason = str(error)
+            continue
 
+        if is_valid_letter(generation['text']):
+            return generation['text'], None
+        failure_reason = f"lettre trop courte ({len(generation['text'])} caractères)"
 
-def sanitize_filename(text, max_length=50):
-    sanitized = "".join(char for char in str(text) if char.isalnum() or char in (' ', '_', '-'))
-    sanitized = sanitized.strip().replace(" ", "_")
-    return sanitized[:max_length]
+    return None, failure_reason
 
 
-def save_letter(letter_content, company_name, job_title, output_folder):
-    safe_company = sanitize_filename(company_name)
-    safe_title = sanitize_filename(job_title, 40)
-
-    filename = f"lettre_{safe_company}_{safe_title}.txt"
+def save_letter(letter_content, company_name, job_title, output_folder, offer_id=''):
+    filename = build_letter_filename(company_name, job_title, offer_id)
     file_path = os.path.join(output_folder, filename)
 
     with open(file_path, 'w', encoding='utf-8') as letter_file:
@@ -221,7 +238,44 @@ def save_letter(letter_content, company_name, job_title, output_folder):
     return filename
 
 
-def generate_letters_for_offers(csv_path):
+def load_offer_records(csv_path):
+    # Colonnes utiles uniquement, sans la description : elle n'est lue que pour les offres à générer
+    offers = pd.read_csv(csv_path, usecols=lambda column: column in LETTER_COLUMNS, dtype=str, keep_default_na=False)
+    for column in LETTER_COLUMNS:
+        if column not in offers.columns:
+            offers[column] = ''
+    return list(offers[LETTER_COLUMNS].itertuples(index=False, name='OfferRecord'))
+
+
+def compute_offer_ids(offer_records):
+    # offerId du CSV, sinon hash de l'URL ; sans URL, identité de repli par ligne : ces offres ne partagent
+    # jamais la clé '' dans les manifestes, la fusion des shards ou l'archive
+    return [
+        offer_record.offerId or compute_offer_id(offer_record.url)
+        or compute_fallback_offer_id(offer_record.company, offer_record.title, position)
+        for position, offer_record in enumerate(offer_records)
+    ]
+
+
+def iter_descriptions(csv_path, row_positions):
+    # Relit la seule colonne description par blocs et ne garde que les lignes demandées (positions croissantes)
+    wanted_positions = iter(row_positions)
+    next_position = next(wanted_positions, None)
+    row_offset = 0
+
+    description_chunks = pd.read_csv(
+        csv_path, usecols=['description'], dtype=str, keep_default_na=False, chunksize=DESCRIPTION_CHUNK_SIZE
+    )
+    for chunk in description_chunks:
+        while next_position is not None and next_position < row_offset + len(chunk):
+            yield next_position, chunk['description'].iat[next_position - row_offset]
+            next_position = next(wanted_positions, None)
+        if next_position is None:
+            return
+        row_offset += len(chunk)
+
+
+def generate_letters_for_offers(csv_path, shard=None, retry_only=False):
     print_header()
 
     profile = load_candidate_profile()
@@ -244,16 +298,59 @@ def generate_letters_for_offers(csv_path):
 
     print(colored(f"\n  📂 Source : ", Colors.BOLD) + colored(csv_path, Colors.GRAY))
 
-    offers_dataframe = pd.read_csv(csv_path)
-    total_offers = len(offers_dataframe)
+    offer_records = load_offer_records(csv_path)
+    offer_ids = compute_offer_ids(offer_records)
+    output_folder = OUTPUT_FOLDER
+    shard_manifest = None
+    completed_offer_ids = set()
+
+    if shard is not None:
+        shard_index, shard_count = shard
+        offer_positions = [
+            position for position, offer_id in enumerate(offer_ids)
+            if offer_shard(offer_id, shard_count) == shard_index
+        ]
+        output_folder = shard_folder(OUTPUT_FOLDER, shard_index, shard_count)
+        # Relance du shard : les offres déjà terminées d'après le manifeste sont sautées, quel que soit le backend
+        previous_manifest = read_manifest(output_folder)
+        if previous_manifest is not None:
+            completed_offer_ids = {
+                offer_id for offer_id, status in previous_manifest['statuses'].items() if status in DONE_STATUSES
+            }
+        shard_manifest = ShardManifest(output_folder)
+        shard_manifest.start(
+            shard_index, shard_count, csv_path, OLLAMA_MODEL,
+            dict.fromkeys(offer_ids[position] for position in offer_positions)
+        )
+        print(colored(f"  🧩 Shard : ", Colors.BOLD) +
+              colored(f"{shard_index}/{shard_count} → {len(offer_positions)} offres sur {len(offer_records)}", Colors.CYAN))
+    else:
+        offer_positions = range(len(offer_records))
+
+    retry_queue = RetryQueue(os.path.join(output_folder, RETRY_QUEUE_FILENAME), RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY_MINUTES)
+    if retry_only:
+        # Reprise seule : uniquement les offres en échec dont le délai de backoff est écoulé
+        due_offer_ids = retry_queue.due_keys()
+        offer_positions = [position for position in offer_positions if offer_ids[position] in due_offer_ids]
+        print(colored(f"  🔁 Reprise : ", Colors.BOLD) +
+              colored(f"{len(offer_positions)} offres à retenter ({len(due_offer_ids)} dues dans la file)", Colors.CYAN))
+
+    total_offers = len(offer_positions)
 
     if total_offers == 0:
+        if shard_manifest is not None:
+            shard_manifest.finish({'generated': 0, 'failed': 0, 'skipped': 0, 'deferred': 0})
         print(colored("\n⚠️  Aucune offre à traiter\n", Colors.YELLOW))
         return
 
     print(colored(f"  📊 Offres à traiter : ", Colors.BOLD) + colored(str(total_offers), Colors.GREEN))
 
-    os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+    os.makedirs(output_folder, exist_ok=True)
+    letter_store = PackedLetterStore(output_folder) if LETTERS_BACKEND == "packed" else None
+
+    if letter_store is not None:
+        print(colored(f"  📦 Stockage : ", Colors.BOLD) +
+              colored(f"archive {letter_store.data_path} ({len(letter_store)} lettres)", Colors.GRAY))
 
     print("\n" + colored("─" * 70, Colors.GRAY))
     print(colored("  ✍️  GÉNÉRATION DES LETTRES EN COURS", Colors.BOLD + Colors.PURPLE))
@@ -261,24 +358,103 @@ def generate_letters_for_offers(csv_path):
 
     successful_generations = 0
     failed_generations = 0
+    skipped_offers = 0
+    deferred_offers = 0
+    processed_offer_ids = set()
+    prompt_tokens = []
+    description_tokens_before = 0
+    description_tokens_after = 0
     start_time = time.time()
-
-    for index, job_offer in offers_dataframe.iterrows():
-        print_progress_bar(index, total_offers, "lettres")
-
-        prompt = create_prompt(job_offer, profile)
-        generated_letter = generate_letter_with_ollama(prompt)
+    # Une connexion pour tout le run : le modèle n'est chargé qu'une fois (OLLAMA_KEEP_ALIVE)
+    ollama_client = OllamaClient(OLLAMA_MODEL)
+
+    offer_ids_to_generate = {}
+    for position in offer_positions:
+        offer_id = offer_ids[position]
+
+        # Doublon dans le fichier, ou lettre déjà présente dans l'archive
+        if offer_id in processed_offer_ids:
+            skipped_offers += 1
+            continue
+        processed_offer_ids.add(offer_id)
+
+        if offer_id in completed_offer_ids:
+            skipped_offers += 1
+            continue
+
+        if letter_store is not None and offer_id in letter_store:
+            skipped_offers += 1
+            if shard_manifest is not None:
+                shard_manifest.record_offer(offer_id, 'archived')
+            continue
+
+        # Échec récent encore en backoff (reportée), ou abandonné après RETRY_MAX_ATTEMPTS : pas d'appel LLM
+        if not retry_queue.is_due(offer_id):
+            deferred_offers += 1
+            if shard_manifest is not None:
+                shard_manifest.record_offer(offer_id, 'failed' if retry_queue.is_dead(offer_id) else 'deferred')
+            continue
+        offer_ids_to_generate[position] = offer_id
+
+    for generated_count, (index, description) in enumerate(iter_descriptions(csv_path, offer_ids_to_generate)):
+        print_progress_bar(skipped_offers + deferred_offers + generated_count, total_offers, "lettres")
+
+        offer_id = offer_ids_to_generate[index]
+        job_offer = {**offer_records[index]._asdict(), 'description': description}
+
+        description_excerpt = build_description_excerpt(job_offer, profile)
+        prompt = create_prompt(job_offer, profile, description_excerpt)
+        prompt_tokens.append(estimate_tokens(prompt))
+        description_tokens_before += estimate_tokens(job_offer['description'])
+        description_tokens_after += estimate_tokens(description_excerpt)
+        generated_letter, failure_reason = generate_letter_with_ollama(prompt, ollama_client)
 
         if generated_letter:
-            save_letter(
-                generated_letter,
-                job_offer.get('company', f'entreprise_{index}'),
-                job_offer.get('title', f'poste_{index}'),
-                OUTPUT_FOLDER
-            )
+            letter_filename = None
+            if letter_store is not None:
+                letter_store.append_letter(
+                    generated_letter,
+                    offer_id,
+                    job_offer['url'],
+                    job_offer['company'],
+                    job_offer['title'],
+                    OLLAMA_MODEL,
+                    prompt
+                )
+            else:
+                # Entreprise ou intitulé manquant : valeur de remplacement dans le nom de fichier seulement
+                letter_filename = save_letter(
+                    generated_letter,
+                    job_offer['company'] or f'entreprise_{index}',
+                    job_offer['title'] or f'poste_{index}',
+                    output_folder,
+                    offer_id
+                )
             successful_generations += 1
+            if not is_fallback_offer_id(offer_id):
+                retry_queue.record_success(offer_id)
+            if shard_manifest is not None:
+                shard_manifest.record_offer(offer_id, 'generated', letter_filename)
         else:
             failed_generations += 1
+            # Sans URL, l'identité de repli dépend de la ligne du fichier : pas de file de reprise entre deux runs
+            if not is_fallback_offer_id(offer_id):
+                retry_queue.record_failure(
+                    offer_id, failure_reason, url=job_offer['url'], company=job_offer['company'], title=job_offer['title']
+                )
+            if shard_manifest is not None:
+                shard_manifest.record_offer(offer_id, 'failed')
+
+    ollama_client.close()
+    retry_queue.compact()
+
+    if shard_manifest is not None:
+        shard_manifest.finish({
+            'generated': successful_generations,
+            'failed': failed_generations,
+            'skipped': skipped_offers,
+            'deferred': deferred_offers
+        })
 
     print_progress_bar(total_offers, total_offers, "lettres")
     print("\n")
@@ -294,22 +470,191 @@ def generate_letters_for_offers(csv_path):
     print(
         f"  Lettres générées  : {colored(str(successful_generations), Colors.GREEN + Colors.BOLD)} ({successful_generations / total_offers * 100:.1f}%)")
 
+    if skipped_offers > 0:
+        print(f"  Déjà traitées     : {colored(str(skipped_offers), Colors.GRAY + Colors.BOLD)}")
+
     if failed_generations > 0:
         print(
             f"  Échecs            : {colored(str(failed_generations), Colors.RED + Colors.BOLD)} ({failed_generations / total_offers * 100:.1f}%)")
 
+    if deferred_offers > 0:
+        print(f"  Reportées         : {colored(str(deferred_offers), Colors.YELLOW + Colors.BOLD)} (échecs en attente de reprise)")
+
+    retry_counts = retry_queue.counts()
+    if retry_counts['pending'] or retry_counts['dead']:
+        print(
+            f"  File de reprise   : {colored(str(retry_counts['pending']), Colors.YELLOW)} en attente, "
+            f"{colored(str(retry_counts['dead']), Colors.RED)} abandonnées ({retry_queue.path})")
+
     print(
         f"  Temps écoulé      : {colored(f'{elapsed_time}s', Colors.CYAN)} ({elapsed_time / total_offers:.1f}s/lettre)")
 
+    if prompt_tokens:
+        print(
+            f"  Tokens prompt     : {colored(f'{sum(prompt_tokens) / len(prompt_tokens):.0f}', Colors.CYAN)} en moyenne, "
+            f"{sum(prompt_tokens)} au total (estimation)")
+        print(
+            f"  Descriptions      : {description_tokens_before} → {colored(str(description_tokens_after), Colors.CYAN)} tokens "
+            f"(budget {PROMPT_DESCRIPTION_TOKENS}/offre)")
+
     print("\n" + colored("═" * 70, Colors.GREEN))
     print(colored("\n  ✅ GÉNÉRATION TERMINÉE !", Colors.GREEN + Colors.BOLD))
-    print(colored(f"  📁 Lettres disponibles : {OUTPUT_FOLDER}\n", Colors.BLUE))
+    print(colored(f"  📁 Lettres disponibles : {output_folder}\n", Colors.BLUE))
+    if shard is not None:
+        print(colored(f"  🧩 Une fois tous les shards terminés : python src/generator/generate_letters.py merge {csv_path}\n", Colors.GRAY))
+
+
+def merge_shard_outputs(csv_path, shards_root):
+    print_header()
+
+    if not os.path.exists(csv_path):
+        print(colored(f"\n❌ ERREUR : Fichier introuvable", Colors.RED + Colors.BOLD))
+        print(colored(f"   Chemin : {csv_path}\n", Colors.RED))
+        return
+
+    shard_folders = sorted(glob.glob(os.path.join(shards_root, "shard-*-of-*")))
+    shard_counts = {int(os.path.basename(folder).rsplit("-of-", 1)[1]) for folder in shard_folders}
+    if len(shard_counts) != 1:
+        print(colored(f"\n❌ ERREUR : {len(shard_counts)} découpages trouvés dans {shards_root} (un seul attendu)\n",
+                      Colors.RED + Colors.BOLD))
+        return
+    shard_count = shard_counts.pop()
+
+    offers_by_id = {}
+    offer_records = load_offer_records(csv_path)
+    for offer_id, offer_record in zip(compute_offer_ids(offer_records), offer_records):
+        offers_by_id.setdefault(offer_id, offer_record)
+
+    print(colored(f"  📂 Source : ", Colors.BOLD) + colored(f"{csv_path} ({len(offers_by_id)} offres)", Colors.GRAY))
+    print(colored(f"  🧩 Shards : ", Colors.BOLD) + colored(f"{shards_root} ({shard_count} attendus)", Colors.GRAY) + "\n")
+
+    os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+    letter_store = PackedLetterStore(OUTPUT_FOLDER) if LETTERS_BACKEND == "packed" else None
+    offer_statuses = {}
+    present_shards = set()
+    unfinished_shards = []
+    merged_offer_ids = set()
+    merged_letters = 0
+
+    for folder in shard_folders:
+        shard_index = int(os.path.basename(folder).split("-")[1])
+        manifest = read_manifest(folder)
+        if manifest is None:
+            continue
+
+        present_shards.add(shard_index)
+        offer_statuses.update(manifest['statuses'])
+        if not manifest['finished']:
+            unfinished_shards.append(shard_index)
+
+        if letter_store is not None:
+            for record in PackedLetterStore(folder).iter_letters():
+                if record['offer_id'] not in letter_store:
+                    letter_store.append_record(record)
+                    merged_letters += 1
+        else:
+            # Une lettre par offerId : deux offres homonymes ne s'écrasent pas, une offre n'est copiée qu'une fois
+            for offer_id, letter_filename in manifest['letters'].items():
+                letter_path = os.path.join(folder, letter_filename)
+                if offer_id in merged_offer_ids or not os.path.exists(letter_path):
+                    continue
+                target_filename = letter_filename
+                if offer_id and not letter_filename.endswith(f"_{offer_id}.txt"):
+                    target_filename = letter_filename[:-len(".txt")] + f"_{offer_id}.txt"
+                shutil.copy2(letter_path, os.path.join(OUTPUT_FOLDER, target_filename))
+                merged_offer_ids.add(offer_id)
+                merged_letters += 1
+
+        shard_statuses = list(manifest['statuses'].values())
+        run_state = "" if manifest['finished'] else colored(" (run inachevé)", Colors.YELLOW)
+        print(f"  🧩 Shard {manifest['shard']:<7} {colored(manifest['host'], Colors.CYAN)} [{manifest['model']}] : "
+              f"{shard_statuses.count('generated')} générées, {shard_statuses.count('failed')} échecs, "
+              f"{shard_statuses.count('deferred')} reportées{run_state}")
+
+    missing_shards = [index for index in range(1, shard_count + 1) if index not in present_shards]
+    failed_offer_ids = [offer_id for offer_id in offers_by_id if offer_statuses.get(offer_id) == 'failed']
+    deferred_offer_ids = [offer_id for offer_id in offers_by_id if offer_statuses.get(offer_id) == 'deferred']
+    missing_offer_ids = [
+        offer_id for offer_id in offers_by_id
+        if offer_statuses.get(offer_id) not in DONE_STATUSES + ('failed', 'deferred')
+    ]
+
+    def describe_offers(selected_offer_ids):
+        return [
+            {
+                'offerId': offer_id,
+                'shard': offer_shard(offer_id, shard_count),
+                'company': offers_by_id[offer_id].company,
+                'title': offers_by_id[offer_id].title,
+                'url': offers_by_id[offer_id].url
+            }
+            for offer_id in selected_offer_ids
+        ]
+
+    merge_report = {
+        'source': csv_path,
+        'shard_count': shard_count,
+        'missing_shards': missing_shards,
+        'unfinished_shards': unfinished_shards,
+        'failed': describe_offers(failed_offer_ids),
+        'deferred': describe_offers(deferred_offer_ids),
+        'missing': describe_offers(missing_offer_ids)
+    }
+    report_path = os.path.join(shards_root, "merge_report.json")
+    with open(report_path, 'w', encoding='utf-8') as report_file:
+        json.dump(merge_report, report_file, ensure_ascii=False, indent=2)
+
+    print("\n" + colored("═" * 70, Colors.GREEN))
+    print(colored("  📊 FUSION DES SHARDS", Colors.GREEN + Colors.BOLD))
+    print(colored("═" * 70, Colors.GREEN))
+    print(f"\n  Lettres fusionnées : {colored(str(merged_letters), Colors.GREEN + Colors.BOLD)}")
+    print(f"  Échecs             : {colored(str(len(failed_offer_ids)), Colors.RED + Colors.BOLD)}")
+    print(f"  Reportées          : {colored(str(len(deferred_offer_ids)), Colors.YELLOW + Colors.BOLD)} (en attente de reprise)")
+    print(f"  Offres manquantes  : {colored(str(len(missing_offer_ids)), Colors.YELLOW + Colors.BOLD)}")
+
+    if missing_shards:
+        print(colored(f"  ⚠️  Shards absents : {', '.join(f'{index}/{shard_count}' for index in missing_shards)}", Colors.YELLOW))
+    if unfinished_shards:
+        print(colored(f"  ⚠️  Shards inachevés : {', '.join(f'{index}/{shard_count}' for index in unfinished_shards)}", Colors.YELLOW))
+
+    for status, offer in [("échec", offer) for offer in merge_report['failed'][:10]] + \
+                         [("reportée", offer) for offer in merge_report['deferred'][:10]] + \
+                         [("manquante", offer) for offer in merge_report['missing'][:10]]:
+        print(colored(f"     • [{offer['shard']}/{shard_count}] {status} : {offer['title']} — {offer['company']}", Colors.GRAY))
+
+    print(colored(f"\n  📁 Lettres disponibles : {OUTPUT_FOLDER}", Colors.BLUE))
+    print(colored(f"  📝 Rapport détaillé : {report_path}\n", Colors.BLUE))
 
 
 if __name__ == "__main__":
     try:
-        target_csv = sys.argv[1] if len(sys.argv) > 1 else "data/output/filtered/offres_alternance.csv"
-        generate_letters_for_offers(target_csv)
+        arguments = sys.argv[1:]
+
+        # merge [csv] [dossier_shards] : fusionne les sorties des shards et liste les offres manquantes
+        if arguments and arguments[0] == "merge":
+            merge_csv = arguments[1] if len(arguments) > 1 else DEFAULT_INPUT_CSV
+            shards_root = arguments[2] if len(arguments) > 2 else os.path.join(OUTPUT_FOLDER, SHARDS_FOLDER_NAME)
+            merge_shard_outputs(merge_csv, shards_root)
+            sys.exit(0)
+
+        # retry [csv] : ne retente que les offres en échec dont le backoff est écoulé
+        retry_only = bool(arguments) and arguments[0] == "retry"
+        if retry_only:
+            arguments.pop(0)
+
+        # [csv] [--shard i/N] : ne traite que les offres attribuées à ce shard
+        selected_shard = None
+        if "--shard" in arguments:
+            shard_position = arguments.index("--shard")
+            try:
+                selected_shard = parse_shard_spec(arguments[shard_position + 1] if shard_position + 1 < len(arguments) else "")
+            except ValueError as error:
+                print(colored(f"\n❌ {error}\n", Colors.RED + Colors.BOLD))
+                sys.exit(1)
+            del arguments[shard_position:shard_position + 2]
+
+        target_csv = arguments[0] if arguments else DEFAULT_INPUT_CSV
+        generate_letters_for_offers(target_csv, selected_shard, retry_only)
     except KeyboardInterrupt:
         print(colored("\n\n⚠️  Interruption par l'utilisateur\n", Colors.YELLOW))
         sys.exit(0)
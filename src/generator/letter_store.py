@@ -0,0 +1,230 @@
+import os
+import sys
+import json
+import hashlib
+from datetime import datetime
+from dotenv import load_dotenv
+from analyzer.offer_identity import compute_offer_id, compute_fallback_offer_id
+
+load_dotenv()
+
+PACKED_DATA_FILENAME = "letters.jsonl"
+PACKED_INDEX_FILENAME = "letters.idx.jsonl"
+
+
+def compute_hash(text):
+    return hashlib.sha256(str(text).encode('utf-8')).hexdigest()
+
+
+def sanitize_filename(text, max_length=50):
+    sanitized = "".join(char for char in str(text) if char.isalnum() or char in (' ', '_', '-'))
+    sanitized = sanitized.strip().replace(" ", "_")
+    return sanitized[:max_length]
+
+
+def build_letter_filename(company_name, job_title, offer_id=''):
+    # L'offerId distingue deux offres de même entreprise et même intitulé
+    safe_company = sanitize_filename(company_name)
+    safe_title = sanitize_filename(job_title, 40)
+    suffix = f"_{sanitize_filename(offer_id)}" if offer_id else ""
+    return f"lettre_{safe_company}_{safe_title}{suffix}.txt"
+
+
+def truncate_to_last_line(file_path):
+    # Tronque une éventuelle dernière ligne incomplète (arrêt pendant l'écriture), retourne la taille gardée
+    if not os.path.exists(file_path):
+        return 0
+
+    file_size = os.path.getsize(file_path)
+    if file_size == 0:
+        return 0
+
+    with open(file_path, 'rb+') as data_file:
+        data_file.seek(-1, os.SEEK_END)
+        if data_file.read(1) == b'\n':
+            return file_size
+
+        position = file_size
+        while position > 0:
+            chunk_start = max(0, position - 4096)
+            data_file.seek(chunk_start)
+            chunk = data_file.read(position - chunk_start)
+            newline_position = chunk.rfind(b'\n')
+            if newline_position != -1:
+                file_size = chunk_start + newline_position + 1
+                break
+            position = chunk_start
+        else:
+            file_size = 0
+
+        data_file.truncate(file_size)
+
+    return file_size
+
+
+class PackedLetterStore:
+    # Archive append-only : une lettre par ligne JSON dans letters.jsonl,
+    # et un index (append-only lui aussi) offerId/hash → position dans le fichier.
+    # Une régénération ajoute un nouvel enregistrement, l'index garde le dernier.
+
+    def __init__(self, output_folder):
+        self.output_folder = output_folder
+        self.data_path = os.path.join(output_folder, PACKED_DATA_FILENAME)
+        self.index_path = os.path.join(output_folder, PACKED_INDEX_FILENAME)
+        self.index_by_offer_id = {}
+        self.index_by_hash = {}
+
+        os.makedirs(output_folder, exist_ok=True)
+        self.load_index()
+
+    def __len__(self):
+        return len(self.index_by_offer_id)
+
+    def __contains__(self, offer_id):
+        # Une offre sans identité n'est jamais considérée comme déjà générée
+        return bool(offer_id) and offer_id in self.index_by_offer_id
+
+    def register_entry(self, entry):
+        self.index_by_offer_id[entry['offer_id']] = entry
+        self.index_by_hash[entry['hash']] = entry
+
+    def load_index(self):
+        data_size = truncate_to_last_line(self.data_path)
+        index_size = truncate_to_last_line(self.index_path)
+        indexed_end = 0
+        valid_index_size = 0
+
+        if index_size > 0:
+            with open(self.index_path, 'rb') as index_file:
+                for raw_line in index_file:
+                    try:
+                        entry = json.loads(raw_line)
+                    except json.JSONDecodeError:
+                        break
+                    if entry['offset'] + entry['length'] > data_size:
+                        break
+                    self.register_entry(entry)
+                    indexed_end = max(indexed_end, entry['offset'] + entry['length'])
+                    valid_index_size += len(raw_line)
+
+        # Entrées illisibles ou pointant au-delà des données : retirées, puis reconstruites depuis letters.jsonl
+        if valid_index_size < index_size:
+            with open(self.index_path, 'rb+') as index_file:
+                index_file.truncate(valid_index_size)
+
+        if indexed_end < data_size:
+            self.reindex_from(indexed_end)
+
+    def reindex_from(self, start_offset):
+        with open(self.data_path, 'rb') as data_file, \
+                open(self.index_path, 'a', encoding='utf-8') as index_file:
+            data_file.seek(start_offset)
+            offset = start_offset
+            for raw_line in data_file:
+                length = len(raw_line)
+                try:
+                    record = json.loads(raw_line)
+                except json.JSONDecodeError:
+                    offset += length
+                    continue
+
+                entry = {
+                    "offer_id": record['offer_id'],
+                    "hash": record['content_hash'],
+                    "offset": offset,
+                    "length": length
+                }
+                self.register_entry(entry)
+                index_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                offset += length
+
+    def append_letter(self, letter_content, offer_id, offer_url, company_name, job_title, model, prompt):
+        content_hash = compute_hash(letter_content)
+        record = {
+            "offer_id": offer_id or compute_fallback_offer_id(company_name, job_title, content_hash),
+            "url": offer_url,
+            "company": company_name,
+            "title": job_title,
+            "content": letter_content,
+            "content_hash": content_hash,
+            "model": model,
+            "prompt_hash": compute_hash(prompt),
+            "generated_at": datetime.now().isoformat(timespec='seconds')
+        }
+        return self.append_record(record)
+
+    def append_record(self, record):
+        # Enregistrement complet déjà construit (fusion d'archives de shards)
+        raw_line = (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+
+        with open(self.data_path, 'ab') as data_file:
+            offset = data_file.tell()
+            data_file.write(raw_line)
+
+        entry = {
+            "offer_id": record['offer_id'],
+            "hash": record['content_hash'],
+            "offset": offset,
+            "length": len(raw_line)
+        }
+        with open(self.index_path, 'a', encoding='utf-8') as index_file:
+            index_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+        self.register_entry(entry)
+        return record
+
+    def read_entry(self, entry):
+        with open(self.data_path, 'rb') as data_file:
+            data_file.seek(entry['offset'])
+            return json.loads(data_file.read(entry['length']))
+
+    def get(self, offer_id):
+        entry = self.index_by_offer_id.get(offer_id)
+        return self.read_entry(entry) if entry else None
+
+    def get_by_hash(self, content_hash):
+        entry = self.index_by_hash.get(content_hash)
+        return self.read_entry(entry) if entry else None
+
+    def iter_letters(self, offer_ids=None):
+        offer_ids = self.index_by_offer_id.keys() if offer_ids is None else offer_ids
+        entries = sorted(
+            (self.index_by_offer_id[offer_id] for offer_id in offer_ids if offer_id in self.index_by_offer_id),
+            key=lambda entry: entry['offset']
+        )
+        if not entries:
+            return
+
+        with open(self.data_path, 'rb') as data_file:
+            for entry in entries:
+                data_file.seek(entry['offset'])
+                yield json.loads(data_file.read(entry['length']))
+
+    def export_to_text_files(self, export_folder, offer_ids=None):
+        os.makedirs(export_folder, exist_ok=True)
+        exported_count = 0
+
+        for record in self.iter_letters(offer_ids):
+            filename = build_letter_filename(record['company'], record['title'], record['offer_id'])
+            with open(os.path.join(export_folder, filename), 'w', encoding='utf-8') as letter_file:
+                letter_file.write(record['content'])
+            exported_count += 1
+
+        return exported_count
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "export":
+        print("Usage : python src/generator/letter_store.py export [dossier_export] [offerId|url ...]")
+        sys.exit(1)
+
+    letters_folder = os.getenv("LETTERS_FOLDER", "data/output/letters")
+    target_folder = sys.argv[2] if len(sys.argv) > 2 else os.path.join(letters_folder, "export")
+    selected_ids = [
+        compute_offer_id(argument) if "://" in argument else argument
+        for argument in sys.argv[3:]
+    ] or None
+
+    store = PackedLetterStore(letters_folder)
+    count = store.export_to_text_files(target_folder, selected_ids)
+    print(f"✅ {count} lettres exportées dans {target_folder}")
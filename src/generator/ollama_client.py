@@ -0,0 +1,122 @@
+import os
+import json
+import time
+import http.client
+from urllib.parse import urlparse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+
+
+class OllamaClient:
+    # Client HTTP de l'API Ollama sur une connexion keep-alive : pas de processus `ollama run`
+    # par lettre, et le modèle reste chargé en mémoire (keep_alive) entre deux requêtes.
+    def __init__(self, model, host=OLLAMA_HOST, keep_alive=OLLAMA_KEEP_ALIVE, timeout=120):
+        parsed_host = urlparse(host if "://" in host else f"http://{host}")
+        self.model = model
+        self.hostname = parsed_host.hostname or "localhost"
+        self.port = parsed_host.port or 11434
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self.connection = None
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def open_response(self, method, path, payload=None):
+        body = json.dumps(payload) if payload is not None else None
+
+        # Le serveur peut fermer une connexion inactive : une seule reconnexion avant d'abandonner
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.hostname, self.port, timeout=self.timeout)
+            try:
+                self.connection.request(method, path, body=body, headers={"Content-Type": "application/json"})
+                return self.connection.getresponse()
+            except (http.client.HTTPException, OSError) as error:
+                self.close()
+                if attempt == 1:
+                    # Erreur HTTP bas niveau ramenée à RuntimeError : les appelants n'ont que RuntimeError/OSError à gérer
+                    if isinstance(error, http.client.HTTPException):
+                        raise RuntimeError(f"Ollama {path} : {error!r}") from error
+                    raise
+
+    def request_json(self, method, path, payload=None):
+        response = self.open_response(method, path, payload)
+        try:
+            response_body = response.read()
+        except http.client.HTTPException as error:
+            self.close()
+            raise RuntimeError(f"Ollama {path} : {error!r}") from error
+        if response.status != 200:
+            raise RuntimeError(f"Ollama {path} : HTTP {response.status}")
+        return json.loads(response_body) if response_body else {}
+
+    def is_available(self):
+        try:
+            self.request_json("GET", "/api/tags")
+            return True
+        except (RuntimeError, OSError, http.client.HTTPException, json.JSONDecodeError):
+            self.close()
+            return False
+
+    def list_models(self):
+        return [model["name"] for model in self.request_json("GET", "/api/tags").get("models", [])]
+
+    def warm_up(self):
+        # Prompt vide : Ollama charge le modèle sans rien générer
+        self.request_json("POST", "/api/generate", {"model": self.model, "prompt": "", "keep_alive": self.keep_alive})
+
+    def generate(self, prompt):
+        payload = {"model": self.model, "prompt": prompt, "stream": True, "keep_alive": self.keep_alive}
+        start_time = time.perf_counter()
+        first_token_time = None
+        text_parts = []
+        final_chunk = {}
+
+        response = self.open_response("POST", "/api/generate", payload)
+        if response.status != 200:
+            response.read()
+            raise RuntimeError(f"Ollama /api/generate : HTTP {response.status}")
+
+        try:
+            for raw_line in iter(response.readline, b""):
+                if not raw_line.strip():
+                    continue
+                chunk = json.loads(raw_line)
+                if chunk.get("error"):
+                    response.read()
+                    raise RuntimeError(f"Ollama : {chunk['error']}")
+                if chunk.get("response"):
+                    if first_token_time is None:
+                        first_token_time = time.perf_counter()
+                    text_parts.append(chunk["response"])
+                if chunk.get("done"):
+                    final_chunk = chunk
+                    break
+            response.read()
+        except (http.client.HTTPException, json.JSONDecodeError) as error:
+            # Flux coupé (IncompleteRead) ou ligne illisible : la connexion n'est plus réutilisable
+            self.close()
+            raise RuntimeError(f"Ollama /api/generate : flux illisible ({error!r})") from error
+
+        # Sans message "done", le texte reçu est tronqué : jamais renvoyé comme une génération complète
+        if not final_chunk:
+            self.close()
+            raise RuntimeError("Ollama /api/generate : flux interrompu avant la fin de la génération")
+
+        total_seconds = time.perf_counter() - start_time
+        eval_seconds = final_chunk.get("eval_duration", 0) / 1e9
+        return {
+            "text": "".join(text_parts).strip(),
+            "ttft": (first_token_time - start_time) if first_token_time else total_seconds,
+            "total_seconds": total_seconds,
+            "prompt_tokens": final_chunk.get("prompt_eval_count", 0),
+            "output_tokens": final_chunk.get("eval_count", 0),
+            "tokens_per_second": final_chunk.get("eval_count", 0) / eval_seconds if eval_seconds > 0 else 0.0
+        }
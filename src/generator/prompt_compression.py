@@ -0,0 +1,103 @@
+import re
+import math
+import numpy as np
+
+# Compression extractive de la description d'offre : on garde les phrases les plus
+# proches du poste et de la stack du candidat, dans un budget de tokens.
+# Pas de tokenizer du modèle ici : ~4 caractères par token, ce qui suffit pour un budget.
+CHARS_PER_TOKEN = 4
+
+SENTENCE_SPLIT_PATTERN = re.compile(r'(?<=[.!?;])\s+|\n+|\s+[•·▪●-]\s+')
+WORD_PATTERN = re.compile(r"[a-zà-ÿ0-9][a-zà-ÿ0-9+#.]*[a-zà-ÿ0-9+#]|[a-zà-ÿ0-9]")
+
+STOPWORDS = {
+    'le', 'la', 'les', 'un', 'une', 'des', 'du', 'de', 'd', 'l', 'et', 'ou', 'en', 'au', 'aux',
+    'à', 'a', 'pour', 'par', 'sur', 'avec', 'dans', 'vous', 'nous', 'notre', 'nos', 'votre', 'vos',
+    'est', 'sont', 'sera', 'qui', 'que', 'se', 'ce', 'cette', 'ces', 'il', 'elle', 'ils', 'son', 'sa',
+    'ses', 'leur', 'leurs', 'pas', 'plus', 'the', 'and', 'of', 'to', 'in', 'for', 'with', 'h', 'f'
+}
+
+# Vocabulaire des sections utiles (missions, prérequis) vs marketing d'entreprise
+REQUIREMENT_TERMS = {
+    'profil', 'compétences', 'competences', 'requis', 'maîtrise', 'maitrise', 'connaissances',
+    'expérience', 'experience', 'missions', 'mission', 'développer', 'développement', 'concevoir',
+    'formation', 'bac', 'alternance', 'apprentissage', 'stage', 'rythme', 'technologies', 'stack',
+    'outils', 'tests', 'api', 'environnement', 'technique', 'techniques', 'participer', 'participerez'
+}
+MARKETING_TERMS = {
+    'leader', 'fondée', 'fondé', 'créée', 'chiffre', 'affaires', 'collaborateurs', 'salariés',
+    'rejoignez', 'aventure', 'passionnés', 'valeurs', 'bienveillance', 'afterwork', 'locaux',
+    'avantages', 'mutuelle', 'tickets', 'restaurant', 'pays', 'implantée', 'croissance'
+}
+
+TITLE_WEIGHT = 3.0
+STACK_WEIGHT = 2.0
+REQUIREMENT_WEIGHT = 1.0
+MARKETING_WEIGHT = -1.0
+
+
+def estimate_tokens(text):
+    return math.ceil(len(str(text)) / CHARS_PER_TOKEN)
+
+
+def tokenize(text):
+    return [word for word in WORD_PATTERN.findall(str(text).lower()) if word not in STOPWORDS]
+
+
+def split_sentences(text):
+    return [sentence.strip() for sentence in SENTENCE_SPLIT_PATTERN.split(str(text)) if sentence and sentence.strip()]
+
+
+def build_term_weights(job_title, candidate_stack):
+    term_weights = {term: REQUIREMENT_WEIGHT for term in REQUIREMENT_TERMS}
+    term_weights.update({term: MARKETING_WEIGHT for term in MARKETING_TERMS})
+    for term in tokenize(candidate_stack):
+        term_weights[term] = STACK_WEIGHT
+    for term in tokenize(job_title):
+        term_weights[term] = TITLE_WEIGHT
+    return term_weights
+
+
+def score_sentences(sentences, term_weights):
+    vocabulary = {term: column for column, term in enumerate(term_weights)}
+    weights = np.fromiter(term_weights.values(), dtype=np.float32, count=len(term_weights))
+
+    # Matrice phrases × termes (présence), puis un seul produit matriciel pour tous les scores
+    presence = np.zeros((len(sentences), len(vocabulary)), dtype=np.float32)
+    sentence_lengths = np.ones(len(sentences), dtype=np.float32)
+    for row, sentence in enumerate(sentences):
+        words = tokenize(sentence)
+        sentence_lengths[row] = max(len(words), 1)
+        columns = [vocabulary[word] for word in set(words) if word in vocabulary]
+        presence[row, columns] = 1.0
+
+    # Normalisation douce : une phrase longue ne gagne pas juste parce qu'elle est longue
+    return (presence @ weights) / np.sqrt(sentence_lengths)
+
+
+def compress_description(description, job_title, candidate_stack, token_budget):
+    description = description.strip() if isinstance(description, str) else ''
+    if estimate_tokens(description) <= token_budget:
+        return description
+
+    sentences = split_sentences(description)
+    if not sentences:
+        return description[:token_budget * CHARS_PER_TOKEN]
+
+    scores = score_sentences(sentences, build_term_weights(job_title, candidate_stack))
+    selected_rows = []
+    used_tokens = 0
+
+    # Meilleures phrases d'abord (à score égal, la plus tôt dans le texte), restituées dans l'ordre d'origine
+    for row in np.lexsort((np.arange(len(sentences)), -scores)):
+        sentence_tokens = estimate_tokens(sentences[row]) + 1
+        if used_tokens + sentence_tokens > token_budget:
+            continue
+        selected_rows.append(row)
+        used_tokens += sentence_tokens
+
+    if not selected_rows:
+        best_sentence = sentences[int(np.argmax(scores))]
+        return best_sentence[:token_budget * CHARS_PER_TOKEN]
+
+    return " ".join(sentences[row] for row in sorted(selected_rows))
@@ -0,0 +1,103 @@
+import os
+import re
+import json
+from datetime import datetime, timedelta
+
+RETRY_QUEUE_FILENAME = "retry_queue.jsonl"
+DEFAULT_MAX_ATTEMPTS = 4
+
+
+def parse_max_attempts(raw_value, default=DEFAULT_MAX_ATTEMPTS):
+    # Même lecture que parseMaxAttempts() côté scraper : entier attendu, vide ou invalide → défaut,
+    # 0 (ou négatif) → abandon dès le premier échec
+    if raw_value is None or not re.fullmatch(r"\s*-?[0-9]+\s*", str(raw_value)):
+        return default
+    return max(int(raw_value), 0)
+
+
+class RetryQueue:
+    # File de reprise append-only : une ligne par échec (raison, tentatives, prochaine tentative)
+    # ou par succès. L'état d'une offre est sa dernière ligne ; au-delà de max_attempts elle est
+    # abandonnée (dead-letter) et n'est plus retentée tant que la ligne n'est pas supprimée.
+    def __init__(self, path, max_attempts=DEFAULT_MAX_ATTEMPTS, base_delay_minutes=15):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.base_delay_minutes = base_delay_minutes
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, 'r', encoding='utf-8') as queue_file:
+            for line in queue_file:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+                if event.get('type') == 'failure':
+                    self.entries[event['key']] = event
+                elif event.get('type') == 'success':
+                    self.entries.pop(event['key'], None)
+
+    def append(self, event):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as queue_file:
+            queue_file.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+    def record_failure(self, key, reason, **details):
+        now = datetime.now()
+        attempts = self.entries.get(key, {}).get('attempts', 0) + 1
+        is_dead = attempts >= self.max_attempts
+
+        # Backoff exponentiel : 15 min, 30 min, 1 h... avant la tentative suivante
+        next_attempt = None if is_dead else now + timedelta(minutes=self.base_delay_minutes * 2 ** (attempts - 1))
+        event = {
+            'type': 'failure',
+            'key': key,
+            'reason': reason,
+            'attempts': attempts,
+            'dead': is_dead,
+            'nextAttemptAt': next_attempt.isoformat(timespec='seconds') if next_attempt else None,
+            'ts': now.isoformat(timespec='seconds'),
+            **details
+        }
+        self.entries[key] = event
+        self.append(event)
+        return event
+
+    def record_success(self, key):
+        if self.entries.pop(key, None) is not None:
+            self.append({'type': 'success', 'key': key, 'ts': datetime.now().isoformat(timespec='seconds')})
+
+    def is_due(self, key, now=None):
+        entry = self.entries.get(key)
+        if entry is None:
+            return True
+        if entry['dead']:
+            return False
+        return datetime.fromisoformat(entry['nextAttemptAt']) <= (now or datetime.now())
+
+    def is_dead(self, key):
+        return self.entries.get(key, {}).get('dead', False)
+
+    def due_keys(self, now=None):
+        return {key for key in self.entries if self.is_due(key, now)}
+
+    def counts(self):
+        dead_entries = sum(1 for entry in self.entries.values() if entry['dead'])
+        return {'pending': len(self.entries) - dead_entries, 'dead': dead_entries}
+
+    def compact(self):
+        # Ne garde que l'état courant des offres encore en échec
+        if not os.path.exists(self.path):
+            return
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as queue_file:
+            for entry in self.entries.values():
+                queue_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(temporary_path, self.path)
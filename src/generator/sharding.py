@@ -0,0 +1,85 @@
+import os
+import json
+import socket
+import hashlib
+from datetime import datetime
+
+SHARDS_FOLDER_NAME = "shards"
+MANIFEST_FILENAME = "manifest.jsonl"
+DONE_STATUSES = ('generated', 'archived')
+
+
+def parse_shard_spec(shard_spec):
+    # "2/4" → (2, 4) : shards numérotés à partir de 1
+    try:
+        shard_index, shard_count = (int(part) for part in shard_spec.split('/'))
+    except ValueError:
+        raise ValueError(f"Shard invalide : {shard_spec} (format attendu i/N, ex. 2/4)")
+
+    if shard_count < 1 or not 1 <= shard_index <= shard_count:
+        raise ValueError(f"Shard invalide : {shard_spec} (il faut 1 ≤ i ≤ N)")
+    return shard_index, shard_count
+
+
+def offer_shard(offer_id, shard_count):
+    # Même offre → même shard sur toutes les machines, quel que soit l'ordre du CSV
+    return int(hashlib.sha1(offer_id.encode('utf-8')).hexdigest()[:8], 16) % shard_count + 1
+
+
+def shard_folder(output_folder, shard_index, shard_count):
+    return os.path.join(output_folder, SHARDS_FOLDER_NAME, f"shard-{shard_index}-of-{shard_count}")
+
+
+class ShardManifest:
+    # Journal append-only du shard : un en-tête par run (source, machine, modèle, offres attribuées),
+    # une ligne par offre traitée et une ligne de fin. Relu par la commande merge.
+    def __init__(self, folder):
+        os.makedirs(folder, exist_ok=True)
+        self.path = os.path.join(folder, MANIFEST_FILENAME)
+
+    def append(self, event):
+        event = {**event, 'ts': datetime.now().isoformat(timespec='seconds')}
+        with open(self.path, 'a', encoding='utf-8') as manifest_file:
+            manifest_file.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+    def start(self, shard_index, shard_count, source_path, model, assigned_offer_ids):
+        self.append({
+            'type': 'start',
+            'shard': f"{shard_index}/{shard_count}",
+            'source': os.path.basename(source_path),
+            'host': socket.gethostname(),
+            'model': model,
+            'assigned': list(assigned_offer_ids)
+        })
+
+    def record_offer(self, offer_id, status, letter_filename=None):
+        self.append({'type': 'offer', 'offerId': offer_id, 'status': status, 'letter': letter_filename})
+
+    def finish(self, stats):
+        self.append({'type': 'end', **stats})
+
+
+def read_manifest(folder):
+    manifest_path = os.path.join(folder, MANIFEST_FILENAME)
+    if not os.path.exists(manifest_path):
+        return None
+
+    # Plusieurs runs du même shard (reprise) : le dernier statut de chaque offre l'emporte
+    summary = {'shard': None, 'host': None, 'model': None, 'finished': False, 'statuses': {}, 'letters': {}}
+    with open(manifest_path, 'r', encoding='utf-8') as manifest_file:
+        for line in manifest_file:
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            if event.get('type') == 'start':
+                summary.update(shard=event['shard'], host=event['host'], model=event['model'], finished=False)
+            elif event.get('type') == 'offer':
+                summary['statuses'][event['offerId']] = event['status']
+                if event.get('letter'):
+                    summary['letters'][event['offerId']] = event['letter']
+            elif event.get('type') == 'end':
+                summary['finished'] = True
+
+    return summary
@@ -57,6 +57,8 @@ def display_menu():
         " → Génération de lettres          │", TerminalColors.CYAN))
     print(colorize_text("│  5. ", TerminalColors.CYAN) + colorize_text("setup", TerminalColors.RED + TerminalColors.BOLD) + colorize_text(
         "   → Configuration du profil        │", TerminalColors.CYAN))
+    print(colorize_text("│  6. ", TerminalColors.CYAN) + colorize_text("serve", TerminalColors.BLUE + TerminalColors.BOLD) + colorize_text(
+        "   → Serveur local + file d'attente │", TerminalColors.CYAN))
     print(colorize_text("│                                              │", TerminalColors.CYAN))
     print(colorize_text("╰──────────────────────────────────────────────╯", TerminalColors.CYAN))
 
@@ -194,6 +196,21 @@ def run_setup_only():
     execute_command(f"python {PROFILE_SCRIPT_PATH}", "Configuration du profil")
 
 
+def run_serve_mode():
+    display_banner()
+    print(colorize_text("  🎯 Mode : ", TerminalColors.BOLD) + colorize_text("SERVEUR (FILE D'ATTENTE)", TerminalColors.BLUE + TerminalColors.BOLD))
+    print(colorize_text("  📊 Profil, matchers et modèle restent chargés entre les requêtes", TerminalColors.GRAY))
+
+    if not verify_profile_exists():
+        return
+
+    display_step_header(1, 1, "DÉMARRAGE DU SERVEUR", "🌐")
+
+    # Import tardif : pandas et le pipeline ne sont chargés que pour ce mode
+    from serve import run_server
+    run_server()
+
+
 def main():
     if len(sys.argv) > 1:
         selected_mode = sys.argv[1].lower()
@@ -201,14 +218,15 @@ def main():
         display_banner()
         display_menu()
 
-        user_choice = input(colorize_text("\n❯ Choisis un mode (1-5) : ", TerminalColors.CYAN + TerminalColors.BOLD)).strip()
+        user_choice = input(colorize_text("\n❯ Choisis un mode (1-6) : ", TerminalColors.CYAN + TerminalColors.BOLD)).strip()
 
         mode_mapping = {
             "1": "full",
             "2": "scrape",
             "3": "filter",
             "4": "letters",
-            "5": "setup"
+            "5": "setup",
+            "6": "serve"
         }
 
         selected_mode = mode_mapping.get(user_choice, user_choice)
@@ -218,7 +236,8 @@ def main():
         "scrape": run_scrape_only,
         "filter": run_filter_only,
         "letters": run_letters_only,
-        "setup": run_setup_only
+        "setup": run_setup_only,
+        "serve": run_serve_mode
     }
 
     if selected_mode in available_modes:
@@ -230,7 +249,7 @@ def main():
             sys.exit(0)
     else:
         print(colorize_text(f"\n❌ Mode inconnu : {selected_mode}", TerminalColors.RED))
-        print(colorize_text("   Modes valides : full, scrape, filter, letters, setup\n", TerminalColors.YELLOW))
+        print(colorize_text("   Modes valides : full, scrape, filter, letters, setup, serve\n", TerminalColors.YELLOW))
         sys.exit(1)
 
 
@@ -0,0 +1,101 @@
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const cliProgress = require('cli-progress');
+const colors = require('colors');
+const { startFixtureServer } = require('./fixture_server');
+const { CONFIG, ProgressManager, connectBrowser, releaseBrowser, createTabPool, scrapeJobsParallel } = require('./scrape');
+
+// Usage : node src/scraper/bench_scrape.js --offers 40 --tabs 2 --latency 200-800 --slow-every 10 --slow-latency 20000
+//         [--block 0|1] [--fast 0|1] [--rate requêtes/min, 0 = illimité]
+function parseArgs(argv) {
+  const options = {
+    offers: 40,
+    tabs: CONFIG.parallelTabs,
+    latency: '200-800',
+    slowEvery: 10,
+    slowLatency: 20000,
+    block: CONFIG.blockResources ? 1 : 0,
+    fast: CONFIG.fastFetch ? 1 : 0,
+    rate: 0
+  };
+  for (let i = 0; i < argv.length; i += 2) {
+    const key = argv[i].replace(/^--/, '').replace(/-([a-z])/g, (_, letter) => letter.toUpperCase());
+    options[key] = key === 'latency' ? argv[i + 1] : Number(argv[i + 1]);
+  }
+  const [latencyMin, latencyMax] = options.latency.split('-').map(Number);
+  return { ...options, latencyMin, latencyMax: latencyMax || latencyMin };
+}
+
+async function runBenchmark() {
+  const options = parseArgs(process.argv.slice(2));
+  const workDir = fs.mkdtempSync(path.join(os.tmpdir(), 'scraper-bench-'));
+
+  const { server, baseUrl, stats } = await startFixtureServer(options);
+
+  CONFIG.baseUrl = baseUrl;
+  CONFIG.outputPath = path.join(workDir, 'offres.csv');
+  CONFIG.legacyProgressFile = path.join(workDir, 'legacy_progress.json');
+  CONFIG.blockResources = Boolean(options.block);
+  CONFIG.fastFetch = Boolean(options.fast);
+  CONFIG.maxRequestsPerMinute = options.rate;
+
+  const progressManager = new ProgressManager(path.join(workDir, 'offres.jsonl'));
+  const completionTimes = [];
+  const addJob = progressManager.addJob.bind(progressManager);
+  progressManager.addJob = job => {
+    completionTimes.push(Date.now());
+    addJob(job);
+  };
+
+  const jobLinks = Array.from({ length: options.offers }, (_, i) => `${baseUrl}/viewjob?jk=bench${i}`);
+
+  console.log(colors.bold.cyan('\n⏱️  BENCHMARK SCRAPER (fixtures locales)\n'));
+  console.log(colors.white(`   • Offres : ${options.offers} | Onglets : ${options.tabs}`));
+  console.log(colors.white(`   • Latence : ${options.latencyMin}-${options.latencyMax}ms | 1 page sur ${options.slowEvery} à ${options.slowLatency}ms`));
+  console.log(colors.white(`   • Blocage ressources : ${CONFIG.blockResources ? 'oui' : 'non'} | Fetch direct : ${CONFIG.fastFetch ? 'oui' : 'non'}\n`));
+
+  const progressBar = new cliProgress.SingleBar({
+    format: colors.cyan('{bar}') + ' | {value}/{total} offres',
+    barCompleteChar: '█',
+    barIncompleteChar: '░',
+    hideCursor: true
+  });
+
+  const browser = await connectBrowser();
+  try {
+    const tabPool = await createTabPool(browser, options.tabs);
+    progressBar.start(jobLinks.length, 0);
+
+    const startTime = Date.now();
+    await scrapeJobsParallel(browser, tabPool, jobLinks, progressManager, progressBar);
+    const elapsedSeconds = (Date.now() - startTime) / 1000;
+    progressBar.stop();
+
+    // Régime établi : on ignore la première offre de chaque onglet (montée en charge)
+    const steadyTimes = completionTimes.slice(options.tabs - 1);
+    const steadySeconds = steadyTimes.length > 1 ? (steadyTimes[steadyTimes.length - 1] - steadyTimes[0]) / 1000 : 0;
+    const steadyRate = steadySeconds > 0 ? ((steadyTimes.length - 1) / steadySeconds) * 60 : 0;
+    // Moyennes sur les offres réellement scrapées : une offre en échec ou expirée ne les fait pas baisser
+    const scrapedOffers = completionTimes.length;
+    const perScrapedOffer = (total, digits) => (scrapedOffers > 0 ? (total / scrapedOffers).toFixed(digits) : '-');
+
+    console.log(colors.bold.green('\n📊 Résultats :'));
+    console.log(colors.white(`   • Offres scrapées : ${completionTimes.length}/${options.offers}`));
+    console.log(colors.white(`   • Durée totale : ${elapsedSeconds.toFixed(1)}s`));
+    console.log(colors.white(`   • Débit global : ${(completionTimes.length / elapsedSeconds * 60).toFixed(1)} offres/min`));
+    console.log(colors.white(`   • Débit régime établi : ${steadyRate.toFixed(1)} offres/min`));
+    console.log(colors.white(`   • Temps-onglet moyen par offre : ${perScrapedOffer(elapsedSeconds * options.tabs, 2)}s`));
+    console.log(colors.white(`   • Requêtes servies : ${stats.requests} (${stats.pageRequests} pages, ${stats.assetRequests} ressources)`));
+    console.log(colors.white(`   • Bande passante : ${(stats.bytesSent / 1024).toFixed(0)} Ko (${perScrapedOffer(stats.bytesSent / 1024, 1)} Ko/offre)\n`));
+  } finally {
+    await releaseBrowser(browser);
+    server.close();
+    fs.rmSync(workDir, { recursive: true, force: true });
+  }
+}
+
+runBenchmark().catch(error => {
+  console.error(colors.red(`❌ Benchmark échoué : ${error.message}`));
+  process.exit(1);
+});
@@ -0,0 +1,48 @@
+const fs = require('fs');
+const colors = require('colors');
+const { CONFIG, launchBrowser } = require('./scrape');
+
+// Navigateur persistant : lancé une fois, les runs du scraper s'y connectent via l'endpoint DevTools.
+// Le profil (cookies, consentement) est conservé entre les lancements.
+const DEFAULT_PROFILE_DIR = 'data/browser_profile';
+
+async function startBrowserServer() {
+  const profileDir = CONFIG.browserProfileDir || DEFAULT_PROFILE_DIR;
+  fs.mkdirSync(profileDir, { recursive: true });
+
+  console.log(colors.cyan(`🚀 Lancement du navigateur persistant ${CONFIG.headless ? '(headless)' : '(visible)'}...`));
+  const browser = await launchBrowser(profileDir);
+  const browserWSEndpoint = browser.wsEndpoint();
+
+  const endpointDir = CONFIG.browserEndpointFile.split('/').slice(0, -1).join('/');
+  if (endpointDir) fs.mkdirSync(endpointDir, { recursive: true });
+  fs.writeFileSync(CONFIG.browserEndpointFile, browserWSEndpoint);
+
+  console.log(colors.green('✅ Navigateur prêt'));
+  console.log(colors.white(`   • Profil : ${profileDir}`));
+  console.log(colors.white(`   • Endpoint : ${browserWSEndpoint}`));
+  console.log(colors.white(`   • Enregistré dans : ${CONFIG.browserEndpointFile}`));
+  console.log(colors.gray('\n   Les runs de scrape.js s\'y connectent automatiquement. Ctrl+C pour arrêter.\n'));
+
+  const removeEndpointFile = () => {
+    if (fs.existsSync(CONFIG.browserEndpointFile)) fs.unlinkSync(CONFIG.browserEndpointFile);
+  };
+
+  browser.on('disconnected', () => {
+    removeEndpointFile();
+    console.log(colors.yellow('⚠️  Navigateur fermé'));
+    process.exit(0);
+  });
+
+  const shutdown = async () => {
+    removeEndpointFile();
+    await browser.close();
+  };
+  process.on('SIGINT', shutdown);
+  process.on('SIGTERM', shutdown);
+}
+
+startBrowserServer().catch(error => {
+  console.error(colors.red(`❌ Impossible de lancer le navigateur : ${error.message}`));
+  process.exit(1);
+});
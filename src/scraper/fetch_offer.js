@@ -0,0 +1,44 @@
+const { CONFIG, fetchJobDetails, connectBrowser, releaseBrowser, openDetailTab, extractJobDetails, assignOfferIdentity } = require('./scrape');
+
+// Récupère une seule offre et l'écrit en JSON sur stdout (utilisé par le mode serve).
+// Usage : node src/scraper/fetch_offer.js <url>
+// Codes de sortie : 0 = offre écrite, 2 = offre introuvable (404, hors site), 1 = erreur
+async function fetchSingleOffer(jobUrl) {
+  const fastResult = await fetchJobDetails(jobUrl);
+  if (fastResult === null) return null;
+  if (fastResult) return assignOfferIdentity(fastResult.jobDetails, jobUrl, fastResult.finalUrl);
+
+  // Repli navigateur (captcha, page rendue côté client) : navigateur persistant si disponible
+  const browser = await connectBrowser();
+  try {
+    const tab = await openDetailTab(browser);
+    const response = await tab.goto(jobUrl, { waitUntil: 'domcontentloaded', timeout: 25000 });
+    if (!response || response.status() === 404) return null;
+    if (!tab.url().includes(new URL(CONFIG.baseUrl).hostname)) return null;
+
+    const jobDetails = await extractJobDetails(tab, jobUrl);
+    return jobDetails ? assignOfferIdentity(jobDetails, jobUrl, tab.url()) : null;
+  } finally {
+    await releaseBrowser(browser);
+  }
+}
+
+const jobUrl = process.argv[2];
+if (!jobUrl) {
+  console.error('Usage : node src/scraper/fetch_offer.js <url>');
+  process.exit(1);
+}
+
+fetchSingleOffer(jobUrl)
+  .then(offer => {
+    if (!offer) {
+      console.error(`Offre introuvable : ${jobUrl}`);
+      process.exit(2);
+    }
+    process.stdout.write(JSON.stringify(offer));
+    process.exit(0);
+  })
+  .catch(error => {
+    console.error(`Récupération échouée : ${error.message}`);
+    process.exit(1);
+  });
@@ -0,0 +1,65 @@
+const http = require('http');
+const fs = require('fs');
+const path = require('path');
+
+// Serveur local de pages d'offres sauvegardées, avec latence configurable (benchmarks)
+const FIXTURE_PAGE = fs.readFileSync(path.join(__dirname, 'fixtures', 'job_page.html'), 'utf8');
+
+// Ressources annexes d'une vraie page d'offre, avec des tailles réalistes (octets)
+const STATIC_ASSETS = {
+  '/static/style.css': { contentType: 'text/css', size: 60 * 1024 },
+  '/static/font.woff2': { contentType: 'font/woff2', size: 45 * 1024 },
+  '/static/logo.png': { contentType: 'image/png', size: 120 * 1024 },
+  '/static/analytics.js': { contentType: 'application/javascript', size: 35 * 1024 }
+};
+
+function buildAssetBody(pathname, size) {
+  if (pathname.endsWith('.css')) return Buffer.from('.x{color:#000}\n'.repeat(Math.ceil(size / 15))).subarray(0, size);
+  if (pathname.endsWith('.js')) return Buffer.from('void 0;\n'.repeat(Math.ceil(size / 8))).subarray(0, size);
+  return Buffer.alloc(size, 0);
+}
+
+function startFixtureServer({ latencyMin = 200, latencyMax = 800, slowEvery = 0, slowLatency = 20000, port = 0 } = {}) {
+  const stats = { requests: 0, bytesSent: 0, pageRequests: 0, assetRequests: 0 };
+
+  const server = http.createServer((request, response) => {
+    const requestUrl = new URL(request.url, 'http://localhost');
+    stats.requests++;
+
+    const asset = STATIC_ASSETS[requestUrl.pathname];
+    if (asset) {
+      const assetBody = buildAssetBody(requestUrl.pathname, asset.size);
+      stats.assetRequests++;
+      stats.bytesSent += assetBody.length;
+      response.writeHead(200, { 'Content-Type': asset.contentType, 'Cache-Control': 'no-store' });
+      response.end(assetBody);
+      return;
+    }
+
+    if (requestUrl.pathname !== '/viewjob') {
+      response.writeHead(404, { 'Content-Type': 'text/plain' });
+      response.end('not found');
+      return;
+    }
+
+    const jobKey = requestUrl.searchParams.get('jk') || '0';
+    stats.pageRequests++;
+    const isSlow = slowEvery > 0 && stats.pageRequests % slowEvery === 0;
+    const latency = isSlow ? slowLatency : Math.random() * (latencyMax - latencyMin) + latencyMin;
+    const body = FIXTURE_PAGE.replace(/{{JOB_KEY}}/g, jobKey);
+
+    setTimeout(() => {
+      response.writeHead(200, { 'Content-Type': 'text/html; charset=utf-8' });
+      response.end(body);
+      stats.bytesSent += Buffer.byteLength(body);
+    }, latency);
+  });
+
+  return new Promise(resolve => {
+    server.listen(port, '127.0.0.1', () => {
+      resolve({ server, baseUrl: `http://127.0.0.1:${server.address().port}`, stats });
+    });
+  });
+}
+
+module.exports = { startFixtureServer };
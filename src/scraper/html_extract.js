@@ -0,0 +1,123 @@
+// Extraction minimale de texte depuis du HTML brut, sans rendu ni DOM.
+// Gère les sélecteurs simples utilisés par le scraper : tag, #id, .classe,
+// [attr], [attr="valeur"], combinés et séparés par des descendants (" " ou " > ").
+
+const VOID_TAGS = new Set(['area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr']);
+const BLOCK_TAGS = 'p|div|li|ul|ol|h[1-6]|tr|section|article|header|footer|table';
+const TAG_PATTERN = /<(\/?)([a-zA-Z][\w-]*)((?:[^>"']|"[^"]*"|'[^']*')*)>/g;
+const ATTRIBUTE_PATTERN = /([^\s=/]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?/g;
+
+const HTML_ENTITIES = { amp: '&', lt: '<', gt: '>', quot: '"', apos: "'", nbsp: ' ' };
+
+function parseSimpleSelector(selector) {
+  const parsed = { tag: null, id: null, classes: [], attributes: [] };
+  const tokenPattern = /^[a-zA-Z][\w-]*|#[\w-]+|\.[\w-]+|\[([\w-]+)(?:="([^"]*)")?\]/g;
+  let token;
+  while ((token = tokenPattern.exec(selector)) !== null) {
+    const value = token[0];
+    if (value.startsWith('#')) parsed.id = value.slice(1);
+    else if (value.startsWith('.')) parsed.classes.push(value.slice(1));
+    else if (value.startsWith('[')) parsed.attributes.push({ name: token[1], value: token[2] });
+    else parsed.tag = value.toLowerCase();
+  }
+  return parsed;
+}
+
+function parseAttributes(rawAttributes) {
+  const attributes = {};
+  let match;
+  ATTRIBUTE_PATTERN.lastIndex = 0;
+  while ((match = ATTRIBUTE_PATTERN.exec(rawAttributes)) !== null) {
+    attributes[match[1].toLowerCase()] = match[2] ?? match[3] ?? match[4] ?? '';
+  }
+  return attributes;
+}
+
+function matchesSelector(tagName, attributes, selector) {
+  if (selector.tag && selector.tag !== tagName) return false;
+  if (selector.id && attributes.id !== selector.id) return false;
+
+  const classList = (attributes.class || '').split(/\s+/);
+  if (selector.classes.some(className => !classList.includes(className))) return false;
+
+  return selector.attributes.every(({ name, value }) =>
+    name in attributes && (value === undefined || attributes[name] === value)
+  );
+}
+
+function findElementInnerHtml(html, simpleSelector) {
+  const selector = parseSimpleSelector(simpleSelector);
+  const tagPattern = new RegExp(TAG_PATTERN.source, 'g');
+  let match;
+
+  while ((match = tagPattern.exec(html)) !== null) {
+    const [, closingSlash, rawTagName, rawAttributes] = match;
+    const tagName = rawTagName.toLowerCase();
+    if (closingSlash || !matchesSelector(tagName, parseAttributes(rawAttributes), selector)) continue;
+    if (VOID_TAGS.has(tagName) || rawAttributes.trim().endsWith('/')) return '';
+
+    const innerStart = tagPattern.lastIndex;
+    let depth = 1;
+    let innerMatch;
+    while ((innerMatch = tagPattern.exec(html)) !== null) {
+      if (innerMatch[2].toLowerCase() !== tagName) continue;
+      depth += innerMatch[1] ? -1 : 1;
+      if (depth === 0) return html.slice(innerStart, innerMatch.index);
+    }
+    return html.slice(innerStart);
+  }
+
+  return null;
+}
+
+function querySelectorHtml(html, selector) {
+  let scope = html;
+  for (const part of selector.split(/\s*>\s*|\s+/).filter(Boolean)) {
+    scope = findElementInnerHtml(scope, part);
+    if (scope === null) return null;
+  }
+  return scope;
+}
+
+function decodeEntities(text) {
+  return text.replace(/&(#x[0-9a-f]+|#\d+|[a-z]+);/gi, (entity, code) => {
+    if (code[0] === '#') {
+      const codePoint = code[1].toLowerCase() === 'x' ? parseInt(code.slice(2), 16) : parseInt(code.slice(1), 10);
+      return Number.isNaN(codePoint) ? entity : String.fromCodePoint(codePoint);
+    }
+    return HTML_ENTITIES[code.toLowerCase()] ?? entity;
+  });
+}
+
+function htmlToText(html) {
+  const withBreaks = html
+    .replace(/<(script|style)[\s\S]*?<\/\1>/gi, '')
+    .replace(/<br\s*\/?>/gi, '\n')
+    .replace(new RegExp(`</(${BLOCK_TAGS})>`, 'gi'), '\n')
+    .replace(/<[^>]+>/g, '');
+
+  return decodeEntities(withBreaks)
+    .split('\n')
+    .map(line => line.replace(/[ \t\r\f\v]+/g, ' ').trim())
+    .join('\n')
+    .replace(/\n{3,}/g, '\n\n')
+    .trim();
+}
+
+function extractFieldsFromHtml(html, selectorsByField) {
+  const fields = {};
+  for (const [field, selectors] of Object.entries(selectorsByField)) {
+    fields[field] = '';
+    for (const selector of selectors) {
+      const innerHtml = querySelectorHtml(html, selector);
+      const text = innerHtml ? htmlToText(innerHtml) : '';
+      if (text) {
+        fields[field] = text;
+        break;
+      }
+    }
+  }
+  return fields;
+}
+
+module.exports = { extractFieldsFromHtml, htmlToText, querySelectorHtml };
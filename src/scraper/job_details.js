@@ -0,0 +1,57 @@
+// Champs d'une page d'offre : mêmes sélecteurs et même mise en forme pour le navigateur
+// (readJobFields, exécutée dans la page) et pour le fetch direct (extractFieldsFromHtml).
+
+const JOB_SELECTORS = {
+  title: ['.jobsearch-JobInfoHeader-title', 'h1', '[data-testid="jobsearch-JobInfoHeader-title"]'],
+  company: [
+    '.jobsearch-CompanyInfoContainer a',
+    '[data-testid="inlineHeader-companyName"]',
+    '[data-company-name]',
+    '.jobsearch-CompanyInfoWithoutHeaderImage a',
+    'div[data-testid="inlineHeader-companyName"] span'
+  ],
+  location: ['[data-testid="inlineHeader-companyLocation"]', '.jobsearch-JobInfoHeader-subtitle div'],
+  salary: ['.jobsearch-JobMetadataHeader-item', '[data-testid="attribute_snippet_testid"]'],
+  publishedDate: ['.jobsearch-JobMetadataFooter > div'],
+  description: ['#jobDescriptionText']
+};
+
+// Sérialisée par page.evaluate() : ne doit rien référencer hors de son corps
+function readJobFields(selectorsByField) {
+  const fields = {};
+  for (const [field, selectors] of Object.entries(selectorsByField)) {
+    fields[field] = '';
+    for (const selector of selectors) {
+      const text = document.querySelector(selector)?.innerText.trim();
+      if (text) {
+        fields[field] = text;
+        break;
+      }
+    }
+  }
+  return fields;
+}
+
+function buildJobDetails(rawFields, jobUrl) {
+  const fullDescription = rawFields.description || '';
+
+  let contractType = 'Non précisé';
+  const contractMatch = fullDescription.match(/alternance|stage|CDI|CDD|freelance/gi);
+  if (contractMatch) contractType = contractMatch[0];
+
+  const isRemote = /télétravail|remote|distanciel|100% remote/gi.test(fullDescription);
+
+  return {
+    title: rawFields.title || '(titre absent)',
+    company: rawFields.company || '(entreprise absente)',
+    location: rawFields.location || 'Non précisé',
+    salary: rawFields.salary || 'Non précisé',
+    contract: contractType,
+    remote: isRemote ? 'Oui' : 'Non',
+    publishedDate: rawFields.publishedDate || 'Non précisé',
+    description: fullDescription,
+    url: jobUrl
+  };
+}
+
+module.exports = { JOB_SELECTORS, readJobFields, buildJobDetails };
@@ -0,0 +1,68 @@
+const crypto = require('crypto');
+
+// Même normalisation que src/analyzer/offer_identity.py : les deux côtés doivent produire le même identifiant.
+// Les deux implémentations sont vérifiées sur tests/fixtures/offer_ids.json.
+const STABLE_JOB_KEYS = ['jk', 'vjk'];
+const TRACKING_PARAMS = new Set([
+  'from', 'tk', 'bb', 'xkcb', 'fccid', 'vjs', 'advn', 'sjdu', 'acatk', 'camk',
+  'xpse', 'xfps', 'xfwr', 'rsltid', 'gclid', 'fbclid'
+]);
+
+function splitQuery(queryString) {
+  return queryString.split('&').filter(Boolean).map(segment => {
+    const separatorIndex = segment.indexOf('=');
+    const rawKey = separatorIndex === -1 ? segment : segment.slice(0, separatorIndex);
+    let key = rawKey;
+    try {
+      key = decodeURIComponent(rawKey.replace(/\+/g, ' '));
+    } catch {}
+    return {
+      key: key.toLowerCase(),
+      value: separatorIndex === -1 ? '' : segment.slice(separatorIndex + 1),
+      segment
+    };
+  });
+}
+
+function canonicalOfferUrl(url) {
+  if (!url) return '';
+
+  let parsedUrl;
+  try {
+    parsedUrl = new URL(url.trim());
+  } catch {
+    return url.trim();
+  }
+
+  const origin = `${parsedUrl.protocol}//${parsedUrl.host}`;
+  const segments = splitQuery(parsedUrl.search.slice(1));
+
+  for (const stableKey of STABLE_JOB_KEYS) {
+    const match = segments.find(({ key, value }) => key === stableKey && value);
+    if (match) return `${origin}/viewjob?jk=${match.value}`;
+  }
+
+  const keptSegments = segments
+    .filter(({ key }) => !TRACKING_PARAMS.has(key) && !key.startsWith('utm_'))
+    .map(({ segment }) => segment)
+    .sort();
+  const query = keptSegments.length > 0 ? `?${keptSegments.join('&')}` : '';
+  return `${origin}${parsedUrl.pathname || '/'}${query}`;
+}
+
+function computeOfferId(url) {
+  const canonicalUrl = canonicalOfferUrl(url);
+  if (!canonicalUrl) return '';
+  return crypto.createHash('sha1').update(canonicalUrl).digest('hex').slice(0, 16);
+}
+
+function hasStableJobKey(url) {
+  try {
+    const params = new URL(url).searchParams;
+    return STABLE_JOB_KEYS.some(key => params.get(key));
+  } catch {
+    return false;
+  }
+}
+
+module.exports = { canonicalOfferUrl, computeOfferId, hasStableJobKey };
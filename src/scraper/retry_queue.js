@@ -0,0 +1,87 @@
+const fs = require('fs');
+
+const DEFAULT_MAX_ATTEMPTS = 4;
+
+// Même lecture que parse_max_attempts() côté génération : entier attendu, vide ou invalide → défaut,
+// 0 (ou négatif) → abandon dès le premier échec (parseInt(...) || 4 transformait 0 en 4)
+function parseMaxAttempts(rawValue, defaultValue = DEFAULT_MAX_ATTEMPTS) {
+  if (rawValue === undefined || rawValue === null || !/^\s*-?[0-9]+\s*$/.test(String(rawValue))) return defaultValue;
+  return Math.max(parseInt(rawValue, 10), 0);
+}
+
+// File de reprise append-only des offres en échec (timeout, erreur d'extraction) : une ligne par échec
+// ou par succès, l'état d'une offre est sa dernière ligne. Au-delà de maxAttempts l'offre est abandonnée
+// (dead-letter). Même logique que src/generator/retry_queue.py côté génération.
+class RetryQueue {
+  constructor(file, { maxAttempts = DEFAULT_MAX_ATTEMPTS, baseDelayMs = 15 * 60 * 1000 } = {}) {
+    this.file = file;
+    this.maxAttempts = maxAttempts;
+    this.baseDelayMs = baseDelayMs;
+    this.entries = new Map();
+    this.load();
+  }
+
+  load() {
+    if (!fs.existsSync(this.file)) return;
+
+    for (const line of fs.readFileSync(this.file, 'utf8').split('\n')) {
+      if (!line.trim()) continue;
+      try {
+        const event = JSON.parse(line);
+        if (event.type === 'failure') this.entries.set(event.key, event);
+        else if (event.type === 'success') this.entries.delete(event.key);
+      } catch {}
+    }
+  }
+
+  append(event) {
+    const dir = this.file.split('/').slice(0, -1).join('/');
+    if (dir) fs.mkdirSync(dir, { recursive: true });
+    fs.appendFileSync(this.file, JSON.stringify(event) + '\n');
+  }
+
+  recordFailure(key, reason, details = {}) {
+    const attempts = (this.entries.get(key)?.attempts || 0) + 1;
+    const dead = attempts >= this.maxAttempts;
+
+    // Backoff exponentiel : 15 min, 30 min, 1 h... avant la tentative suivante
+    const event = {
+      type: 'failure',
+      key,
+      reason,
+      attempts,
+      dead,
+      nextAttemptAt: dead ? null : Date.now() + this.baseDelayMs * 2 ** (attempts - 1),
+      ts: Date.now(),
+      ...details
+    };
+    this.entries.set(key, event);
+    this.append(event);
+    return event;
+  }
+
+  recordSuccess(key) {
+    if (!this.entries.delete(key)) return;
+    this.append({ type: 'success', key, ts: Date.now() });
+  }
+
+  dueEntries(now = Date.now()) {
+    return [...this.entries.values()].filter(entry => !entry.dead && entry.nextAttemptAt <= now);
+  }
+
+  counts() {
+    const dead = [...this.entries.values()].filter(entry => entry.dead).length;
+    return { pending: this.entries.size - dead, dead };
+  }
+
+  compact() {
+    // Ne garde que l'état courant des offres encore en échec
+    if (!fs.existsSync(this.file)) return;
+    const tmpFile = `${this.file}.tmp`;
+    const lines = [...this.entries.values()].map(entry => JSON.stringify(entry) + '\n').join('');
+    fs.writeFileSync(tmpFile, lines);
+    fs.renameSync(tmpFile, this.file);
+  }
+}
+
+module.exports = { RetryQueue, parseMaxAttempts };
@@ -2,12 +2,22 @@ require('dotenv').config({ path: require('path').join(__dirname, '../../.env') }
 const puppeteer = require('puppeteer-extra');
 const StealthPlugin = require('puppeteer-extra-plugin-stealth');
 const fs = require('fs');
+const os = require('os');
+const crypto = require('crypto');
 const { parse } = require('json2csv');
 const cliProgress = require('cli-progress');
 const colors = require('colors');
+const { extractFieldsFromHtml } = require('./html_extract');
+const { JOB_SELECTORS, readJobFields, buildJobDetails } = require('./job_details');
+const { RetryQueue, parseMaxAttempts } = require('./retry_queue');
+const { canonicalOfferUrl, computeOfferId, hasStableJobKey } = require('./offer_identity');
 
 puppeteer.use(StealthPlugin());
 
+function splitList(value) {
+  return (value || '').split(';').map(item => item.trim()).filter(Boolean);
+}
+
 const CONFIG = {
   browserExecutable: process.env.BROWSER_EXECUTABLE,
   baseUrl: process.env.SITE_BASE_URL,
@@ -15,11 +25,28 @@ const CONFIG = {
   searchQuery: process.env.TYPE_OFFRE,
   location: process.env.LOCALISATION,
   outputPath: process.env.CSV_OUTPUT,
-  progressFile: 'data/.scraper_progress.json',
+  journalFile: process.env.SCRAPER_JOURNAL || 'data/input/offres.jsonl',
+  journalCompactEvery: parseInt(process.env.JOURNAL_COMPACT_EVERY) || 200,
+  journalCursorFile: process.env.JOURNAL_CURSOR || 'data/.journal_cursor.json',
+  legacyProgressFile: 'data/.scraper_progress.json',
   logFile: 'data/scraper.log',
   headless: process.env.HEADLESS === 'true',
+  browserWSEndpoint: process.env.BROWSER_WS_ENDPOINT,
+  browserEndpointFile: 'data/.browser_endpoint',
+  browserProfileDir: process.env.BROWSER_PROFILE_DIR,
   parallelTabs: parseInt(process.env.PARALLEL_TABS) || 2,
+  blockResources: process.env.BLOCK_RESOURCES !== 'false',
+  fastFetch: process.env.FAST_FETCH === 'true',
   maxPages: parseInt(process.env.MAX_PAGES) || 10,
+  searchQueries: splitList(process.env.SCRAPE_QUERIES),
+  searchLocations: splitList(process.env.SCRAPE_LOCATIONS),
+  shardConcurrency: parseInt(process.env.SHARD_CONCURRENCY) || 1,
+  // Plafond désactivé par défaut ; valeur vide ou invalide → 0 (parseInt('') donne NaN)
+  maxRequestsPerMinute: Math.max(parseInt(process.env.MAX_REQUESTS_PER_MINUTE) || 0, 0),
+  resultsPerPage: parseInt(process.env.RESULTS_PER_PAGE) || 10,
+  pageOffsetParam: process.env.PAGE_OFFSET_PARAM || 'start',
+  retryMaxAttempts: parseMaxAttempts(process.env.RETRY_MAX_ATTEMPTS),
+  retryBaseDelayMinutes: parseFloat(process.env.RETRY_BASE_DELAY_MINUTES ?? '15'),
   delays: {
     min: 3000,
     max: 6000,
@@ -30,6 +57,22 @@ const CONFIG = {
   }
 };
 
+// Sur les onglets de détail, seul le HTML compte : images, polices, CSS et traqueurs sont bloqués
+const BLOCKED_RESOURCE_TYPES = new Set(['image', 'media', 'font', 'stylesheet', 'texttrack', 'eventsource', 'websocket', 'manifest']);
+const BLOCKED_URL_PATTERN = /google-analytics|googletagmanager|doubleclick|googlesyndication|facebook\.net|hotjar|segment\.io|newrelic|nr-data|optimizely|criteo|adsystem/i;
+
+const CAPTCHA_TEXT_PATTERN = /vérifiez que vous êtes humain|prouvez que vous êtes|verify you are human/i;
+
+const FAST_FETCH_HEADERS = {
+  'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36',
+  'Accept': 'text/html,application/xhtml+xml',
+  'Accept-Language': 'fr-FR,fr;q=0.9,en;q=0.8'
+};
+
+let fastFetchCookieHeader = '';
+
+const CSV_FIELDS = ['title', 'company', 'location', 'salary', 'contract', 'remote', 'publishedDate', 'description', 'url', 'offerId', 'scrapedAt'];
+
 class Logger {
   constructor(logFile) {
     this.logFile = logFile;
@@ -51,51 +94,274 @@ class Logger {
 const logger = new Logger(CONFIG.logFile);
 
 class ProgressManager {
-  constructor(progressFile) {
-    this.progressFile = progressFile;
+  constructor(journalFile) {
+    this.journalFile = journalFile;
+    this.journalId = null;
+    this.generation = 0;
+    this.runStarted = false;
+    this.eventsSinceCompaction = 0;
     this.data = this.load();
+    this.migrateLegacyProgress();
+    // À côté du journal (offres.jsonl → offres_retry.jsonl) : survit aux fins de run et aux reset
+    this.retryQueue = new RetryQueue(journalFile.replace(/(\.jsonl)?$/, '_retry.jsonl'), {
+      maxAttempts: CONFIG.retryMaxAttempts,
+      baseDelayMs: CONFIG.retryBaseDelayMinutes * 60 * 1000
+    });
   }
 
-  load() {
-    try {
-      if (fs.existsSync(this.progressFile)) {
-        return JSON.parse(fs.readFileSync(this.progressFile, 'utf8'));
-      }
-    } catch (error) {
-      logger.error(`Erreur chargement progression: ${error.message}`);
-    }
+  emptyState() {
     return {
-      lastPage: 0,
-      scrapedUrls: [],
+      shards: {},
+      scrapedIds: new Set(),
       jobOffers: [],
       startTime: Date.now(),
       captchaCount: 0
     };
   }
 
-  save() {
-    const dir = this.progressFile.split('/').slice(0, -1).join('/');
+  readEvents() {
+    if (!fs.existsSync(this.journalFile)) return [];
+
+    const content = fs.readFileSync(this.journalFile, 'utf8');
+    if (content && !content.endsWith('\n')) {
+      // Dernière ligne incomplète (arrêt brutal) : on la termine pour ne pas corrompre la suivante
+      fs.appendFileSync(this.journalFile, '\n');
+    }
+
+    const events = [];
+    for (const line of content.split('\n')) {
+      if (!line.trim()) continue;
+      try {
+        events.push(JSON.parse(line));
+      } catch {}
+    }
+    return events;
+  }
+
+  load() {
+    let state = this.emptyState();
+
+    try {
+      for (const event of this.readEvents()) {
+        switch (event.type) {
+          case 'header':
+            this.journalId = event.journalId;
+            this.generation = event.generation || 0;
+            break;
+          case 'run_start':
+            state.startTime = event.ts;
+            this.runStarted = true;
+            break;
+          case 'offer':
+            state.jobOffers.push(event.offer);
+            state.scrapedIds.add(event.offer.offerId || computeOfferId(event.offer.url));
+            break;
+          case 'page':
+            this.shardState(state, event.shard).lastPage = event.page;
+            break;
+          case 'resume_page':
+            this.shardState(state, event.shard).resumePage = { page: event.page, url: event.url };
+            break;
+          case 'shard_done':
+            this.shardState(state, event.shard).done = true;
+            break;
+          case 'captcha':
+            state.captchaCount++;
+            break;
+          case 'state':
+            state.shards = event.shards || {};
+            state.captchaCount = event.captchaCount;
+            break;
+          case 'run_end':
+          case 'reset':
+            state = this.emptyState();
+            this.runStarted = false;
+            break;
+        }
+      }
+    } catch (error) {
+      logger.error(`Erreur chargement journal: ${error.message}`);
+    }
+
+    return state;
+  }
+
+  shardState(state, key = defaultShardKey()) {
+    if (!state.shards[key]) state.shards[key] = { lastPage: 0, resumePage: null, done: false };
+    return state.shards[key];
+  }
+
+  getShard(key) {
+    return this.shardState(this.data, key);
+  }
+
+  getPagesScraped() {
+    return Object.values(this.data.shards).reduce((total, shard) => total + shard.lastPage, 0);
+  }
+
+  migrateLegacyProgress() {
+    if (!fs.existsSync(CONFIG.legacyProgressFile)) return;
+
+    try {
+      const legacy = JSON.parse(fs.readFileSync(CONFIG.legacyProgressFile, 'utf8'));
+      this.data.startTime = legacy.startTime || this.data.startTime;
+      for (const job of legacy.jobOffers || []) {
+        job.offerId = computeOfferId(job.url);
+        if (this.data.scrapedIds.has(job.offerId)) continue;
+        this.data.jobOffers.push(job);
+        this.data.scrapedIds.add(job.offerId);
+        this.appendEvent({ type: 'offer', offer: job });
+      }
+      for (let i = 0; i < (legacy.captchaCount || 0); i++) this.incrementCaptcha();
+      if (legacy.lastPage) this.setLastPage(defaultShardKey(), legacy.lastPage);
+      fs.unlinkSync(CONFIG.legacyProgressFile);
+      logger.info(`Progression ${CONFIG.legacyProgressFile} migrée vers ${this.journalFile}`);
+    } catch (error) {
+      logger.error(`Erreur migration progression: ${error.message}`);
+    }
+  }
+
+  appendEvent(event) {
+    const dir = this.journalFile.split('/').slice(0, -1).join('/');
     if (dir) fs.mkdirSync(dir, { recursive: true });
-    fs.writeFileSync(this.progressFile, JSON.stringify(this.data, null, 2));
+
+    let lines = '';
+    if (!fs.existsSync(this.journalFile)) {
+      this.journalId = `${Date.now().toString(36)}-${crypto.randomBytes(4).toString('hex')}`;
+      this.generation = 0;
+      lines += JSON.stringify({ type: 'header', journalId: this.journalId, generation: 0, createdAt: Date.now() }) + '\n';
+    }
+
+    const isBoundary = event.type === 'run_end' || event.type === 'reset';
+    if (!this.runStarted && !isBoundary) {
+      lines += JSON.stringify({ type: 'run_start', ts: this.data.startTime }) + '\n';
+      this.runStarted = true;
+    }
+    if (isBoundary) this.runStarted = false;
+
+    lines += JSON.stringify({ ...event, ts: Date.now() }) + '\n';
+    fs.appendFileSync(this.journalFile, lines);
+
+    if (event.type !== 'offer') this.eventsSinceCompaction++;
+  }
+
+  consumedOfferCount(journalId) {
+    // Nombre d'offres déjà lues par le filtre (curseur de src/analyzer/journal_reader.py)
+    try {
+      const cursor = JSON.parse(fs.readFileSync(CONFIG.journalCursorFile, 'utf8'));
+      return cursor.journal_id === journalId ? cursor.offer_count || 0 : 0;
+    } catch {
+      return 0;
+    }
+  }
+
+  compact() {
+    // Réécrit le journal sans les événements de progression intermédiaires.
+    // Les offres gardent leur ordre : le lecteur Python s'y retrouve via le nombre d'offres lues.
+    // Les offres des runs terminés déjà lues par le filtre sont retirées : droppedOffers les compte
+    // pour que le rang des offres restantes ne change pas côté lecteur.
+    try {
+      const events = this.readEvents();
+      const header = events.find(event => event.type === 'header');
+      const journalId = header ? header.journalId : this.journalId;
+      const consumedOffers = this.consumedOfferCount(journalId);
+      const lastBoundary = events.findLastIndex(event => event.type === 'run_end' || event.type === 'reset');
+
+      const keptTypes = ['run_start', 'offer', 'run_end', 'reset'];
+      const keptLines = [];
+      let droppedOffers = header?.droppedOffers || 0;
+      let offerRank = droppedOffers;
+      events.forEach((event, index) => {
+        if (!keptTypes.includes(event.type)) return;
+        if (event.type === 'offer') offerRank++;
+        // Avant la dernière fin de run, le scraper n'a plus besoin de rien : seules restent les offres non lues
+        if (index < lastBoundary) {
+          if (event.type !== 'offer') return;
+          if (offerRank <= consumedOffers) {
+            droppedOffers++;
+            return;
+          }
+        }
+        keptLines.push(JSON.stringify(event));
+      });
+
+      const lines = [JSON.stringify({
+        type: 'header',
+        journalId,
+        generation: this.generation + 1,
+        createdAt: header ? header.createdAt : Date.now(),
+        compactedAt: Date.now(),
+        droppedOffers
+      }), ...keptLines];
+      if (this.runStarted) {
+        lines.push(JSON.stringify({
+          type: 'state',
+          ts: Date.now(),
+          shards: this.data.shards,
+          captchaCount: this.data.captchaCount
+        }));
+      }
+
+      const tmpFile = `${this.journalFile}.tmp`;
+      fs.writeFileSync(tmpFile, lines.join('\n') + '\n');
+      fs.renameSync(tmpFile, this.journalFile);
+
+      this.generation++;
+      this.eventsSinceCompaction = 0;
+      logger.info(`Journal compacté (génération ${this.generation})`);
+    } catch (error) {
+      logger.error(`Erreur compaction journal: ${error.message}`);
+    }
   }
 
   reset() {
-    this.data = {
-      lastPage: 0,
-      scrapedUrls: [],
-      jobOffers: [],
-      startTime: Date.now(),
-      captchaCount: 0
-    };
-    this.save();
+    this.appendEvent({ type: 'reset' });
+    this.data = this.emptyState();
+  }
+
+  endRun() {
+    this.appendEvent({ type: 'run_end' });
+    this.compact();
+    this.data = this.emptyState();
+  }
+
+  hasOffer(url) {
+    return this.data.scrapedIds.has(computeOfferId(url));
+  }
+
+  recordFailure(url, reason) {
+    return this.retryQueue.recordFailure(computeOfferId(url), reason, { url });
+  }
+
+  clearFailure(url) {
+    this.retryQueue.recordSuccess(computeOfferId(url));
   }
 
   addJob(job) {
-    if (!this.data.scrapedUrls.includes(job.url)) {
+    job.offerId = job.offerId || computeOfferId(job.url);
+    job.scrapedAt = job.scrapedAt || new Date().toISOString();
+    if (!this.data.scrapedIds.has(job.offerId)) {
+      const isFirstOfRun = this.data.jobOffers.length === 0;
       this.data.jobOffers.push(job);
-      this.data.scrapedUrls.push(job.url);
-      this.save();
-      this.saveToCSV();
+      this.data.scrapedIds.add(job.offerId);
+      this.appendEvent({ type: 'offer', offer: job });
+      this.appendToCSV(job, isFirstOfRun);
+    }
+  }
+
+  appendToCSV(job, truncate) {
+    try {
+      const directory = CONFIG.outputPath.split('/').slice(0, -1).join('/');
+      if (directory) fs.mkdirSync(directory, { recursive: true });
+
+      if (truncate || !fs.existsSync(CONFIG.outputPath)) {
+        fs.writeFileSync(CONFIG.outputPath, parse([job], { fields: CSV_FIELDS, eol: os.EOL }));
+      } else {
+        fs.appendFileSync(CONFIG.outputPath, os.EOL + parse([job], { fields: CSV_FIELDS, eol: os.EOL, header: false }));
+      }
+      logger.success(`CSV mis à jour: ${this.data.jobOffers.length} offres`);
+    } catch (error) {
+      logger.error(`Erreur sauvegarde CSV: ${error.message}`);
     }
   }
 
@@ -103,9 +369,7 @@ class ProgressManager {
     if (this.data.jobOffers.length === 0) return;
 
     try {
-      const csvContent = parse(this.data.jobOffers, {
-        fields: ['title', 'company', 'location', 'salary', 'contract', 'remote', 'publishedDate', 'description', 'url']
-      });
+      const csvContent = parse(this.data.jobOffers, { fields: CSV_FIELDS, eol: os.EOL });
 
       const directory = CONFIG.outputPath.split('/').slice(0, -1).join('/');
       if (directory) fs.mkdirSync(directory, { recursive: true });
@@ -117,17 +381,60 @@ class ProgressManager {
     }
   }
 
-  setLastPage(pageNumber) {
-    this.data.lastPage = pageNumber;
-    this.save();
+  setLastPage(shardKey, pageNumber) {
+    this.getShard(shardKey).lastPage = pageNumber;
+    this.appendEvent({ type: 'page', shard: shardKey, page: pageNumber });
+    if (this.eventsSinceCompaction >= CONFIG.journalCompactEvery) this.compact();
+  }
+
+  setResumePage(shardKey, pageNumber, pageUrl) {
+    this.getShard(shardKey).resumePage = { page: pageNumber, url: pageUrl };
+    this.appendEvent({ type: 'resume_page', shard: shardKey, page: pageNumber, url: pageUrl });
+  }
+
+  markShardDone(shardKey) {
+    this.getShard(shardKey).done = true;
+    this.appendEvent({ type: 'shard_done', shard: shardKey });
   }
 
   incrementCaptcha() {
     this.data.captchaCount++;
-    this.save();
+    this.appendEvent({ type: 'captcha' });
   }
 }
 
+function shardKey(query, location) {
+  return `${query} @ ${location}`;
+}
+
+function defaultShardKey() {
+  return shardKey(CONFIG.searchQuery, CONFIG.location);
+}
+
+function buildJobMatrix() {
+  const queries = CONFIG.searchQueries.length > 0 ? CONFIG.searchQueries : [CONFIG.searchQuery];
+  const locations = CONFIG.searchLocations.length > 0 ? CONFIG.searchLocations : [CONFIG.location];
+  return queries.flatMap(query => locations.map(location => ({ query, location, key: shardKey(query, location) })));
+}
+
+class RateLimiter {
+  // Limite globale de navigations, partagée par tous les shards et onglets
+  constructor() {
+    this.nextSlot = 0;
+  }
+
+  async acquire() {
+    if (!(CONFIG.maxRequestsPerMinute > 0)) return;
+
+    const now = Date.now();
+    const slot = Math.max(now, this.nextSlot);
+    this.nextSlot = slot + 60000 / CONFIG.maxRequestsPerMinute;
+    if (slot > now) await new Promise(resolve => setTimeout(resolve, slot - now));
+  }
+}
+
+const rateLimiter = new RateLimiter();
+
 const randomDelay = (minDelay = CONFIG.delays.min, maxDelay = CONFIG.delays.max) =>
   new Promise(resolve => setTimeout(resolve, Math.random() * (maxDelay - minDelay) + minDelay));
 
@@ -144,11 +451,53 @@ async function humanScroll(page) {
   }
 }
 
+// Onglets ouverts par ce run : à fermer avant de se détacher d'un navigateur partagé
+const ownedPages = new Set();
+let isSharedBrowser = false;
+// Navigateur du run en cours : libéré aussi par les sorties anticipées (captcha, Ctrl+C)
+let activeBrowser = null;
+
+async function openPage(browser) {
+  const page = await browser.newPage();
+  ownedPages.add(page);
+  return page;
+}
+
+function readBrowserEndpoint() {
+  if (CONFIG.browserWSEndpoint) return CONFIG.browserWSEndpoint;
+  if (fs.existsSync(CONFIG.browserEndpointFile)) return fs.readFileSync(CONFIG.browserEndpointFile, 'utf8').trim();
+  return null;
+}
+
 async function connectBrowser() {
+  const browserWSEndpoint = readBrowserEndpoint();
+
+  if (browserWSEndpoint) {
+    try {
+      const browser = await puppeteer.connect({
+        browserWSEndpoint,
+        defaultViewport: { width: 1280, height: 720 }
+      });
+      isSharedBrowser = true;
+      activeBrowser = browser;
+      console.log(colors.cyan('🔌 Connexion au navigateur persistant existant'));
+      return browser;
+    } catch (error) {
+      logger.info(`Navigateur persistant injoignable (${browserWSEndpoint}): ${error.message} - lancement d'un nouveau`);
+    }
+  }
+
   console.log(colors.cyan(`🚀 Lancement du navigateur ${CONFIG.headless ? '(headless)' : '(visible)'}...`));
+  isSharedBrowser = false;
+  activeBrowser = await launchBrowser(CONFIG.browserProfileDir);
+  return activeBrowser;
+}
+
+async function launchBrowser(userDataDir) {
   return await puppeteer.launch({
     headless: CONFIG.headless,
     executablePath: CONFIG.browserExecutable,
+    userDataDir,
     defaultViewport: { width: 1280, height: 720 },
     args: [
       '--no-sandbox',
@@ -160,9 +509,35 @@ async function connectBrowser() {
   });
 }
 
+async function releaseBrowser(browser) {
+  if (browser === activeBrowser) activeBrowser = null;
+  if (!isSharedBrowser) {
+    await browser.close();
+    return;
+  }
+
+  for (const page of ownedPages) {
+    if (!page.isClosed()) await page.close().catch(() => {});
+  }
+  ownedPages.clear();
+  await browser.disconnect();
+}
+
+async function releaseActiveBrowser() {
+  // Avant process.exit() : onglets du run fermés puis déconnexion (ou fermeture du navigateur lancé)
+  if (!activeBrowser) return;
+  try {
+    await releaseBrowser(activeBrowser);
+  } catch (error) {
+    logger.error(`Libération du navigateur échouée: ${error.message}`);
+  }
+}
+
 async function acceptCookies(page) {
+  // Avec un profil réutilisé, le consentement est déjà enregistré : inutile d'attendre longtemps la bannière
+  const bannerTimeout = isSharedBrowser || CONFIG.browserProfileDir ? 1500 : 5000;
   try {
-    await page.waitForSelector('button[aria-label="Accepter les cookies"]', { timeout: 5000 });
+    await page.waitForSelector('button[aria-label="Accepter les cookies"]', { timeout: bannerTimeout });
     await randomDelay(500, 1000);
     await page.click('button[aria-label="Accepter les cookies"]');
     await randomDelay(1000, 1500);
@@ -189,7 +564,7 @@ async function hasCaptcha(page) {
     }
 
     const bodyText = await page.evaluate(() => document.body?.innerText || '');
-    if (/vérifiez que vous êtes humain|prouvez que vous êtes|verify you are human/gi.test(bodyText)) {
+    if (CAPTCHA_TEXT_PATTERN.test(bodyText)) {
       return true;
     }
 
@@ -202,7 +577,6 @@ async function hasCaptcha(page) {
 async function handleCaptchaIfNeeded(page, progressManager) {
   if (await hasCaptcha(page)) {
     progressManager.incrementCaptcha();
-    progressManager.save();
     progressManager.saveToCSV();
 
     console.log(colors.bold.red('\n\n🤖 ═══════════════════════════════════════'));
@@ -211,7 +585,7 @@ async function handleCaptchaIfNeeded(page, progressManager) {
 
     console.log(colors.yellow(`📊 Progression actuelle :`));
     console.log(colors.white(`   • Offres scrappées : ${progressManager.data.jobOffers.length}`));
-    console.log(colors.white(`   • Dernière page : ${progressManager.data.lastPage}`));
+    console.log(colors.white(`   • Pages scrapées : ${progressManager.getPagesScraped()}`));
     console.log(colors.white(`   • Captchas rencontrés : ${progressManager.data.captchaCount}`));
 
     console.log(colors.cyan('\n📝 Instructions :'));
@@ -222,6 +596,9 @@ async function handleCaptchaIfNeeded(page, progressManager) {
 
     console.log(colors.green(`💾 Données sauvegardées dans : ${CONFIG.outputPath}\n`));
 
+    // Dans un navigateur partagé, l'onglet du captcha reste ouvert pour être résolu
+    ownedPages.delete(page);
+    await releaseActiveBrowser();
     process.exit(0);
   }
   return false;
@@ -246,159 +623,190 @@ async function isPage404(page) {
   }
 }
 
-async function extractJobDetails(jobTab, jobUrl) {
+async function fetchJobDetails(jobUrl) {
+  // Chemin rapide sans rendu : HTML brut + mêmes sélecteurs que le navigateur.
+  // Retourne undefined pour se replier sur le navigateur, null pour une offre à ignorer.
   try {
-    const hasDescription = await jobTab.waitForSelector('#jobDescriptionText', { timeout: 8000 })
-      .then(() => true)
-      .catch(() => false);
-
-    if (!hasDescription) {
-      if (await isPage404(jobTab)) {
-        logger.info(`Page 404 skippée: ${jobUrl}`);
-        return null;
-      }
-      throw new Error('Description non trouvée');
+    const response = await fetch(jobUrl, {
+      headers: { ...FAST_FETCH_HEADERS, ...(fastFetchCookieHeader ? { Cookie: fastFetchCookieHeader } : {}) },
+      redirect: 'follow',
+      signal: AbortSignal.timeout(15000)
+    });
+
+    if (response.status === 404) {
+      logger.info(`404 détecté (fetch direct): ${jobUrl}`);
+      return null;
     }
+    if (!response.ok) return undefined;
 
-    await humanScroll(jobTab);
-    await randomDelay(800, 1200);
-
-    const jobDetails = await jobTab.evaluate(() => {
-      const titleElement =
-        document.querySelector('.jobsearch-JobInfoHeader-title') ||
-        document.querySelector('h1') ||
-        document.querySelector('[data-testid="jobsearch-JobInfoHeader-title"]');
-
-      const companySelectors = [
-        '.jobsearch-CompanyInfoContainer a',
-        '[data-testid="inlineHeader-companyName"]',
-        '[data-company-name]',
-        '.jobsearch-CompanyInfoWithoutHeaderImage a',
-        'div[data-testid="inlineHeader-companyName"] span'
-      ];
-
-      let companyElement = null;
-      for (const selector of companySelectors) {
-        companyElement = document.querySelector(selector);
-        if (companyElement && companyElement.innerText.trim()) break;
-      }
+    const siteDomain = new URL(CONFIG.baseUrl).hostname;
+    if (!response.url.includes(siteDomain)) return null;
 
-      const locationElement = document.querySelector('[data-testid="inlineHeader-companyLocation"]') ||
-                             document.querySelector('.jobsearch-JobInfoHeader-subtitle div');
+    const html = await response.text();
+    if (CAPTCHA_TEXT_PATTERN.test(html) || /recaptcha|captcha-form/i.test(html)) return undefined;
 
-      const salaryElement = document.querySelector('.jobsearch-JobMetadataHeader-item') ||
-                           document.querySelector('[data-testid="attribute_snippet_testid"]');
+    const rawFields = extractFieldsFromHtml(html, JOB_SELECTORS);
+    if (!rawFields.description) return undefined;
 
-      const dateElement = document.querySelector('.jobsearch-JobMetadataFooter > div');
+    return { jobDetails: buildJobDetails(rawFields, jobUrl), finalUrl: response.url };
+  } catch (error) {
+    logger.info(`Fetch direct échoué pour ${jobUrl}: ${error.message} - repli navigateur`);
+    return undefined;
+  }
+}
 
-      const descriptionElement = document.querySelector('#jobDescriptionText');
-      const fullDescription = descriptionElement?.innerText.trim() || '';
+function assignOfferIdentity(jobDetails, jobUrl, finalUrl) {
+  // Les liens sponsorisés n'ont pas de clé d'offre : on prend l'URL finale après redirection si elle en a une
+  jobDetails.url = canonicalOfferUrl(hasStableJobKey(finalUrl) ? finalUrl : jobUrl);
+  jobDetails.offerId = computeOfferId(jobDetails.url);
+  return jobDetails;
+}
 
-      let contractType = 'Non précisé';
-      const contractMatch = fullDescription.match(/alternance|stage|CDI|CDD|freelance/gi);
-      if (contractMatch) contractType = contractMatch[0];
+function recordJob(jobDetails, jobUrl, finalUrl, progressManager) {
+  progressManager.addJob(assignOfferIdentity(jobDetails, jobUrl, finalUrl));
+  logger.success(`Scrappé: ${jobDetails.title} chez ${jobDetails.company}`);
+}
 
-      const isRemote = /télétravail|remote|distanciel|100% remote/gi.test(fullDescription);
+async function extractJobDetails(jobTab, jobUrl) {
+  // Page 404 → null (définitif) ; les autres échecs remontent à l'appelant (file de reprise)
+  const hasDescription = await jobTab.waitForSelector('#jobDescriptionText', { timeout: 8000 })
+    .then(() => true)
+    .catch(() => false);
+
+  if (!hasDescription) {
+    if (await isPage404(jobTab)) {
+      logger.info(`Page 404 skippée: ${jobUrl}`);
+      return null;
+    }
+    throw new Error('Description non trouvée');
+  }
 
-      return {
-        title: titleElement ? titleElement.innerText.trim() : '(titre absent)',
-        company: companyElement ? companyElement.innerText.trim() : '(entreprise absente)',
-        location: locationElement ? locationElement.innerText.trim() : 'Non précisé',
-        salary: salaryElement ? salaryElement.innerText.trim() : 'Non précisé',
-        contract: contractType,
-        remote: isRemote ? 'Oui' : 'Non',
-        publishedDate: dateElement ? dateElement.innerText.trim() : 'Non précisé',
-        description: fullDescription
-      };
-    });
+  await humanScroll(jobTab);
+  await randomDelay(800, 1200);
 
-    jobDetails.url = jobUrl;
-    return jobDetails;
-  } catch (error) {
-    logger.error(`Extraction échouée pour ${jobUrl}: ${error.message}`);
-    return null;
-  }
+  const rawFields = await jobTab.evaluate(readJobFields, JOB_SELECTORS);
+
+  return buildJobDetails(rawFields, jobUrl);
 }
 
-async function scrapeJob(browser, jobUrl, progressManager, progressBar) {
-  if (progressManager.data.scrapedUrls.includes(jobUrl)) {
-    return null;
+async function loadJobDetails(jobTab, jobUrl, progressManager) {
+  if (CONFIG.fastFetch) {
+    await rateLimiter.acquire();
+    const fastResult = await fetchJobDetails(jobUrl);
+    if (fastResult !== undefined) {
+      if (fastResult) recordJob(fastResult.jobDetails, jobUrl, fastResult.finalUrl, progressManager);
+      return fastResult ? fastResult.jobDetails : null;
+    }
   }
 
-  const jobTab = await browser.newPage();
+  await rateLimiter.acquire();
+  const response = await jobTab.goto(jobUrl, {
+    waitUntil: 'domcontentloaded',
+    timeout: 25000
+  });
 
-  try {
-    const response = await jobTab.goto(jobUrl, {
-      waitUntil: 'domcontentloaded',
-      timeout: 25000
-    });
+  if (!response || response.status() === 404) {
+    logger.info(`404 détecté: ${jobUrl}`);
+    return null;
+  }
 
-    if (!response || response.status() === 404) {
-      logger.info(`404 détecté: ${jobUrl}`);
-      await jobTab.close();
-      progressBar.increment();
-      return null;
-    }
+  await randomDelay(CONFIG.delays.betweenJobs, CONFIG.delays.betweenJobs + 1000);
 
-    await randomDelay(CONFIG.delays.betweenJobs, CONFIG.delays.betweenJobs + 1000);
+  const currentUrl = jobTab.url();
+  const siteDomain = new URL(CONFIG.baseUrl).hostname;
 
-    const currentUrl = jobTab.url();
-    const siteDomain = new URL(CONFIG.baseUrl).hostname;
+  if (!currentUrl.includes(siteDomain)) {
+    return null;
+  }
 
-    if (!currentUrl.includes(siteDomain)) {
-      await jobTab.close();
-      progressBar.increment();
-      return null;
-    }
+  const jobDetails = await extractJobDetails(jobTab, jobUrl);
 
-    const jobDetails = await extractJobDetails(jobTab, jobUrl);
+  if (jobDetails) {
+    recordJob(jobDetails, jobUrl, currentUrl, progressManager);
+  }
+  return jobDetails;
+}
 
-    if (jobDetails) {
-      progressManager.addJob(jobDetails);
-      progressBar.increment();
-      logger.success(`Scrappé: ${jobDetails.title} chez ${jobDetails.company}`);
-    } else {
-      progressBar.increment();
-    }
+async function scrapeJob(jobTab, jobUrl, progressManager, progressBar) {
+  if (progressManager.hasOffer(jobUrl)) {
+    return null;
+  }
 
-    await jobTab.close();
+  try {
+    const jobDetails = await loadJobDetails(jobTab, jobUrl, progressManager);
+    progressManager.clearFailure(jobUrl);
     return jobDetails;
-
   } catch (error) {
+    // Échec transitoire : l'URL part en file de reprise au lieu d'être perdue
+    const failure = progressManager.recordFailure(jobUrl, error.message);
+    const outcome = failure.dead ? `abandonnée après ${failure.attempts} tentatives` : `tentative ${failure.attempts}, mise en reprise`;
     if (error.message.includes('Navigation timeout')) {
-      logger.info(`Timeout sur ${jobUrl} - skip`);
+      logger.info(`Timeout sur ${jobUrl} - ${outcome}`);
     } else {
-      logger.error(`Erreur scraping ${jobUrl}: ${error.message}`);
+      logger.error(`Erreur scraping ${jobUrl}: ${error.message} - ${outcome}`);
     }
-    await jobTab.close();
-    progressBar.increment();
     return null;
+  } finally {
+    progressBar.increment();
+  }
+}
+
+async function openDetailTab(browser) {
+  const tab = await openPage(browser);
+
+  if (CONFIG.blockResources) {
+    await tab.setRequestInterception(true);
+    tab.on('request', request => {
+      if (request.isInterceptResolutionHandled()) return;
+      if (BLOCKED_RESOURCE_TYPES.has(request.resourceType()) || BLOCKED_URL_PATTERN.test(request.url())) {
+        request.abort();
+      } else {
+        request.continue();
+      }
+    });
+  }
+
+  return tab;
+}
+
+async function createTabPool(browser, size) {
+  const tabPool = [];
+  for (let i = 0; i < size; i++) {
+    tabPool.push(await openDetailTab(browser));
   }
+  return tabPool;
 }
 
-async function scrapeJobsParallel(browser, jobLinks, progressManager, progressBar) {
+async function scrapeJobsParallel(browser, tabPool, jobLinks, progressManager, progressBar) {
+  // File de travail partagée : chaque onglet prend l'URL suivante dès qu'il a fini,
+  // une navigation lente ne bloque plus les autres onglets
   const results = [];
+  let nextLinkIndex = 0;
 
-  for (let i = 0; i < jobLinks.length; i += CONFIG.parallelTabs) {
-    const batch = jobLinks.slice(i, i + CONFIG.parallelTabs);
+  const runWorker = async (workerIndex) => {
+    while (nextLinkIndex < jobLinks.length) {
+      const jobUrl = jobLinks[nextLinkIndex++];
 
-    const batchPromises = batch.map(jobUrl =>
-      scrapeJob(browser, jobUrl, progressManager, progressBar)
-    );
+      if (tabPool[workerIndex].isClosed()) {
+        tabPool[workerIndex] = await openDetailTab(browser);
+      }
 
-    const batchResults = await Promise.all(batchPromises);
-    results.push(...batchResults.filter(job => job !== null));
+      const jobDetails = await scrapeJob(tabPool[workerIndex], jobUrl, progressManager, progressBar);
+      if (jobDetails) results.push(jobDetails);
 
-    await randomDelay(2000, 3000);
-  }
+      await randomDelay(2000, 3000);
+    }
+  };
 
+  await Promise.all(tabPool.map((_, workerIndex) => runWorker(workerIndex)));
   return results;
 }
 
-async function scrapeCurrentPage(browser, page, progressManager, progressBar) {
+async function scrapeCurrentPage(browser, page, tabPool, progressManager, progressBar) {
   await humanScroll(page);
   await randomDelay(1500, 2000);
 
+  // La barre est partagée par les shards : seul main() l'arrête, sauf captcha qui termine tout le processus
   if (await hasCaptcha(page)) {
     progressBar.stop();
     await handleCaptchaIfNeeded(page, progressManager);
@@ -408,7 +816,6 @@ async function scrapeCurrentPage(browser, page, progressManager, progressBar) {
   try {
     await page.waitForSelector('.job_seen_beacon h2 a', { timeout: 15000 });
   } catch {
-    progressBar.stop();
     console.log(colors.yellow('⚠️  Aucune offre détectée sur cette page'));
     return false;
   }
@@ -417,18 +824,40 @@ async function scrapeCurrentPage(browser, page, progressManager, progressBar) {
     [...document.querySelectorAll('.job_seen_beacon h2 a')].map(link => link.href)
   );
 
-  const newJobLinks = jobLinks.filter(url => !progressManager.data.scrapedUrls.includes(url));
+  const pageOfferIds = new Set();
+  const newJobLinks = jobLinks.filter(url => {
+    const offerId = computeOfferId(url);
+    if (pageOfferIds.has(offerId) || progressManager.data.scrapedIds.has(offerId)) return false;
+    pageOfferIds.add(offerId);
+    return true;
+  });
 
   console.log(colors.cyan(`\n🔍 ${jobLinks.length} offres sur la page | ${newJobLinks.length} nouvelles à scraper`));
 
   if (newJobLinks.length > 0) {
     progressBar.setTotal(progressBar.getTotal() + newJobLinks.length);
-    await scrapeJobsParallel(browser, newJobLinks, progressManager, progressBar);
+    await scrapeJobsParallel(browser, tabPool, newJobLinks, progressManager, progressBar);
   }
 
   return true;
 }
 
+function buildResultsPageUrl(searchUrl, pageNumber) {
+  const resultsUrl = new URL(searchUrl);
+  if (pageNumber > 1) {
+    resultsUrl.searchParams.set(CONFIG.pageOffsetParam, String((pageNumber - 1) * CONFIG.resultsPerPage));
+  }
+  return resultsUrl.toString();
+}
+
+function getResumeUrl(searchUrl, shardState) {
+  // Reprise directe sur la page sauvegardée : URL enregistrée si elle correspond, sinon URL reconstruite par offset
+  const pageNumber = shardState.lastPage + 1;
+  const { resumePage } = shardState;
+  if (resumePage && resumePage.page === pageNumber && resumePage.url) return resumePage.url;
+  return buildResultsPageUrl(searchUrl, pageNumber);
+}
+
 async function goToNextPage(page) {
   const nextButton = await page.$('a[data-testid="pagination-page-next"]');
   if (!nextButton) return false;
@@ -436,6 +865,7 @@ async function goToNextPage(page) {
   try {
     await humanScroll(page);
     await randomDelay(1500, 2000);
+    await rateLimiter.acquire();
 
     await Promise.all([
       page.waitForNavigation({ waitUntil: 'domcontentloaded', timeout: 30000 }),
@@ -450,20 +880,110 @@ async function goToNextPage(page) {
   }
 }
 
+async function closeOwnedPages(pages) {
+  for (const page of pages) {
+    ownedPages.delete(page);
+    if (!page.isClosed()) await page.close().catch(() => {});
+  }
+}
+
+async function retryFailedOffers(browser, progressManager, progressBar) {
+  // Offres en échec des runs précédents dont le backoff est écoulé : retentées avant les nouvelles pages
+  const dueUrls = [];
+  for (const entry of progressManager.retryQueue.dueEntries()) {
+    if (progressManager.hasOffer(entry.url)) {
+      progressManager.clearFailure(entry.url);
+    } else {
+      dueUrls.push(entry.url);
+    }
+  }
+  if (dueUrls.length === 0) return;
+
+  console.log(colors.cyan(`\n🔁 ${dueUrls.length} offre(s) en échec à reprendre`));
+  const tabPool = await createTabPool(browser, Math.min(CONFIG.parallelTabs, dueUrls.length));
+  try {
+    progressBar.setTotal(progressBar.getTotal() + dueUrls.length);
+    await scrapeJobsParallel(browser, tabPool, dueUrls, progressManager, progressBar);
+  } finally {
+    await closeOwnedPages(tabPool);
+  }
+}
+
+async function scrapeShard(browser, shard, progressManager, progressBar) {
+  const page = await openPage(browser);
+  const tabPool = await createTabPool(browser, CONFIG.parallelTabs);
+  const shardState = progressManager.getShard(shard.key);
+
+  try {
+    const searchUrl = `${CONFIG.baseUrl}${CONFIG.searchPath}?q=${encodeURIComponent(shard.query)}&l=${encodeURIComponent(shard.location)}`;
+    let pageNumber = shardState.lastPage + 1;
+
+    if (pageNumber > 1) {
+      console.log(colors.cyan(`⏩ [${shard.key}] Reprise directe à la page ${pageNumber}`));
+    }
+    await rateLimiter.acquire();
+    await page.goto(getResumeUrl(searchUrl, shardState), { waitUntil: 'domcontentloaded' });
+
+    await randomDelay(2000, 3000);
+    await acceptCookies(page);
+
+    if (CONFIG.fastFetch && !fastFetchCookieHeader) {
+      fastFetchCookieHeader = (await page.cookies()).map(cookie => `${cookie.name}=${cookie.value}`).join('; ');
+    }
+
+    if (await hasCaptcha(page)) {
+      await handleCaptchaIfNeeded(page, progressManager);
+    }
+
+    while (pageNumber <= CONFIG.maxPages) {
+      console.log(colors.bold.cyan(`\n${'─'.repeat(50)}`));
+      console.log(colors.bold.white(`📄 [${shard.key}] PAGE ${pageNumber}/${CONFIG.maxPages}`));
+      console.log(colors.gray(`Offres totales: ${progressManager.data.jobOffers.length}`));
+      console.log(colors.bold.cyan(`${'─'.repeat(50)}`));
+
+      const shouldContinue = await scrapeCurrentPage(browser, page, tabPool, progressManager, progressBar);
+      if (!shouldContinue) break;
+
+      progressManager.setLastPage(shard.key, pageNumber);
+
+      if (pageNumber < CONFIG.maxPages) {
+        console.log(colors.yellow('\n⏳ Navigation vers la page suivante...'));
+        const hasNextPage = await goToNextPage(page);
+        if (!hasNextPage) {
+          console.log(colors.yellow('⚠️  Pas de page suivante'));
+          break;
+        }
+        progressManager.setResumePage(shard.key, pageNumber + 1, page.url());
+      }
+
+      pageNumber++;
+    }
+
+    progressManager.markShardDone(shard.key);
+  } finally {
+    await closeOwnedPages([page, ...tabPool]);
+  }
+}
+
 async function main() {
   let browser = null;
-  const progressManager = new ProgressManager(CONFIG.progressFile);
+  const progressManager = new ProgressManager(CONFIG.journalFile);
+  const jobMatrix = buildJobMatrix();
 
   console.log(colors.bold.cyan('\n🚀 SCRAPER D\'OFFRES D\'EMPLOI\n'));
   console.log(colors.gray('━'.repeat(50)));
-  console.log(colors.white(`📍 Recherche: "${CONFIG.searchQuery}" à "${CONFIG.location}"`));
+  if (jobMatrix.length === 1) {
+    console.log(colors.white(`📍 Recherche: "${jobMatrix[0].query}" à "${jobMatrix[0].location}"`));
+  } else {
+    console.log(colors.white(`📍 Recherches: ${jobMatrix.length} combinaisons requête × ville | ${CONFIG.shardConcurrency} en parallèle`));
+  }
   console.log(colors.white(`🌐 Site: ${CONFIG.baseUrl}`));
   console.log(colors.white(`🔧 Config: ${CONFIG.parallelTabs} onglets | Max ${CONFIG.maxPages} pages`));
   console.log(colors.white(`💾 Sauvegarde automatique`));
   console.log(colors.gray('━'.repeat(50)));
 
   if (progressManager.data.jobOffers.length > 0) {
-    console.log(colors.yellow(`\n⚠️  Progression: ${progressManager.data.jobOffers.length} offres | Page ${progressManager.data.lastPage}`));
+    console.log(colors.yellow(`\n⚠️  Progression: ${progressManager.data.jobOffers.length} offres | ${progressManager.getPagesScraped()} pages`));
     console.log(colors.yellow('Appuie sur ENTRÉE pour CONTINUER ou tape "reset" pour RECOMMENCER\n'));
 
     const choice = await new Promise(resolve => {
@@ -489,47 +1009,27 @@ async function main() {
 
   try {
     browser = await connectBrowser();
-    const page = await browser.newPage();
-
-    const searchUrl = `${CONFIG.baseUrl}${CONFIG.searchPath}?q=${encodeURIComponent(CONFIG.searchQuery)}&l=${encodeURIComponent(CONFIG.location)}`;
-    await page.goto(searchUrl, { waitUntil: 'domcontentloaded' });
-
-    await randomDelay(2000, 3000);
-    await acceptCookies(page);
-
-    if (await hasCaptcha(page)) {
-      await handleCaptchaIfNeeded(page, progressManager);
-    }
-
-    let pageNumber = progressManager.data.lastPage + 1;
-
-    for (let i = 1; i < pageNumber; i++) {
-      const hasNext = await goToNextPage(page);
-      if (!hasNext) break;
-    }
-
-    while (pageNumber <= CONFIG.maxPages) {
-      console.log(colors.bold.cyan(`\n${'─'.repeat(50)}`));
-      console.log(colors.bold.white(`📄 PAGE ${pageNumber}/${CONFIG.maxPages}`));
-      console.log(colors.gray(`Offres totales: ${progressManager.data.jobOffers.length}`));
-      console.log(colors.bold.cyan(`${'─'.repeat(50)}`));
-
-      const shouldContinue = await scrapeCurrentPage(browser, page, progressManager, progressBar);
-      if (!shouldContinue) break;
-
-      progressManager.setLastPage(pageNumber);
-
-      if (pageNumber < CONFIG.maxPages) {
-        console.log(colors.yellow('\n⏳ Navigation vers la page suivante...'));
-        const hasNextPage = await goToNextPage(page);
-        if (!hasNextPage) {
-          console.log(colors.yellow('⚠️  Pas de page suivante'));
-          break;
+    await retryFailedOffers(browser, progressManager, progressBar);
+
+    // Shards restants répartis sur SHARD_CONCURRENCY workers : index de dédoublonnage et journal partagés
+    const pendingShards = jobMatrix.filter(shard => !progressManager.getShard(shard.key).done);
+    let nextShardIndex = 0;
+    let failedShards = 0;
+
+    const runShardWorker = async () => {
+      while (nextShardIndex < pendingShards.length) {
+        const shard = pendingShards[nextShardIndex++];
+        try {
+          await scrapeShard(browser, shard, progressManager, progressBar);
+        } catch (error) {
+          failedShards++;
+          logger.error(`Shard "${shard.key}" interrompu: ${error.message}`);
         }
       }
+    };
 
-      pageNumber++;
-    }
+    const workerCount = Math.min(CONFIG.shardConcurrency, pendingShards.length);
+    await Promise.all(Array.from({ length: workerCount }, () => runShardWorker()));
 
     progressBar.stop();
 
@@ -537,14 +1037,22 @@ async function main() {
     console.log(colors.gray('━'.repeat(50)));
     console.log(colors.white(`📊 Statistiques:`));
     console.log(colors.white(`   • Offres trouvées: ${progressManager.data.jobOffers.length}`));
-    console.log(colors.white(`   • Pages scrapées: ${pageNumber - 1}`));
+    console.log(colors.white(`   • Recherches: ${jobMatrix.length}`));
+    console.log(colors.white(`   • Pages scrapées: ${progressManager.getPagesScraped()}`));
     console.log(colors.white(`   • Captchas résolus: ${progressManager.data.captchaCount}`));
+    const retryCounts = progressManager.retryQueue.counts();
+    if (retryCounts.pending > 0 || retryCounts.dead > 0) {
+      console.log(colors.white(`   • En reprise: ${retryCounts.pending} | abandonnées: ${retryCounts.dead} (${progressManager.retryQueue.file})`));
+    }
     console.log(colors.white(`   • Temps total: ${Math.round((Date.now() - progressManager.data.startTime) / 1000)}s`));
     console.log(colors.white(`   • Fichier: ${CONFIG.outputPath}`));
     console.log(colors.gray('━'.repeat(50)));
 
-    if (fs.existsSync(CONFIG.progressFile)) {
-      fs.unlinkSync(CONFIG.progressFile);
+    if (failedShards > 0) {
+      // La progression des shards interrompus est conservée pour la reprise
+      console.log(colors.yellow(`\n⚠️  ${failedShards} recherche(s) interrompue(s) - relance le script pour les reprendre\n`));
+    } else {
+      progressManager.endRun();
     }
 
   } catch (error) {
@@ -554,38 +1062,63 @@ async function main() {
     console.log(colors.yellow(`💾 ${progressManager.data.jobOffers.length} offres sauvegardées dans ${CONFIG.outputPath}`));
     console.log(colors.cyan('👉 Relance le script pour continuer.\n'));
   } finally {
-    if (browser) await browser.close();
+    progressManager.retryQueue.compact();
+    if (browser) await releaseBrowser(browser);
   }
 }
 
 let gracefulShutdown = false;
 
-process.on('SIGINT', async () => {
-  if (gracefulShutdown) {
-    console.log(colors.red('\n⚠️  Arrêt forcé !'));
-    process.exit(1);
-  }
+function registerShutdownHandler() {
+  process.on('SIGINT', async () => {
+    if (gracefulShutdown) {
+      console.log(colors.red('\n⚠️  Arrêt forcé !'));
+      process.exit(1);
+    }
 
-  gracefulShutdown = true;
+    gracefulShutdown = true;
 
-  console.log(colors.yellow('\n\n⚠️  ═══════════════════════════════════════'));
-  console.log(colors.yellow('   ARRÊT EN COURS... (Ctrl+C pour forcer)'));
-  console.log(colors.yellow('═══════════════════════════════════════\n'));
+    console.log(colors.yellow('\n\n⚠️  ═══════════════════════════════════════'));
+    console.log(colors.yellow('   ARRÊT EN COURS... (Ctrl+C pour forcer)'));
+    console.log(colors.yellow('═══════════════════════════════════════\n'));
 
-  console.log(colors.cyan('💾 Sauvegarde...'));
+    console.log(colors.cyan('💾 Sauvegarde...'));
 
-  const progressManager = new ProgressManager(CONFIG.progressFile);
-  progressManager.saveToCSV();
+    const progressManager = new ProgressManager(CONFIG.journalFile);
+    progressManager.saveToCSV();
 
-  console.log(colors.bold.green('\n✅ DONNÉES SAUVEGARDÉES !\n'));
-  console.log(colors.gray('━'.repeat(50)));
-  console.log(colors.white(`📊 Statistiques:`));
-  console.log(colors.white(`   • Offres: ${progressManager.data.jobOffers.length}`));
-  console.log(colors.white(`   • Fichier: ${CONFIG.outputPath}`));
-  console.log(colors.gray('━'.repeat(50)));
-  console.log(colors.cyan('\n👉 Relance pour continuer!\n'));
+    console.log(colors.bold.green('\n✅ DONNÉES SAUVEGARDÉES !\n'));
+    console.log(colors.gray('━'.repeat(50)));
+    console.log(colors.white(`📊 Statistiques:`));
+    console.log(colors.white(`   • Offres: ${progressManager.data.jobOffers.length}`));
+    console.log(colors.white(`   • Fichier: ${CONFIG.outputPath}`));
+    console.log(colors.gray('━'.repeat(50)));
+    console.log(colors.cyan('\n👉 Relance pour continuer!\n'));
 
-  process.exit(0);
-});
+    await releaseActiveBrowser();
+    process.exit(0);
+  });
+}
+
+module.exports = {
+  CONFIG,
+  ProgressManager,
+  canonicalOfferUrl,
+  computeOfferId,
+  connectBrowser,
+  launchBrowser,
+  releaseBrowser,
+  openDetailTab,
+  createTabPool,
+  fetchJobDetails,
+  extractJobDetails,
+  assignOfferIdentity,
+  scrapeJobsParallel,
+  retryFailedOffers,
+  buildJobMatrix
+};
 
-main();
\ No newline at end of file
+if (require.main === module) {
+  registerShutdownHandler();
+  main();
+}
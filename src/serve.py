@@ -0,0 +1,438 @@
+import os
+import sys
+import json
+import glob
+import time
+import uuid
+import threading
+import subprocess
+import http.client
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dotenv import load_dotenv
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SRC_DIR, "analyzer"))
+sys.path.insert(0, os.path.join(SRC_DIR, "generator"))
+
+import pandas as pd
+from filter_offers import (
+    INPUT_CSV_PATH, OUTPUT_FOLDER as FILTERED_FOLDER, MAX_OFFER_AGE_DAYS,
+    run_filter, detect_school_masks, detect_contract_type, add_publication_dates, find_stale_offers
+)
+from analyzer.offer_identity import compute_offer_id, compute_fallback_offer_id, is_fallback_offer_id
+from generate_letters import (
+    OUTPUT_FOLDER as LETTERS_FOLDER, OLLAMA_MODEL, LETTERS_BACKEND, RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY_MINUTES,
+    load_candidate_profile, create_prompt, is_valid_letter, save_letter
+)
+from letter_store import PackedLetterStore, build_letter_filename
+from retry_queue import RetryQueue, RETRY_QUEUE_FILENAME
+from ollama_client import OllamaClient
+
+load_dotenv()
+
+SERVE_HOST = os.getenv("SERVE_HOST", "127.0.0.1")
+SERVE_PORT = int(os.getenv("SERVE_PORT", "8765"))
+SERVE_QUEUE_PATH = os.getenv("SERVE_QUEUE", "data/serve_queue.jsonl")
+# Jobs terminés gardés dans la file (consultables via GET /jobs/<id>) ; les plus anciens sont purgés
+SERVE_KEEP_FINISHED_JOBS = int(os.getenv("SERVE_KEEP_FINISHED_JOBS", "500"))
+FETCH_OFFER_SCRIPT = os.path.join(SRC_DIR, "scraper", "fetch_offer.js")
+WAIT_TIMEOUT_SECONDS = 600
+FINISHED_STATUSES = ('done', 'failed')
+
+
+class Colors:
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    BOLD = '\033[1m'
+    GRAY = '\033[90m'
+    END = '\033[0m'
+
+
+def colored(text, color):
+    return f"{color}{text}{Colors.END}"
+
+
+class JobQueue:
+    # File persistante append-only : une ligne "job" à la soumission, une ligne "status"
+    # à chaque changement d'état. Au redémarrage, les jobs non terminés sont remis en attente.
+    def __init__(self, queue_path, keep_finished=SERVE_KEEP_FINISHED_JOBS):
+        self.queue_path = queue_path
+        self.keep_finished = keep_finished
+        self.jobs = {}
+        self.pending = deque()
+        self.condition = threading.Condition()
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.queue_path):
+            return
+
+        with open(self.queue_path, 'r', encoding='utf-8') as queue_file:
+            for line in queue_file:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if event.get('type') == 'job':
+                    self.jobs[event['job']['id']] = event['job']
+                elif event.get('type') == 'status' and event.get('id') in self.jobs:
+                    self.jobs[event['id']].update(event['changes'])
+
+        for job in self.jobs.values():
+            if job['status'] in ('pending', 'running'):
+                job['status'] = 'pending'
+                self.pending.append(job['id'])
+
+        # Au démarrage, le fichier repart d'une ligne par job : l'historique des statuts disparaît
+        self.prune_finished(self.keep_finished)
+        self.compact()
+
+    def append_event(self, event):
+        queue_dir = os.path.dirname(self.queue_path)
+        if queue_dir:
+            os.makedirs(queue_dir, exist_ok=True)
+        with open(self.queue_path, 'a', encoding='utf-8') as queue_file:
+            queue_file.write(json.dumps(event, ensure_ascii=False) + "\n")
+            queue_file.flush()
+            os.fsync(queue_file.fileno())
+
+    def compact(self):
+        # Réécrit la file avec l'état courant de chaque job restant (fichier temporaire puis remplacement)
+        queue_dir = os.path.dirname(self.queue_path)
+        if queue_dir:
+            os.makedirs(queue_dir, exist_ok=True)
+        temporary_path = f"{self.queue_path}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as queue_file:
+            for job in self.jobs.values():
+                queue_file.write(json.dumps({'type': 'job', 'job': job}, ensure_ascii=False) + "\n")
+            queue_file.flush()
+            os.fsync(queue_file.fileno())
+        os.replace(temporary_path, self.queue_path)
+
+    def prune_finished(self, keep_count):
+        # Supprime les jobs terminés les plus anciens (ordre de soumission) au-delà de keep_count
+        finished_ids = [job_id for job_id, job in self.jobs.items() if job['status'] in FINISHED_STATUSES]
+        for job_id in finished_ids[:max(len(finished_ids) - keep_count, 0)]:
+            del self.jobs[job_id]
+        return len(finished_ids) > keep_count
+
+    def submit(self, kind, payload):
+        job = {
+            'id': uuid.uuid4().hex[:12],
+            'kind': kind,
+            'payload': payload,
+            'status': 'pending',
+            'submitted_at': time.time()
+        }
+        with self.condition:
+            self.append_event({'type': 'job', 'job': job})
+            self.jobs[job['id']] = job
+            self.pending.append(job['id'])
+            self.condition.notify_all()
+        return dict(job)
+
+    def update(self, job_id, **changes):
+        with self.condition:
+            self.append_event({'type': 'status', 'id': job_id, 'changes': changes})
+            self.jobs[job_id].update(changes)
+            # Purge par paquets (au double de la limite) : le fichier n'est pas réécrit à chaque job
+            if changes.get('status') in FINISHED_STATUSES and self.prune_finished(self.keep_finished * 2):
+                self.prune_finished(self.keep_finished)
+                self.compact()
+            self.condition.notify_all()
+
+    def next_job(self):
+        with self.condition:
+            while not self.pending:
+                self.condition.wait()
+            return dict(self.jobs[self.pending.popleft()])
+
+    def get(self, job_id):
+        with self.condition:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def wait_for(self, job_id, timeout):
+        deadline = time.time() + timeout
+        with self.condition:
+            while self.jobs.get(job_id, {}).get('status') in ('pending', 'running') and time.time() < deadline:
+                self.condition.wait(deadline - time.time())
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def summary(self):
+        with self.condition:
+            status_counts = {}
+            for job in self.jobs.values():
+                status_counts[job['status']] = status_counts.get(job['status'], 0) + 1
+            return status_counts
+
+
+class WarmPipeline:
+    # Tout ce qu'un run CLI recharge à chaque fois reste en mémoire : profil, matchers compilés
+    # (importés avec filter_offers), connexion Ollama et modèle chargé.
+    def __init__(self, profile=None, client=None):
+        self.profile = profile if profile is not None else load_candidate_profile()
+        self.client = client or OllamaClient(OLLAMA_MODEL)
+        self.letter_store = PackedLetterStore(LETTERS_FOLDER) if LETTERS_BACKEND == "packed" else None
+        # Même file de reprise que le CLI : generate_letters.py retry reprend aussi les échecs du mode serve
+        self.retry_queue = RetryQueue(
+            os.path.join(LETTERS_FOLDER, RETRY_QUEUE_FILENAME), RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY_MINUTES
+        )
+        os.makedirs(LETTERS_FOLDER, exist_ok=True)
+
+    def warm_up(self):
+        if not self.client.is_available():
+            raise RuntimeError(f"Ollama n'est pas disponible sur {self.client.hostname}:{self.client.port}")
+        self.client.warm_up()
+
+    def has_letter(self, offer):
+        if self.letter_store is not None:
+            return offer['offerId'] in self.letter_store
+        return os.path.exists(os.path.join(LETTERS_FOLDER, build_letter_filename(offer['company'], offer['title'], offer['offerId'])))
+
+    def classify(self, offer):
+        school_mask = detect_school_masks(pd.Series([offer['company']]), pd.Series([offer['description']]))[0]
+        contract_type = detect_contract_type(str(offer.get('contract', '')), str(offer['description']))
+
+        offer_frame = add_publication_dates(
+            pd.DataFrame([{'publishedDate': offer.get('publishedDate', ''), 'scrapedAt': offer.get('scrapedAt')}]),
+            pd.Timestamp.now(tz='UTC')
+        )
+        is_stale = bool(find_stale_offers(offer_frame, MAX_OFFER_AGE_DAYS).iloc[0])
+        return bool(school_mask), is_stale, contract_type
+
+    def write_letter(self, offer, max_retries=3):
+        prompt = create_prompt(offer, self.profile)
+        last_error = "aucun essai"
+
+        for attempt in range(max_retries):
+            try:
+                generation = self.client.generate(prompt)
+            except (RuntimeError, OSError, http.client.HTTPException, json.JSONDecodeError) as error:
+                # Connexion coupée ou ligne de flux illisible : un nouvel essai, pas un job en échec
+                last_error = str(error) or repr(error)
+                continue
+            if is_valid_letter(generation['text']):
+                break
+            last_error = "lettre trop courte"
+        else:
+            if offer['offerId'] and not is_fallback_offer_id(offer['offerId']):
+                self.retry_queue.record_failure(
+                    offer['offerId'], last_error, url=offer.get('url', ''), company=offer['company'], title=offer['title']
+                )
+            raise RuntimeError(f"Génération échouée après {max_retries} essais : {last_error}")
+
+        if self.letter_store is not None:
+            self.letter_store.append_letter(
+                generation['text'], offer['offerId'], offer.get('url', ''),
+                offer['company'], offer['title'], OLLAMA_MODEL, prompt
+            )
+        else:
+            save_letter(generation['text'], offer['company'], offer['title'], LETTERS_FOLDER, offer['offerId'])
+        if offer['offerId'] and not is_fallback_offer_id(offer['offerId']):
+            self.retry_queue.record_success(offer['offerId'])
+
+        return {
+            'offerId': offer['offerId'],
+            'company': offer['company'],
+            'title': offer['title'],
+            'seconds': round(generation['total_seconds'], 1),
+            'tokens': generation['output_tokens']
+        }
+
+    def fetch_offer(self, url):
+        result = subprocess.run(
+            ["node", FETCH_OFFER_SCRIPT, url],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=120
+        )
+        if result.returncode == 2:
+            return None
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or "Récupération de l'offre échouée")
+        return json.loads(result.stdout)
+
+    def find_filtered_offer(self, offer_id):
+        for csv_path in sorted(glob.glob(os.path.join(FILTERED_FOLDER, "offres_*.csv"))):
+            offers = pd.read_csv(csv_path, dtype={'offerId': str})
+            if 'offerId' not in offers.columns:
+                continue
+            matches = offers[offers['offerId'] == offer_id]
+            if len(matches) > 0:
+                return matches.iloc[0].fillna('').to_dict()
+        return None
+
+    def run_batch(self, payload):
+        # Nouveau CSV ou nouvelles offres du journal : filtrage puis lettres des alternances manquantes
+        use_journal = payload.get('source', 'csv') == 'journal'
+        filter_result = run_filter(payload.get('path', INPUT_CSV_PATH), use_journal=use_journal)
+        if filter_result['status'] == 'missing':
+            raise RuntimeError(f"Fichier introuvable : {filter_result['input_path']}")
+        if filter_result['status'] == 'empty':
+            return {'generated': 0, 'skipped': 0, 'failed': 0, 'deferred': 0}
+
+        classified_offers = filter_result['dataframe']
+
+        alternance_offers = classified_offers[
+            ~classified_offers['is_school']
+            & ~find_stale_offers(classified_offers, MAX_OFFER_AGE_DAYS)
+            & (classified_offers['contract_type'] == 'alternance')
+        ]
+        batch_stats = {'generated': 0, 'skipped': 0, 'failed': 0, 'deferred': 0}
+        for row_label, offer in zip(alternance_offers.index, alternance_offers.to_dict('records')):
+            # Sans URL : identité de repli par ligne du CSV, deux offres homonymes ne se confondent pas
+            offer['offerId'] = offer['offerId'] or compute_fallback_offer_id(offer['company'], offer['title'], row_label)
+            if self.has_letter(offer):
+                batch_stats['skipped'] += 1
+                continue
+            # Échec récent encore en backoff, ou abandonné : comme le CLI, pas d'appel LLM à chaque batch
+            if not self.retry_queue.is_due(offer['offerId']):
+                batch_stats['deferred'] += 1
+                continue
+            try:
+                self.write_letter(offer)
+                batch_stats['generated'] += 1
+            except RuntimeError:
+                batch_stats['failed'] += 1
+        return batch_stats
+
+    def run_offer(self, payload):
+        offer = payload.get('offer') or self.fetch_offer(payload['url'])
+        if offer is None:
+            return {'skipped': 'offre introuvable'}
+
+        offer.setdefault('offerId', compute_offer_id(offer.get('url', '')))
+        if not offer['offerId']:
+            # Offre isolée sans URL : la description tient lieu de ligne pour l'identité de repli
+            offer['offerId'] = compute_fallback_offer_id(offer['company'], offer['title'], offer.get('description', ''))
+        is_school, is_stale, contract_type = self.classify(offer)
+        if is_school:
+            return {'offerId': offer['offerId'], 'skipped': 'organisme de formation', 'contract_type': contract_type}
+        if is_stale and not payload.get('force'):
+            return {'offerId': offer['offerId'], 'skipped': 'offre périmée', 'contract_type': contract_type}
+        if self.has_letter(offer) and not payload.get('force'):
+            return {'offerId': offer['offerId'], 'skipped': 'lettre déjà générée', 'contract_type': contract_type}
+
+        return {**self.write_letter(offer), 'contract_type': contract_type}
+
+    def run_letter(self, payload):
+        offer_id = payload.get('offerId') or compute_offer_id(payload.get('url', ''))
+        offer = self.find_filtered_offer(offer_id)
+        if offer is None:
+            raise RuntimeError(f"Offre {offer_id} absente des fichiers filtrés")
+        return self.write_letter(offer)
+
+
+def process_jobs(job_queue, pipeline):
+    job_handlers = {
+        'batch': pipeline.run_batch,
+        'offer': pipeline.run_offer,
+        'letter': pipeline.run_letter
+    }
+
+    while True:
+        job = job_queue.next_job()
+        job_queue.update(job['id'], status='running', started_at=time.time())
+        print(colored(f"  ▶ {job['kind']} {job['id']}", Colors.CYAN))
+
+        try:
+            result = job_handlers[job['kind']](job['payload'])
+            job_queue.update(job['id'], status='done', finished_at=time.time(), result=result)
+            print(colored(f"  ✓ {job['kind']} {job['id']} : {json.dumps(result, ensure_ascii=False)}", Colors.GREEN))
+        except Exception as error:
+            job_queue.update(job['id'], status='failed', finished_at=time.time(), error=str(error))
+            print(colored(f"  ✗ {job['kind']} {job['id']} : {error}", Colors.RED))
+
+
+def build_request_handler(job_queue, started_at):
+    class ServeRequestHandler(BaseHTTPRequestHandler):
+        def send_json(self, status_code, body):
+            encoded_body = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(status_code)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(encoded_body)))
+            self.end_headers()
+            self.wfile.write(encoded_body)
+
+        def do_GET(self):
+            if self.path == '/status':
+                self.send_json(200, {
+                    'model': OLLAMA_MODEL,
+                    'uptime_seconds': round(time.time() - started_at),
+                    'jobs': job_queue.summary()
+                })
+            elif self.path.startswith('/jobs/'):
+                job = job_queue.get(self.path[len('/jobs/'):])
+                if job:
+                    self.send_json(200, job)
+                else:
+                    self.send_json(404, {'error': 'job inconnu'})
+            else:
+                self.send_json(404, {'error': 'route inconnue'})
+
+        def do_POST(self):
+            route, _, query = self.path.partition('?')
+            if route != '/jobs':
+                self.send_json(404, {'error': 'route inconnue'})
+                return
+
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            except json.JSONDecodeError:
+                self.send_json(400, {'error': 'JSON invalide'})
+                return
+
+            kind = payload.pop('kind', None)
+            if kind not in ('batch', 'offer', 'letter'):
+                self.send_json(400, {'error': 'kind doit valoir batch, offer ou letter'})
+                return
+            if kind == 'offer' and not (payload.get('url') or payload.get('offer')):
+                self.send_json(400, {'error': 'url ou offer requis'})
+                return
+            if kind == 'letter' and not (payload.get('offerId') or payload.get('url')):
+                self.send_json(400, {'error': 'offerId ou url requis'})
+                return
+
+            job = job_queue.submit(kind, payload)
+            if 'wait=1' in query.split('&'):
+                self.send_json(200, job_queue.wait_for(job['id'], WAIT_TIMEOUT_SECONDS))
+            else:
+                self.send_json(202, job)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ServeRequestHandler
+
+
+def run_server():
+    started_at = time.time()
+    job_queue = JobQueue(SERVE_QUEUE_PATH)
+    pipeline = WarmPipeline()
+
+    print(colored(f"  🤖 Chargement du modèle {OLLAMA_MODEL}...", Colors.CYAN))
+    pipeline.warm_up()
+    print(colored(f"  ✅ Modèle prêt en {time.time() - started_at:.1f}s", Colors.GREEN + Colors.BOLD))
+
+    pending_jobs = job_queue.summary().get('pending', 0)
+    if pending_jobs:
+        print(colored(f"  ♻️  {pending_jobs} job(s) repris depuis {SERVE_QUEUE_PATH}", Colors.YELLOW))
+
+    threading.Thread(target=process_jobs, args=(job_queue, pipeline), daemon=True).start()
+
+    server = ThreadingHTTPServer((SERVE_HOST, SERVE_PORT), build_request_handler(job_queue, started_at))
+    print(colored(f"  🌐 En écoute sur http://{SERVE_HOST}:{SERVE_PORT}", Colors.BLUE + Colors.BOLD))
+    print(colored("     POST /jobs (batch | offer | letter), GET /jobs/<id>, GET /status — Ctrl+C pour arrêter\n", Colors.GRAY))
+
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        pipeline.client.close()
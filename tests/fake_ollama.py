@@ -0,0 +1,123 @@
+import sys
+import json
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Faux serveur Ollama (API /api/tags et /api/generate en streaming) pour tester autotune et le mode serve
+# sans GPU ni modèle. Chaque faux modèle a sa latence, son débit et sa part de lettres trop courtes.
+DEFAULT_FAKE_MODELS = {
+    "fake-fast:latest": {"load_seconds": 0.2, "ttft": 0.05, "tokens_per_second": 400, "letter_tokens": 120, "short_rate": 0.4},
+    "fake-balanced:latest": {"load_seconds": 0.5, "ttft": 0.1, "tokens_per_second": 200, "letter_tokens": 140, "short_rate": 0.1},
+    "fake-slow:latest": {"load_seconds": 1.0, "ttft": 0.3, "tokens_per_second": 80, "letter_tokens": 160, "short_rate": 0.0},
+    # Modèle d'embedding : listé par /api/tags mais refuse /api/generate, comme le vrai Ollama
+    "fake-embed:latest": {"load_seconds": 0.1, "embedding": True}
+}
+
+LETTER_WORDS = (
+    "Madame, Monsieur, actuellement étudiant je souhaite rejoindre votre équipe en alternance pour "
+    "mettre en pratique mes compétences en développement web React Node.js et tests automatisés "
+    "sur des projets concrets Cordialement"
+).split()
+
+
+def build_fake_letter(token_count):
+    return [LETTER_WORDS[index % len(LETTER_WORDS)] + " " for index in range(token_count)]
+
+
+def build_request_handler(models):
+    class FakeOllamaHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def send_json(self, status_code, body):
+            encoded_body = json.dumps(body).encode("utf-8")
+            self.send_response(status_code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(encoded_body)))
+            self.end_headers()
+            self.wfile.write(encoded_body)
+
+        def send_chunk(self, body):
+            encoded_line = (json.dumps(body) + "\n").encode("utf-8")
+            self.wfile.write(f"{len(encoded_line):x}\r\n".encode("ascii") + encoded_line + b"\r\n")
+            self.wfile.flush()
+
+        def do_GET(self):
+            if self.path == "/api/tags":
+                self.send_json(200, {"models": [{"name": model_name} for model_name in models]})
+            else:
+                self.send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            model = models.get(payload.get("model"))
+            if self.path != "/api/generate" or model is None:
+                self.send_json(404, {"error": f"model '{payload.get('model')}' not found"})
+                return
+
+            if model.get("embedding"):
+                self.send_json(400, {"error": f"\"{payload['model']}\" does not support generate"})
+                return
+
+            if not payload.get("prompt"):
+                time.sleep(model["load_seconds"])
+                self.send_json(200, {"model": payload["model"], "response": "", "done": True})
+                return
+
+            # Tirage déterministe par prompt : même échantillon → mêmes lettres acceptées ou rejetées
+            prompt_random = random.Random(f"{payload['model']}:{payload['prompt']}")
+            is_short = prompt_random.random() < model["short_rate"]
+            tokens = build_fake_letter(20 if is_short else model["letter_tokens"])
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            time.sleep(model["ttft"])
+            eval_start = time.perf_counter()
+            for token in tokens:
+                self.send_chunk({"model": payload["model"], "response": token, "done": False})
+                time.sleep(1 / model["tokens_per_second"])
+
+            # Connexion perdue en cours de génération : flux terminé sans "done", ou coupé au milieu d'un bloc
+            if model.get("drop_stream") == "end":
+                self.wfile.write(b"0\r\n\r\n")
+                return
+            if model.get("drop_stream") == "cut":
+                self.wfile.write(b"ff\r\n{\"model\"")
+                self.wfile.flush()
+                self.close_connection = True
+                return
+
+            self.send_chunk({
+                "model": payload["model"],
+                "response": "",
+                "done": True,
+                "prompt_eval_count": len(payload["prompt"]) // 4,
+                "eval_count": len(tokens),
+                "eval_duration": int((time.perf_counter() - eval_start) * 1e9)
+            })
+            self.wfile.write(b"0\r\n\r\n")
+
+        def log_message(self, format, *args):
+            pass
+
+    return FakeOllamaHandler
+
+
+def start_fake_ollama(models=None, port=0):
+    server = ThreadingHTTPServer(("127.0.0.1", port), build_request_handler(models or DEFAULT_FAKE_MODELS))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    # Usage : python -m tests.fake_ollama [port] puis OLLAMA_HOST=http://127.0.0.1:<port>
+    fake_server, base_url = start_fake_ollama(port=int(sys.argv[1]) if len(sys.argv) > 1 else 11435)
+    print(f"Faux Ollama sur {base_url} : {', '.join(DEFAULT_FAKE_MODELS)} (Ctrl+C pour arrêter)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        fake_server.shutdown()
@@ -0,0 +1,81 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const fs = require('fs');
+const path = require('path');
+const { extractFieldsFromHtml } = require('../../src/scraper/html_extract');
+const { JOB_SELECTORS, readJobFields, buildJobDetails } = require('../../src/scraper/job_details');
+
+// Page servie par fixture_server.js : le fetch direct et le navigateur doivent en tirer la même offre
+const JOB_URL = 'https://fr.indeed.com/viewjob?jk=fixture1';
+const JOB_PAGE_HTML = fs.readFileSync(path.join(__dirname, '../../src/scraper/fixtures/job_page.html'), 'utf8')
+  .replace(/\{\{JOB_KEY\}\}/g, 'fixture1');
+
+const EXPECTED_JOB = {
+  title: 'Développeur Fullstack en alternance H/F',
+  company: 'Entreprise Fixture fixture1',
+  location: 'Paris (75)',
+  salary: 'Alternance',
+  contract: 'alternance',
+  remote: 'Oui',
+  publishedDate: 'Publiée il y a 3 jours',
+  description: [
+    'Nous recherchons un(e) développeur(se) fullstack en alternance pour rejoindre notre équipe produit.',
+    'Missions : développement de nouvelles fonctionnalités en React et Node.js, écriture de tests, participation aux revues de code.',
+    'Profil : formation Bac+3 à Bac+5 en informatique, connaissances en JavaScript, TypeScript, PostgreSQL et Docker.',
+    'Rythme : 3 semaines en entreprise / 1 semaine à l\'école. Télétravail partiel possible.'
+  ].join('\n\n'),
+  url: JOB_URL
+};
+
+function loadPuppeteer() {
+  try {
+    return require('puppeteer');
+  } catch {
+    return null;
+  }
+}
+
+test('fetch direct : offre extraite du HTML brut', () => {
+  const jobDetails = buildJobDetails(extractFieldsFromHtml(JOB_PAGE_HTML, JOB_SELECTORS), JOB_URL);
+
+  assert.deepStrictEqual(jobDetails, EXPECTED_JOB);
+});
+
+test('fetch direct : champs absents remplacés par les valeurs par défaut', () => {
+  const jobDetails = buildJobDetails(extractFieldsFromHtml('<div id="jobDescriptionText">CDI</div>', JOB_SELECTORS), JOB_URL);
+
+  assert.strictEqual(jobDetails.title, '(titre absent)');
+  assert.strictEqual(jobDetails.company, '(entreprise absente)');
+  assert.strictEqual(jobDetails.contract, 'CDI');
+  assert.strictEqual(jobDetails.remote, 'Non');
+});
+
+test('navigateur : même offre que le fetch direct', async t => {
+  const puppeteer = loadPuppeteer();
+  if (!puppeteer) {
+    t.skip('puppeteer non installé');
+    return;
+  }
+
+  let browser;
+  try {
+    browser = await puppeteer.launch({
+      headless: true,
+      executablePath: process.env.BROWSER_EXECUTABLE,
+      args: ['--no-sandbox', '--disable-setuid-sandbox']
+    });
+  } catch (error) {
+    t.skip(`navigateur indisponible : ${error.message}`);
+    return;
+  }
+
+  try {
+    const page = await browser.newPage();
+    await page.setContent(JOB_PAGE_HTML, { waitUntil: 'domcontentloaded' });
+    const rawFields = await page.evaluate(readJobFields, JOB_SELECTORS);
+
+    assert.deepStrictEqual(buildJobDetails(rawFields, JOB_URL), EXPECTED_JOB);
+  } finally {
+    await browser.close();
+  }
+});
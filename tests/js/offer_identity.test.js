@@ -0,0 +1,18 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const { canonicalOfferUrl, computeOfferId } = require('../../src/scraper/offer_identity');
+
+// Mêmes cas que tests/test_offer_identity.py : les deux implémentations doivent s'accorder
+const cases = require('../fixtures/offer_ids.json');
+
+for (const { url, canonical, offerId } of cases) {
+  test(`identité de ${JSON.stringify(url)}`, () => {
+    assert.strictEqual(canonicalOfferUrl(url), canonical);
+    assert.strictEqual(computeOfferId(url), offerId);
+  });
+}
+
+test('URL absente : pas d\'identité', () => {
+  assert.strictEqual(computeOfferId(''), '');
+  assert.strictEqual(computeOfferId(undefined), '');
+});
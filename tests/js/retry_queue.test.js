@@ -0,0 +1,12 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const { parseMaxAttempts } = require('../../src/scraper/retry_queue');
+
+// Mêmes cas que tests/test_retry_queue.py : RETRY_MAX_ATTEMPTS est lu de la même façon des deux côtés
+const cases = require('../fixtures/max_attempts.json');
+
+for (const { raw, expected } of cases) {
+  test(`RETRY_MAX_ATTEMPTS=${JSON.stringify(raw)}`, () => {
+    assert.strictEqual(parseMaxAttempts(raw ?? undefined), expected);
+  });
+}
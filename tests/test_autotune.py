@@ -0,0 +1,132 @@
+import pytest
+
+import autotune
+import generate_letters
+from tests.fake_ollama import start_fake_ollama
+
+# Faux modèles rapides : quelques dixièmes de seconde par modèle, taux de rejet fixés à 0 ou 100 %
+TEST_MODELS = {
+    "short:latest": {"load_seconds": 0.01, "ttft": 0.01, "tokens_per_second": 4000, "letter_tokens": 120, "short_rate": 1.0},
+    "steady:latest": {"load_seconds": 0.01, "ttft": 0.01, "tokens_per_second": 4000, "letter_tokens": 120, "short_rate": 0.0},
+    "slow:latest": {"load_seconds": 0.01, "ttft": 0.05, "tokens_per_second": 1000, "letter_tokens": 120, "short_rate": 0.0},
+    "embed:latest": {"load_seconds": 0.01, "embedding": True},
+    "dropped:latest": {"load_seconds": 0.01, "ttft": 0.01, "tokens_per_second": 4000, "letter_tokens": 120, "short_rate": 0.0,
+                       "drop_stream": "end"},
+    "cut:latest": {"load_seconds": 0.01, "ttft": 0.01, "tokens_per_second": 4000, "letter_tokens": 120, "short_rate": 0.0,
+                   "drop_stream": "cut"}
+}
+PROMPTS = [f"Rédige une lettre pour l'offre {index}" for index in range(3)]
+
+
+@pytest.fixture
+def fake_host():
+    server, base_url = start_fake_ollama(TEST_MODELS)
+    yield base_url
+    server.shutdown()
+    server.server_close()
+
+
+def test_benchmark_model_measures_acceptance(fake_host):
+    steady = autotune.benchmark_model("steady:latest", PROMPTS, fake_host)
+    short = autotune.benchmark_model("short:latest", PROMPTS, fake_host)
+
+    assert steady['acceptance'] == 1.0
+    assert steady['errors'] == 0
+    assert steady['letters_per_hour'] > 0
+    assert short['acceptance'] == 0.0
+    assert short['letters_per_hour'] == 0.0
+
+
+def test_benchmark_model_raises_for_embedding_model(fake_host):
+    with pytest.raises(RuntimeError):
+        autotune.benchmark_model("embed:latest", PROMPTS, fake_host)
+
+
+@pytest.mark.parametrize("model", ["dropped:latest", "cut:latest"])
+def test_interrupted_stream_counts_as_error(fake_host, model):
+    client = autotune.OllamaClient(model, host=fake_host)
+    with pytest.raises(RuntimeError):
+        client.generate(PROMPTS[0])
+    client.close()
+
+    result = autotune.benchmark_model(model, PROMPTS, fake_host)
+    assert result['errors'] == len(PROMPTS)
+    assert result['acceptance'] == 0.0
+
+
+def test_letter_stage_generates_through_the_benchmarked_client(fake_host):
+    client = autotune.OllamaClient("steady:latest", host=fake_host)
+    letter, failure_reason = generate_letters.generate_letter_with_ollama(PROMPTS[0], client)
+    client.close()
+    assert failure_reason is None and generate_letters.is_valid_letter(letter)
+
+    client = autotune.OllamaClient("dropped:latest", host=fake_host)
+    letter, failure_reason = generate_letters.generate_letter_with_ollama(PROMPTS[0], client, max_retries=2)
+    client.close()
+    assert letter is None and "interrompu" in failure_reason
+
+
+def test_choose_model_prefers_valid_letters_throughput(fake_host):
+    results = [autotune.benchmark_model(model, PROMPTS, fake_host) for model in ("short:latest", "steady:latest", "slow:latest")]
+
+    best, reason = autotune.choose_model(results)
+    assert best['model'] == "steady:latest"
+
+    best, reason = autotune.choose_model(results, target_per_hour=10 ** 9)
+    assert best['model'] == "steady:latest"
+    assert "non atteint" in reason
+
+    best, reason = autotune.choose_model(results, min_acceptance=1.1)
+    assert best is None
+
+
+def test_run_autotune_skips_failing_model(fake_host, monkeypatch, tmp_path):
+    csv_path = tmp_path / "offres.csv"
+    csv_path.write_text("title,company\n", encoding="utf-8")
+    monkeypatch.setattr(autotune, "load_candidate_profile", lambda: {})
+    monkeypatch.setattr(autotune, "load_sample_prompts", lambda *args: PROMPTS)
+
+    recommended = autotune.run_autotune(str(csv_path), 3, models=["embed:latest", "slow:latest"], host=fake_host)
+
+    assert recommended['model'] == "slow:latest"
+
+
+def test_write_env_value_replaces_existing_key(tmp_path):
+    env_path = tmp_path / ".env"
+    env_path.write_text("OLLAMA_HOST=http://localhost:11434\n  OLLAMA_MODEL = mistral\nOTHER=1\n", encoding="utf-8")
+
+    autotune.write_env_value("OLLAMA_MODEL", "llama3.2:3b", str(env_path))
+
+    assert env_path.read_text(encoding="utf-8") == "OLLAMA_HOST=http://localhost:11434\nOLLAMA_MODEL=llama3.2:3b\nOTHER=1\n"
+
+
+def test_write_env_value_appends_missing_key(tmp_path):
+    env_path = tmp_path / ".env"
+    env_path.write_text("OTHER=1", encoding="utf-8")
+
+    autotune.write_env_value("OLLAMA_MODEL", "mistral", str(env_path))
+    autotune.write_env_value("OLLAMA_MODEL", "qwen2.5:7b", str(env_path))
+
+    assert env_path.read_text(encoding="utf-8") == "OTHER=1\nOLLAMA_MODEL=qwen2.5:7b\n"
+
+
+def test_write_env_value_creates_file(tmp_path):
+    env_path = tmp_path / ".env"
+
+    autotune.write_env_value("OLLAMA_MODEL", "mistral", str(env_path))
+
+    assert env_path.read_text(encoding="utf-8") == "OLLAMA_MODEL=mistral\n"
+
+
+def test_load_sample_prompts_keeps_missing_company_empty(tmp_path):
+    csv_path = tmp_path / "offres.csv"
+    csv_path.write_text("title,company,location,description,url,offerId\n"
+                        ",,Lyon,Alternance développeur React.,https://example.com/a,a\n", encoding="utf-8")
+
+    profile = {'nom': "Camille Martin", 'formation': "Bachelor Développeur Web", 'ecole': "IUT", 'ville': "Lyon",
+               'domaine': "Développement web", 'stack': "React, Node.js"}
+
+    prompts = autotune.load_sample_prompts(str(csv_path), profile, 1)
+
+    assert "Entreprise : \n" in prompts[0]
+    assert "entreprise_0" not in prompts[0] and "poste_0" not in prompts[0]
@@ -0,0 +1,52 @@
+import pandas as pd
+
+import filter_offers
+
+
+def build_classified_offers(offer_ids):
+    return pd.DataFrame({
+        'title': [f"Poste {offer_id}" for offer_id in offer_ids],
+        'company': "Acme",
+        'offerId': offer_ids,
+        'is_school': False,
+        'school_mask': 0,
+        'contract_type': 'alternance'
+    })
+
+
+def test_export_offers_appends_with_same_columns(tmp_path):
+    output_path = tmp_path / "offres_alternance.csv"
+
+    filter_offers.export_offers(build_classified_offers(["a", "b"]), str(output_path), append=True)
+    filter_offers.export_offers(build_classified_offers(["c"]), str(output_path), append=True)
+
+    exported = pd.read_csv(output_path)
+    assert exported['offerId'].tolist() == ["a", "b", "c"]
+    assert exported.columns.tolist() == ['title', 'company', 'offerId', 'is_school', 'school_keywords', 'contract_type']
+
+
+def test_export_offers_rewrites_file_when_columns_differ(tmp_path, monkeypatch):
+    monkeypatch.setattr(filter_offers, "LOG_FILE_PATH", str(tmp_path / "filter.log"))
+    output_path = tmp_path / "offres_alternance.csv"
+    # Fichier d'une version précédente : pas de colonne offerId, une colonne retirée depuis
+    pd.DataFrame({'title': ["Ancien poste"], 'company': ["Ancienne"], 'legacy': ["x"]}).to_csv(output_path, index=False)
+
+    filter_offers.export_offers(build_classified_offers(["c"]), str(output_path), append=True)
+
+    exported = pd.read_csv(output_path, dtype=str, keep_default_na=False)
+    assert exported.columns.tolist() == ['title', 'company', 'offerId', 'is_school', 'school_keywords', 'contract_type', 'legacy']
+    assert exported.to_dict('records') == [
+        {'title': "Ancien poste", 'company': "Ancienne", 'offerId': "", 'is_school': "", 'school_keywords': "",
+         'contract_type': "", 'legacy': "x"},
+        {'title': "Poste c", 'company': "Acme", 'offerId': "c", 'is_school': "False", 'school_keywords': "[]",
+         'contract_type': "alternance", 'legacy': ""}
+    ]
+
+
+def test_export_offers_overwrites_outside_journal_mode(tmp_path):
+    output_path = tmp_path / "offres_alternance.csv"
+
+    filter_offers.export_offers(build_classified_offers(["a", "b"]), str(output_path), append=False)
+    filter_offers.export_offers(build_classified_offers(["c"]), str(output_path), append=False)
+
+    assert pd.read_csv(output_path)['offerId'].tolist() == ["c"]
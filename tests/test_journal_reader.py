@@ -0,0 +1,57 @@
+import json
+
+import journal_reader
+
+
+def write_journal(journal_path, header, offer_titles):
+    lines = [{'type': 'header', 'journalId': "journal-1", **header}]
+    lines += [{'type': 'offer', 'offer': {'title': title, 'scrapedAt': "2026-01-15T10:00:00Z"}} for title in offer_titles]
+    journal_path.write_text("".join(json.dumps(line) + "\n" for line in lines), encoding='utf-8')
+
+
+def test_read_new_offers_resumes_at_offset(tmp_path):
+    journal_path = tmp_path / "offres.jsonl"
+    write_journal(journal_path, {'generation': 0}, ["a", "b"])
+
+    offers, cursor = journal_reader.read_new_offers(str(journal_path), journal_reader.empty_cursor())
+    assert [offer['title'] for offer in offers] == ["a", "b"]
+
+    with open(journal_path, 'a', encoding='utf-8') as journal_file:
+        journal_file.write(json.dumps({'type': 'offer', 'offer': {'title': "c"}}) + "\n")
+    offers, cursor = journal_reader.read_new_offers(str(journal_path), cursor)
+    assert [offer['title'] for offer in offers] == ["c"]
+    assert cursor['offer_count'] == 3
+
+
+def test_read_new_offers_after_compaction_skips_read_offers(tmp_path):
+    journal_path = tmp_path / "offres.jsonl"
+    write_journal(journal_path, {'generation': 1}, ["a", "b", "c", "d"])
+    cursor = {'journal_id': "journal-1", 'generation': 0, 'offset': 10 ** 6, 'offer_count': 2}
+
+    offers, cursor = journal_reader.read_new_offers(str(journal_path), cursor)
+
+    assert [offer['title'] for offer in offers] == ["c", "d"]
+    assert cursor['offer_count'] == 4
+
+
+def test_read_new_offers_after_compaction_dropping_read_offers(tmp_path):
+    journal_path = tmp_path / "offres.jsonl"
+    # Le scraper a retiré les 3 premières offres, déjà lues : le rang des suivantes ne change pas
+    write_journal(journal_path, {'generation': 2, 'droppedOffers': 3}, ["d", "e", "f"])
+    cursor = {'journal_id': "journal-1", 'generation': 1, 'offset': 10 ** 6, 'offer_count': 4}
+
+    offers, cursor = journal_reader.read_new_offers(str(journal_path), cursor)
+
+    assert [offer['title'] for offer in offers] == ["e", "f"]
+    assert cursor['offer_count'] == 6
+
+
+def test_read_new_offers_new_journal_starts_over(tmp_path):
+    journal_path = tmp_path / "offres.jsonl"
+    write_journal(journal_path, {'generation': 0}, ["a"])
+    cursor = {'journal_id': "other-journal", 'generation': 3, 'offset': 500, 'offer_count': 40}
+
+    offers, cursor = journal_reader.read_new_offers(str(journal_path), cursor)
+
+    assert [offer['title'] for offer in offers] == ["a"]
+    assert cursor['journal_id'] == "journal-1"
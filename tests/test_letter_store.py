@@ -0,0 +1,63 @@
+import json
+
+import letter_store
+from letter_store import PackedLetterStore, build_letter_filename
+
+
+def append_letters(store, offer_ids):
+    for offer_id in offer_ids:
+        store.append_letter(f"Lettre pour {offer_id}", offer_id, f"https://example.com/{offer_id}", "Acme", "Développeur",
+                            "modele", "prompt")
+
+
+def test_build_letter_filename_includes_offer_id():
+    assert build_letter_filename("Acme & Co", "Développeur Web", "0123456789abcdef") == \
+        "lettre_Acme__Co_Développeur_Web_0123456789abcdef.txt"
+    assert build_letter_filename("Acme", "Dev") == "lettre_Acme_Dev.txt"
+
+
+def test_load_index_truncates_partial_index_line(tmp_path):
+    append_letters(PackedLetterStore(str(tmp_path)), ["a", "b"])
+    index_path = tmp_path / letter_store.PACKED_INDEX_FILENAME
+    # Arrêt pendant l'écriture de l'index : dernière ligne sans fin
+    with open(index_path, 'a', encoding='utf-8') as index_file:
+        index_file.write('{"offer_id": "c", "hash"')
+
+    store = PackedLetterStore(str(tmp_path))
+    append_letters(store, ["c"])
+
+    index_lines = index_path.read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)['offer_id'] for line in index_lines] == ["a", "b", "c"]
+    assert PackedLetterStore(str(tmp_path)).get("c")['content'] == "Lettre pour c"
+
+
+def test_load_index_rebuilds_entries_past_truncated_data(tmp_path):
+    append_letters(PackedLetterStore(str(tmp_path)), ["a", "b"])
+    data_path = tmp_path / letter_store.PACKED_DATA_FILENAME
+    # Dernière lettre à moitié écrite mais déjà indexée
+    data_path.write_bytes(data_path.read_bytes()[:-10])
+
+    store = PackedLetterStore(str(tmp_path))
+
+    assert "a" in store and "b" not in store
+    index_lines = (tmp_path / letter_store.PACKED_INDEX_FILENAME).read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)['offer_id'] for line in index_lines] == ["a"]
+
+
+def test_export_uses_offer_id_in_filenames(tmp_path):
+    store = PackedLetterStore(str(tmp_path / "letters"))
+    append_letters(store, ["a", "b"])
+
+    assert store.export_to_text_files(str(tmp_path / "export")) == 2
+    assert sorted(path.name for path in (tmp_path / "export").iterdir()) == [
+        "lettre_Acme_Développeur_a.txt", "lettre_Acme_Développeur_b.txt"
+    ]
+
+
+def test_letters_without_offer_id_never_collide(tmp_path):
+    store = PackedLetterStore(str(tmp_path))
+    store.append_letter("Première lettre", "", "", "Acme", "Développeur", "modele", "prompt")
+    store.append_letter("Deuxième lettre", "", "", "Acme", "Développeur", "modele", "prompt")
+
+    assert "" not in store
+    assert len(PackedLetterStore(str(tmp_path))) == 2
@@ -0,0 +1,44 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from analyzer.offer_identity import canonical_offer_url, compute_offer_id, compute_fallback_offer_id, is_fallback_offer_id
+import filter_offers
+
+# Mêmes cas que tests/js/offer_identity.test.js : les deux implémentations doivent s'accorder
+with open(os.path.join(os.path.dirname(__file__), "fixtures", "offer_ids.json"), encoding='utf-8') as fixture_file:
+    OFFER_ID_CASES = json.load(fixture_file)
+
+
+@pytest.mark.parametrize("case", OFFER_ID_CASES, ids=[case['url'] for case in OFFER_ID_CASES])
+def test_offer_identity_matches_shared_fixture(case):
+    assert canonical_offer_url(case['url']) == case['canonical']
+    assert compute_offer_id(case['url']) == case['offerId']
+
+
+def test_missing_url_has_no_identity():
+    assert compute_offer_id(None) == ''
+    assert compute_offer_id("   ") == ''
+
+
+def test_fallback_identity_separates_rows_without_url():
+    first_offer_id = compute_fallback_offer_id("Acme", "Développeur", 0)
+
+    assert first_offer_id == compute_fallback_offer_id("Acme", "Développeur", 0)
+    assert first_offer_id != compute_fallback_offer_id("Acme", "Développeur", 1)
+    assert is_fallback_offer_id(first_offer_id)
+    assert not is_fallback_offer_id(compute_offer_id("https://fr.indeed.com/viewjob?jk=1"))
+
+
+def test_assign_offer_ids_keeps_offers_without_identity():
+    offers = pd.DataFrame({
+        'title': ["a", "b", "c", "d"],
+        'url': ["https://fr.indeed.com/viewjob?jk=1", "https://fr.indeed.com/rc/clk?jk=1&from=serp", "", None]
+    })
+
+    deduplicated = filter_offers.assign_offer_ids(offers)
+
+    assert deduplicated['title'].tolist() == ["a", "c", "d"]
+    assert deduplicated['offerId'].tolist()[1:] == ['', '']
@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+
+import filter_offers
+
+polars_backend = pytest.importorskip("polars_backend")
+
+
+def build_contract_cases():
+    # Chaque mot-clé seul, entouré de texte, en majuscules, collé à un autre mot, et dans le champ contrat
+    cases = []
+    for keywords in filter_offers.CONTRACT_KEYWORDS.values():
+        for keyword in keywords:
+            cases += [
+                ("", keyword),
+                ("", f"Poste : {keyword}, démarrage rapide."),
+                ("", keyword.upper()),
+                ("", f"{keyword}s"),
+                ("", f"pré{keyword}"),
+                (keyword.capitalize(), "Rejoignez notre équipe."),
+            ]
+    cases += [
+        ("Stage", "CDI possible après l'alternance"),
+        ("", "mission de consultant en cdd"),
+        ("", ""),
+        ("", "Développeur React"),
+    ]
+    return cases
+
+
+@pytest.fixture
+def offers_csv(tmp_path):
+    cases = build_contract_cases()
+    csv_path = tmp_path / "offres.csv"
+    pd.DataFrame({
+        'title': "Développeur",
+        'company': ["Ecole Ynov" if index % 7 == 0 else f"Entreprise {index % 5}" for index in range(len(cases))],
+        'contract': [contract for contract, _ in cases],
+        'description': [description for _, description in cases],
+        'url': [f"https://example.com/{index}" for index in range(len(cases))]
+    }).to_csv(csv_path, index=False)
+    return str(csv_path)
+
+
+def read_with_both_backends(csv_path):
+    pandas_frame = filter_offers.PandasBackend().read_offers_csv(csv_path)
+    polars = polars_backend.PolarsBackend(
+        filter_offers.SCHOOL_KEYWORDS, filter_offers.CONTRACT_PATTERNS, filter_offers.CATEGORICAL_COLUMNS, chunk_size=50
+    )
+    return pandas_frame, polars, polars.read_offers_csv(csv_path)
+
+
+def test_detect_contract_types_matches_pandas(offers_csv):
+    pandas_frame, polars, polars_frame = read_with_both_backends(offers_csv)
+
+    pandas_types = filter_offers.PandasBackend().detect_contract_types(pandas_frame['contract'], pandas_frame['description'])
+    polars_types = list(polars.detect_contract_types(polars_frame['contract'], polars_frame['description']))
+
+    assert polars_types == pandas_types
+    assert set(pandas_types) == set(filter_offers.CONTRACT_TYPES)
+
+
+def test_detect_school_masks_matches_pandas(offers_csv):
+    pandas_frame, polars, polars_frame = read_with_both_backends(offers_csv)
+
+    pandas_masks = filter_offers.detect_school_masks(pandas_frame['company'], pandas_frame['description'])
+    polars_masks = polars.detect_school_masks(polars_frame['company'], polars_frame['description'])
+
+    assert polars_masks.tolist() == pandas_masks.tolist()
+
+
+def test_read_offers_csv_keeps_categories_and_values(offers_csv):
+    pandas_frame, _, polars_frame = read_with_both_backends(offers_csv)
+
+    for column in ['company', 'contract']:
+        assert list(polars_frame[column].cat.categories) == list(pandas_frame[column].cat.categories)
+        assert polars_frame[column].astype(object).where(polars_frame[column].notna(), None).tolist() == \
+            pandas_frame[column].astype(object).where(pandas_frame[column].notna(), None).tolist()
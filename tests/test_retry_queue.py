@@ -0,0 +1,32 @@
+import json
+import os
+
+import pytest
+
+from retry_queue import RetryQueue, parse_max_attempts
+
+# Mêmes cas que tests/js/retry_queue.test.js : RETRY_MAX_ATTEMPTS est lu de la même façon des deux côtés
+CASES = json.load(open(os.path.join(os.path.dirname(__file__), "fixtures", "max_attempts.json"), encoding='utf-8'))
+
+
+@pytest.mark.parametrize("case", CASES, ids=[repr(case['raw']) for case in CASES])
+def test_parse_max_attempts(case):
+    assert parse_max_attempts(case['raw']) == case['expected']
+
+
+def test_zero_max_attempts_gives_up_at_first_failure(tmp_path):
+    retry_queue = RetryQueue(str(tmp_path / "retry.jsonl"), max_attempts=0)
+
+    event = retry_queue.record_failure("a", "timeout")
+
+    assert event['dead'] is True
+    assert retry_queue.is_dead("a") and not retry_queue.is_due("a")
+
+
+def test_failure_in_backoff_is_not_dead(tmp_path):
+    retry_queue = RetryQueue(str(tmp_path / "retry.jsonl"), max_attempts=3)
+
+    retry_queue.record_failure("a", "timeout")
+
+    assert not retry_queue.is_dead("a") and not retry_queue.is_due("a")
+    assert RetryQueue(str(tmp_path / "retry.jsonl"), max_attempts=3).counts() == {'pending': 1, 'dead': 0}
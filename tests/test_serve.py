@@ -0,0 +1,256 @@
+import csv
+import json
+import time
+import threading
+import http.client
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import serve
+import filter_offers
+
+PROFILE = {
+    'nom': "Camille Martin",
+    'formation': "Bachelor Développeur Web",
+    'ecole': "IUT",
+    'ville': "Lyon",
+    'domaine': "Développement web",
+    'stack': "React, Node.js"
+}
+LETTER_TEXT = "Madame, Monsieur, " + "je souhaite rejoindre votre équipe en alternance. " * 8
+ALTERNANCE_OFFER = {
+    'title': "Développeur React",
+    'company': "Acme",
+    'location': "Lyon",
+    'contract': "Alternance",
+    'publishedDate': "Publiée il y a 2 jours",
+    'description': "Contrat en alternance pour développer notre application React.",
+    'url': "https://fr.indeed.com/viewjob?jk=acme1",
+    'scrapedAt': "2026-01-15T10:00:00.000Z"
+}
+
+
+class FakeOllamaClient:
+    # Même interface que OllamaClient, sans serveur : lettre fixe et compteur d'appels
+    hostname = "fake"
+    port = 0
+
+    def __init__(self, letter_text=LETTER_TEXT, errors=()):
+        self.letter_text = letter_text
+        self.prompts = []
+        # Exceptions levées par les premiers appels à generate, dans l'ordre
+        self.errors = list(errors)
+
+    def is_available(self):
+        return True
+
+    def warm_up(self):
+        pass
+
+    def generate(self, prompt):
+        self.prompts.append(prompt)
+        if self.errors:
+            raise self.errors.pop(0)
+        return {'text': self.letter_text, 'ttft': 0.0, 'total_seconds': 0.1, 'prompt_tokens': 10, 'output_tokens': 120,
+                'tokens_per_second': 1200.0}
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    monkeypatch.setattr(serve, "LETTERS_FOLDER", str(tmp_path / "letters"))
+    monkeypatch.setattr(serve, "LETTERS_BACKEND", "files")
+    monkeypatch.setattr(filter_offers, "OUTPUT_FOLDER", str(tmp_path / "filtered"))
+    monkeypatch.setattr(serve, "FILTERED_FOLDER", str(tmp_path / "filtered"))
+    monkeypatch.setattr(filter_offers, "LOG_FILE_PATH", str(tmp_path / "filter.log"))
+    return serve.WarmPipeline(profile=PROFILE, client=FakeOllamaClient())
+
+
+def write_offers_csv(csv_path, offers):
+    with open(csv_path, 'w', encoding='utf-8', newline='') as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=list(ALTERNANCE_OFFER))
+        writer.writeheader()
+        writer.writerows(offers)
+
+
+def test_job_queue_requeues_unfinished_jobs(tmp_path):
+    queue_path = tmp_path / "queue.jsonl"
+    job_queue = serve.JobQueue(str(queue_path))
+    running_job = job_queue.submit('offer', {'url': "https://example.com/1"})
+    finished_job = job_queue.submit('offer', {'url': "https://example.com/2"})
+    job_queue.update(running_job['id'], status='running')
+    job_queue.update(finished_job['id'], status='done', result={'skipped': 'offre introuvable'})
+
+    reloaded_queue = serve.JobQueue(str(queue_path))
+
+    assert reloaded_queue.get(running_job['id'])['status'] == 'pending'
+    assert reloaded_queue.get(finished_job['id'])['result'] == {'skipped': 'offre introuvable'}
+    assert reloaded_queue.next_job()['id'] == running_job['id']
+
+
+def test_job_queue_compacts_on_load(tmp_path):
+    queue_path = tmp_path / "queue.jsonl"
+    job_queue = serve.JobQueue(str(queue_path))
+    job = job_queue.submit('batch', {})
+    job_queue.update(job['id'], status='running')
+    job_queue.update(job['id'], status='done')
+    assert len(queue_path.read_text(encoding='utf-8').splitlines()) == 3
+
+    serve.JobQueue(str(queue_path))
+
+    lines = queue_path.read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)['job']['status'] for line in lines] == ['done']
+
+
+def test_job_queue_prunes_oldest_finished_jobs(tmp_path):
+    queue_path = tmp_path / "queue.jsonl"
+    job_queue = serve.JobQueue(str(queue_path), keep_finished=2)
+    pending_job = job_queue.submit('batch', {})
+    finished_ids = []
+    for index in range(5):
+        job = job_queue.submit('offer', {'url': f"https://example.com/{index}"})
+        job_queue.update(job['id'], status='done')
+        finished_ids.append(job['id'])
+
+    # Cinquième job terminé : au-delà du double de la limite, purge jusqu'aux 2 plus récents
+    assert job_queue.get(finished_ids[0]) is None
+    assert [job_queue.get(job_id) is not None for job_id in finished_ids] == [False, False, False, True, True]
+    assert job_queue.get(pending_job['id'])['status'] == 'pending'
+
+    queued_ids = [json.loads(line)['job']['id'] for line in queue_path.read_text(encoding='utf-8').splitlines()]
+    assert queued_ids == [pending_job['id']] + finished_ids[3:]
+    assert set(serve.JobQueue(str(queue_path), keep_finished=2).jobs) == set(queued_ids)
+
+
+def test_run_offer_writes_letter_once(pipeline):
+    first_result = pipeline.run_offer({'offer': dict(ALTERNANCE_OFFER)})
+    second_result = pipeline.run_offer({'offer': dict(ALTERNANCE_OFFER)})
+
+    assert first_result['contract_type'] == 'alternance'
+    assert first_result['tokens'] == 120
+    assert second_result['skipped'] == 'lettre déjà générée'
+    assert len(pipeline.client.prompts) == 1
+
+
+def test_write_letter_retries_dropped_connections(pipeline):
+    pipeline.client = FakeOllamaClient(errors=[
+        http.client.IncompleteRead(b"{"), json.JSONDecodeError("ligne illisible", "{", 1)
+    ])
+
+    result = pipeline.write_letter({**ALTERNANCE_OFFER, 'offerId': "acme1"})
+
+    assert result['tokens'] == 120
+    assert len(pipeline.client.prompts) == 3
+
+
+def test_write_letter_without_attempts_raises_runtime_error(pipeline):
+    with pytest.raises(RuntimeError):
+        pipeline.write_letter({**ALTERNANCE_OFFER, 'offerId': "acme1"}, max_retries=0)
+
+
+def test_run_offer_skips_schools(pipeline):
+    result = pipeline.run_offer({'offer': {**ALTERNANCE_OFFER, 'company': "Ecole Ynov"}})
+
+    assert result['skipped'] == 'organisme de formation'
+    assert pipeline.client.prompts == []
+
+
+def test_run_batch_filters_then_generates(pipeline, tmp_path):
+    csv_path = tmp_path / "offres.csv"
+    write_offers_csv(csv_path, [
+        ALTERNANCE_OFFER,
+        {**ALTERNANCE_OFFER, 'company': "CFA Campus", 'url': "https://fr.indeed.com/viewjob?jk=cfa"},
+        {**ALTERNANCE_OFFER, 'contract': "CDI", 'description': "Poste en CDI", 'url': "https://fr.indeed.com/viewjob?jk=cdi"}
+    ])
+
+    assert pipeline.run_batch({'path': str(csv_path)}) == {'generated': 1, 'skipped': 0, 'failed': 0, 'deferred': 0}
+    assert pipeline.run_batch({'path': str(csv_path)}) == {'generated': 0, 'skipped': 1, 'failed': 0, 'deferred': 0}
+    assert (tmp_path / "filtered" / "offres_alternance.csv").exists()
+
+
+def test_run_batch_records_failures_in_retry_queue(pipeline, tmp_path):
+    csv_path = tmp_path / "offres.csv"
+    write_offers_csv(csv_path, [ALTERNANCE_OFFER])
+    pipeline.client = FakeOllamaClient(letter_text="Trop court")
+
+    assert pipeline.run_batch({'path': str(csv_path)}) == {'generated': 0, 'skipped': 0, 'failed': 1, 'deferred': 0}
+    assert pipeline.run_batch({'path': str(csv_path)}) == {'generated': 0, 'skipped': 0, 'failed': 0, 'deferred': 1}
+
+    # Relu depuis le disque, comme le ferait generate_letters.py retry
+    retry_queue = serve.RetryQueue(str(tmp_path / "letters" / serve.RETRY_QUEUE_FILENAME))
+    offer_id = serve.compute_offer_id(ALTERNANCE_OFFER['url'])
+    assert retry_queue.entries[offer_id]['attempts'] == 1
+    assert retry_queue.entries[offer_id]['company'] == "Acme"
+
+    pipeline.client = FakeOllamaClient()
+    pipeline.run_letter({'offerId': offer_id})
+    assert offer_id not in serve.RetryQueue(str(tmp_path / "letters" / serve.RETRY_QUEUE_FILENAME)).entries
+
+
+@pytest.mark.parametrize("backend", ["files", "packed"])
+def test_run_batch_keeps_offers_without_url_apart(pipeline, tmp_path, monkeypatch, backend):
+    monkeypatch.setattr(serve, "LETTERS_BACKEND", backend)
+    pipeline = serve.WarmPipeline(profile=PROFILE, client=FakeOllamaClient())
+    csv_path = tmp_path / "offres.csv"
+    write_offers_csv(csv_path, [{**ALTERNANCE_OFFER, 'url': ""}, {**ALTERNANCE_OFFER, 'url': ""}])
+
+    assert pipeline.run_batch({'path': str(csv_path)}) == {'generated': 2, 'skipped': 0, 'failed': 0, 'deferred': 0}
+    assert pipeline.run_batch({'path': str(csv_path)}) == {'generated': 0, 'skipped': 2, 'failed': 0, 'deferred': 0}
+
+
+def test_run_batch_rejects_missing_file(pipeline, tmp_path):
+    with pytest.raises(RuntimeError):
+        pipeline.run_batch({'path': str(tmp_path / "absent.csv")})
+
+
+@pytest.fixture
+def server_address(tmp_path, pipeline):
+    job_queue = serve.JobQueue(str(tmp_path / "queue.jsonl"))
+    threading.Thread(target=serve.process_jobs, args=(job_queue, pipeline), daemon=True).start()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), serve.build_request_handler(job_queue, time.time()))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address
+    server.shutdown()
+    server.server_close()
+
+
+def request_json(server_address, method, path, payload=None):
+    connection = http.client.HTTPConnection(*server_address, timeout=10)
+    connection.request(method, path, body=json.dumps(payload) if payload is not None else None)
+    response = connection.getresponse()
+    body = json.loads(response.read())
+    connection.close()
+    return response.status, body
+
+
+def test_post_offer_job_and_wait(server_address):
+    status_code, job = request_json(server_address, "POST", "/jobs?wait=1", {'kind': 'offer', 'offer': ALTERNANCE_OFFER})
+
+    assert status_code == 200
+    assert job['status'] == 'done'
+    assert job['result']['contract_type'] == 'alternance'
+
+    status_code, fetched_job = request_json(server_address, "GET", f"/jobs/{job['id']}")
+    assert status_code == 200
+    assert fetched_job['result'] == job['result']
+
+    status_code, server_status = request_json(server_address, "GET", "/status")
+    assert server_status['jobs'] == {'done': 1}
+
+
+def test_post_job_validation(server_address):
+    assert request_json(server_address, "POST", "/jobs", {'kind': 'unknown'})[0] == 400
+    assert request_json(server_address, "POST", "/jobs", {'kind': 'offer'})[0] == 400
+    assert request_json(server_address, "POST", "/jobs", {'kind': 'letter'})[0] == 400
+    assert request_json(server_address, "POST", "/other", {})[0] == 404
+    assert request_json(server_address, "GET", "/jobs/inconnu")[0] == 404
+
+
+def test_post_job_without_wait_is_accepted(server_address):
+    status_code, job = request_json(server_address, "POST", "/jobs", {'kind': 'letter', 'offerId': "0123456789abcdef"})
+
+    assert status_code == 202
+    assert job['status'] == 'pending'
@@ -0,0 +1,151 @@
+import csv
+import json
+
+import pytest
+
+import generate_letters
+from letter_store import PackedLetterStore
+from sharding import ShardManifest, read_manifest, shard_folder
+
+PROFILE = {
+    'nom': "Camille Martin",
+    'formation': "Bachelor Développeur Web",
+    'ecole': "IUT",
+    'ville': "Lyon",
+    'domaine': "Développement web",
+    'stack': "React, Node.js"
+}
+LETTER_TEXT = "Madame, Monsieur, " + "je souhaite rejoindre votre équipe en alternance. " * 8
+
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    prompts = []
+
+    def fake_generate(prompt, client):
+        prompts.append(prompt)
+        return LETTER_TEXT, None
+
+    monkeypatch.setattr(generate_letters, "OUTPUT_FOLDER", str(tmp_path / "letters"))
+    monkeypatch.setattr(generate_letters, "LETTERS_BACKEND", "files")
+    monkeypatch.setattr(generate_letters, "check_ollama_available", lambda: True)
+    monkeypatch.setattr(generate_letters, "load_candidate_profile", lambda: PROFILE)
+    monkeypatch.setattr(generate_letters, "generate_letter_with_ollama", fake_generate)
+    return prompts
+
+
+def write_offers_csv(csv_path, offers):
+    with open(csv_path, 'w', encoding='utf-8', newline='') as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=['title', 'company', 'location', 'description', 'url', 'offerId'])
+        writer.writeheader()
+        for offer_id in offers:
+            writer.writerow({
+                'title': "Développeur", 'company': "Acme", 'location': "Lyon",
+                'description': "Alternance développeur React.", 'url': f"https://example.com/{offer_id}", 'offerId': offer_id
+            })
+
+
+@pytest.mark.parametrize("backend", ["files", "packed"])
+def test_shard_rerun_skips_offers_done_in_manifest(generator, tmp_path, monkeypatch, backend):
+    monkeypatch.setattr(generate_letters, "LETTERS_BACKEND", backend)
+    csv_path = tmp_path / "offres.csv"
+    write_offers_csv(csv_path, ["a", "b", "c"])
+
+    generate_letters.generate_letters_for_offers(str(csv_path), shard=(1, 1))
+    assert len(generator) == 3
+
+    generate_letters.generate_letters_for_offers(str(csv_path), shard=(1, 1))
+    assert len(generator) == 3
+
+    manifest = read_manifest(shard_folder(str(tmp_path / "letters"), 1, 1))
+    assert manifest['statuses'] == {'a': 'generated', 'b': 'generated', 'c': 'generated'}
+
+
+def test_merge_keeps_one_letter_per_offer_id(generator, tmp_path):
+    csv_path = tmp_path / "offres.csv"
+    write_offers_csv(csv_path, ["a", "b"])
+    shards_root = tmp_path / "letters" / "shards"
+
+    # Manifestes d'une version précédente : deux offres homonymes, même nom de fichier dans deux shards
+    for shard_index, offer_id in [(1, "a"), (2, "b")]:
+        folder = shard_folder(str(tmp_path / "letters"), shard_index, 2)
+        manifest = ShardManifest(folder)
+        manifest.start(shard_index, 2, str(csv_path), "modele", [offer_id])
+        (tmp_path / folder / "lettre_Acme_Développeur.txt").write_text(f"Lettre {offer_id}", encoding='utf-8')
+        manifest.record_offer(offer_id, 'generated', "lettre_Acme_Développeur.txt")
+        manifest.finish({'generated': 1})
+
+    generate_letters.merge_shard_outputs(str(csv_path), str(shards_root))
+
+    merged = {path.name: path.read_text(encoding='utf-8') for path in (tmp_path / "letters").glob("*.txt")}
+    assert merged == {"lettre_Acme_Développeur_a.txt": "Lettre a", "lettre_Acme_Développeur_b.txt": "Lettre b"}
+    report = json.loads((shards_root / "merge_report.json").read_text(encoding='utf-8'))
+    assert report['missing'] == [] and report['failed'] == []
+
+
+@pytest.mark.parametrize("backend", ["files", "packed"])
+def test_offers_without_url_stay_distinct_through_merge(generator, tmp_path, monkeypatch, backend):
+    monkeypatch.setattr(generate_letters, "LETTERS_BACKEND", backend)
+    csv_path = tmp_path / "offres.csv"
+    csv_path.write_text("title,company,location,description,url,offerId\n"
+                        + "Développeur,Acme,Lyon,Alternance développeur React.,,\n" * 3
+                        + "Développeur,Acme,Lyon,Alternance développeur React.,https://example.com/a,a\n", encoding='utf-8')
+
+    for shard_index in (1, 2):
+        generate_letters.generate_letters_for_offers(str(csv_path), shard=(shard_index, 2))
+    assert len(generator) == 4
+
+    shards_root = tmp_path / "letters" / "shards"
+    statuses = {}
+    for shard_index in (1, 2):
+        statuses.update(read_manifest(shard_folder(str(tmp_path / "letters"), shard_index, 2))['statuses'])
+    assert len(statuses) == 4 and set(statuses.values()) == {'generated'}
+
+    generate_letters.merge_shard_outputs(str(csv_path), str(shards_root))
+
+    if backend == "packed":
+        assert len(PackedLetterStore(str(tmp_path / "letters"))) == 4
+    else:
+        assert len(list((tmp_path / "letters").glob("*.txt"))) == 4
+    report = json.loads((shards_root / "merge_report.json").read_text(encoding='utf-8'))
+    assert report['missing'] == [] and report['failed'] == []
+
+
+def test_offers_in_backoff_are_recorded_as_deferred(generator, tmp_path, monkeypatch):
+    csv_path = tmp_path / "offres.csv"
+    write_offers_csv(csv_path, ["a", "b"])
+    monkeypatch.setattr(generate_letters, "generate_letter_with_ollama", lambda prompt, client: (None, "timeout"))
+
+    generate_letters.generate_letters_for_offers(str(csv_path), shard=(1, 1))
+    generate_letters.generate_letters_for_offers(str(csv_path), shard=(1, 1))
+
+    manifest = read_manifest(shard_folder(str(tmp_path / "letters"), 1, 1))
+    assert manifest['statuses'] == {'a': 'deferred', 'b': 'deferred'}
+
+    generate_letters.merge_shard_outputs(str(csv_path), str(tmp_path / "letters" / "shards"))
+    report = json.loads((tmp_path / "letters" / "shards" / "merge_report.json").read_text(encoding='utf-8'))
+    assert [offer['offerId'] for offer in report['deferred']] == ["a", "b"]
+    assert report['failed'] == [] and report['missing'] == []
+
+
+def test_offer_without_id_skips_retry_queue(generator, tmp_path, monkeypatch):
+    csv_path = tmp_path / "offres.csv"
+    csv_path.write_text("title,company,location,description,url,offerId\n"
+                        "Développeur,Acme,Lyon,Alternance développeur React.,,\n", encoding='utf-8')
+    monkeypatch.setattr(generate_letters, "generate_letter_with_ollama", lambda prompt, client: (None, "timeout"))
+
+    generate_letters.generate_letters_for_offers(str(csv_path))
+
+    retry_path = tmp_path / "letters" / "retry_queue.jsonl"
+    assert not retry_path.exists() or retry_path.read_text(encoding='utf-8') == ""
+
+
+def test_missing_company_and_title_only_fill_the_filename(generator, tmp_path):
+    csv_path = tmp_path / "offres.csv"
+    csv_path.write_text("title,company,location,description,url,offerId\n"
+                        ",,Lyon,Alternance développeur React.,https://example.com/a,a\n", encoding='utf-8')
+
+    generate_letters.generate_letters_for_offers(str(csv_path))
+
+    assert "Entreprise : \n" in generator[0] and "entreprise_0" not in generator[0] and "poste_0" not in generator[0]
+    assert (tmp_path / "letters" / "lettre_entreprise_0_poste_0_a.txt").exists()